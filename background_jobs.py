@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Execução de lotes em segundo plano (criação e exclusão de tarefas)
+Os lotes rodam em threads do próprio servidor, fora do script do Streamlit:
+fechar a aba ou provocar um rerun não interrompe o trabalho. O andamento fica
+numa tabela SQLite que o dashboard consulta para mostrar progresso e resultado
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from meistertask_api import (
+    create_meistertask_task, iter_meistertask_tasks, trash_meistertask_tasks,
+    build_process_index, meistertask_task_url, MeisterTaskError
+)
+from retry_queue import STATUS_RETRY
+from task_journal import STATE_PENDING
+
+DEFAULT_JOBS_PATH = os.path.join('.cache', 'jobs.db')
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_INTERRUPTED = 'interrupted'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    label TEXT,
+    status TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+"""
+
+_COLUMNS = ('id', 'kind', 'label', 'status', 'done', 'total', 'message',
+            'result', 'error', 'created_at', 'started_at', 'finished_at')
+
+
+class JobBusyError(RuntimeError):
+    """Já existe um lote ativo com a mesma chave exclusiva (ex.: criação na mesma seção)"""
+
+    def __init__(self, job_id):
+        super().__init__(f"Já existe um lote em andamento com a mesma chave ({job_id})")
+        self.job_id = job_id
+
+
+class JobContext:
+    """Entregue ao handler de cada lote para informar o andamento"""
+
+    def __init__(self, manager, job_id):
+        self.manager = manager
+        self.job_id = job_id
+
+    def progress(self, done, total=None, message=None):
+        self.manager._update(self.job_id, done=done, total=total, message=message)
+
+
+class JobManager:
+    """
+    Fila de lotes com um pool de threads (vários lotes podem rodar ao mesmo tempo)
+
+    Uso:
+        manager.register('trash_tasks', trash_tasks_job)
+        job_id = manager.submit('trash_tasks', 'Excluir 12 duplicatas', task_ids=[...], api_token=...)
+        manager.get(job_id)  # {'status': 'running', 'done': 5, 'total': 12, ...}
+
+    Os argumentos do handler ficam só em memória (contêm o token da API);
+    a tabela guarda apenas status, progresso e resultado.
+
+    exclusive_key: enquanto um lote com a mesma chave estiver na fila ou
+    rodando, submit levanta JobBusyError (dois lotes de criação na mesma seção
+    montariam cada um seu índice e criariam as mesmas tarefas duas vezes).
+    """
+
+    def __init__(self, db_path=DEFAULT_JOBS_PATH, max_workers=3):
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.executescript(_SCHEMA)
+        self._handlers = {}
+        self._exclusive = {}   # chave exclusiva -> id do lote ativo
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        # Lotes que estavam rodando quando o servidor caiu não vão terminar sozinhos
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE status IN (?, ?)",
+                (JOB_INTERRUPTED, time.time(), JOB_QUEUED, JOB_RUNNING)
+            )
+
+    def register(self, kind, handler):
+        """handler(ctx, **kwargs) -> dict com o resultado (serializável em JSON)"""
+        self._handlers[kind] = handler
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        self._conn.close()
+
+    # ── Submissão e execução ────────────────────────────────────────────────
+    def submit(self, kind, label='', total=0, exclusive_key=None, **kwargs):
+        if kind not in self._handlers:
+            raise ValueError(f"Tipo de lote desconhecido: {kind}")
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock, self._conn:
+            if exclusive_key is not None:
+                if exclusive_key in self._exclusive:
+                    raise JobBusyError(self._exclusive[exclusive_key])
+                self._exclusive[exclusive_key] = job_id
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, label, status, total, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, label, JOB_QUEUED, total, time.time())
+            )
+        self._executor.submit(self._run, job_id, kind, kwargs, exclusive_key)
+        return job_id
+
+    def _run(self, job_id, kind, kwargs, exclusive_key=None):
+        self._update(job_id, status=JOB_RUNNING, started_at=time.time())
+        try:
+            result = self._handlers[kind](JobContext(self, job_id), **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(job_id, exclusive_key, status=JOB_FAILED, error=str(e))
+            return
+        self._finish(job_id, exclusive_key, status=JOB_DONE,
+                     result=json.dumps(result, ensure_ascii=False, default=str))
+
+    def _finish(self, job_id, exclusive_key, **fields):
+        self._update(job_id, finished_at=time.time(), **fields)
+        if exclusive_key is not None:
+            with self._lock:
+                self._exclusive.pop(exclusive_key, None)
+
+    def _update(self, job_id, **fields):
+        fields = {k: v for k, v in fields.items() if v is not None}
+        if not fields:
+            return
+        assignments = ', '.join(f"{k} = ?" for k in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", list(fields.values()) + [job_id])
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+    def _select(self, where, params=()):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs {where}", params).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(zip(_COLUMNS, row))
+            job['result'] = json.loads(job['result']) if job['result'] else None
+            jobs.append(job)
+        return jobs
+
+    def get(self, job_id):
+        jobs = self._select("WHERE id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def recent(self, limit=20):
+        return self._select("ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def active(self):
+        return self._select("WHERE status IN (?, ?) ORDER BY created_at", (JOB_QUEUED, JOB_RUNNING))
+
+    def wait(self, job_id, timeout=None, poll=0.05):
+        """Bloqueia até o lote terminar (útil em testes e scripts)"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job['status'] not in (JOB_QUEUED, JOB_RUNNING):
+                return job
+            if deadline is not None and time.time() > deadline:
+                return job
+            time.sleep(poll)
+
+
+# =============================================================================
+# Handlers
+# =============================================================================
+def existing_process_index(items, section_id, api_token, journal, mirror=None, use_mirror_index=False):
+    """
+    Índice {processo: tarefa} da seção para a checagem de duplicatas de um lote
+    Retorna (índice ou None, avisos)
+    """
+    use_mirror = use_mirror_index and mirror is not None
+    if use_mirror and mirror.is_fresh(section_id):
+        # Espelho mantido pelos webhooks: dispensa listar a seção
+        return build_process_index(mirror.tasks(section_id)), []
+    if items is not None and all(journal.is_done(item.fingerprint) for item in items):
+        # Retomada: se todas já foram criadas, não precisa listar a seção (uma
+        # intenção sem resultado não basta: a tarefa pode ou não ter sido criada)
+        return None, []
+    try:
+        if use_mirror:
+            # Ressincronização periódica do espelho: recupera os eventos perdidos
+            mirror.refresh(section_id, api_token, full=True)
+            return build_process_index(mirror.tasks(section_id)), []
+        return build_process_index(iter_meistertask_tasks(section_id, api_token)), []
+    except MeisterTaskError as e:
+        return None, [f'Não foi possível verificar tarefas existentes, criando sem checagem: {e}']
+
+
+# Resultados de create_task_item
+ITEM_CREATED = 'created'
+ITEM_EXISTING = 'existing'
+ITEM_RESUMED = 'resumed'
+ITEM_FAILED = 'failed'
+ITEM_QUEUED = 'queued'
+
+
+def create_task_item(item, section_id, api_token, journal, existing_index=None,
+                     mirror=None, retry_queue=None):
+    """
+    Cria a tarefa de um item, com diário, espelho e fila de novas tentativas
+
+    item: Publication (usa fingerprint, process_number, parties, content e clients)
+    Retorna (resultado, detalhe): ITEM_CREATED + tarefa, ITEM_EXISTING + link,
+    ITEM_RESUMED + None, ITEM_QUEUED ou ITEM_FAILED + erro
+    """
+    fp, process_number = item.fingerprint, item.process_number
+    if journal.is_done(fp):
+        return ITEM_RESUMED, None
+    entry = journal.get(fp)
+    if entry is not None and entry['state'] == STATE_PENDING and existing_index is None:
+        # Execução anterior caiu durante a chamada: sem a listagem da seção, só o
+        # espelho diz se a tarefa chegou a ser criada
+        if mirror is None or not mirror.has_section(section_id):
+            return ITEM_FAILED, 'Resultado anterior desconhecido; verifique a seção antes de criar de novo'
+        found = mirror.find_by_process(section_id, process_number)
+        if found:
+            journal.record_done(fp, process_number, found[0])
+            return ITEM_EXISTING, meistertask_task_url(found[0])
+    journal.record_intent(fp, process_number)
+    ok, result = create_meistertask_task(
+        process_number, item.parties, item.content, section_id, api_token,
+        existing_index=existing_index, tags=item.clients
+    )
+    if ok and result.get('already_exists'):
+        journal.record_done(fp, process_number, result['task'])
+        return ITEM_EXISTING, result['url']
+    if ok:
+        journal.record_done(fp, process_number, result)
+        if mirror is not None:
+            mirror.upsert_tasks(section_id, [result])
+        return ITEM_CREATED, result
+
+    if getattr(result, 'unknown_outcome', False):
+        # Sem resposta: a intenção continua pendente no diário e a próxima
+        # execução confere a seção antes de tentar de novo (nada de reenvio às cegas)
+        return ITEM_FAILED, result
+    journal.record_failed(fp, process_number, result)
+    if retry_queue is not None:
+        status = retry_queue.enqueue(fp, {
+            'process_number': process_number, 'parties': item.parties,
+            'description': item.content, 'section_id': section_id, 'tags': list(item.clients)
+        }, result)
+        if status == STATUS_RETRY:
+            return ITEM_QUEUED, result
+    return ITEM_FAILED, result
+
+
+def create_tasks_job(ctx, items, section_id, api_token, journal, mirror=None,
+                     retry_queue=None, use_mirror_index=False, delay=0.5, dedupe_index=None):
+    """
+    Cria as tarefas de um lote (mesma lógica do passo 4 do dashboard)
+
+    items: Publication (itens já agrupados ou não)
+    dedupe_index: CrossSourceIndex; pula a publicação que já chegou pela outra
+    fonte (ou num lote anterior) e indexa as que viram tarefa
+    Retorna o resumo usado na tela de resultados
+    """
+    total = len(items)
+    ctx.progress(0, total, 'Verificando tarefas já existentes na seção...')
+    existing_index, warnings = existing_process_index(
+        items, section_id, api_token, journal, mirror=mirror, use_mirror_index=use_mirror_index
+    )
+
+    success_count, error_count = 0, 0
+    errors, success_tasks, existing_tasks, resumed_tasks, queued_tasks = [], [], [], [], []
+    duplicate_tasks = []
+
+    for idx, item in enumerate(items):
+        process_number = item.process_number
+        if journal.is_done(item.fingerprint):
+            resumed_tasks.append(process_number)
+            ctx.progress(idx + 1, total)
+            continue
+        match = dedupe_index.find(item) if dedupe_index is not None else None
+        if match is not None:
+            duplicate_tasks.append((process_number, match['origem']))
+            ctx.progress(idx + 1, total)
+            continue
+        ctx.progress(idx, total, f'Criando {idx + 1}/{total}: {process_number}')
+        outcome, detail = create_task_item(item, section_id, api_token, journal, existing_index,
+                                           mirror=mirror, retry_queue=retry_queue)
+        if dedupe_index is not None and outcome in (ITEM_CREATED, ITEM_EXISTING):
+            dedupe_index.add(item)
+        if outcome == ITEM_EXISTING:
+            existing_tasks.append((process_number, detail))
+        elif outcome == ITEM_CREATED:
+            success_count += 1
+            success_tasks.append(process_number)
+        else:
+            error_count += 1
+            if outcome == ITEM_QUEUED:
+                queued_tasks.append(process_number)
+            errors.append(f"{process_number}: {detail}")
+        ctx.progress(idx + 1, total)
+        if delay and outcome != ITEM_EXISTING:
+            time.sleep(delay)
+
+    return {
+        'success_count': success_count,
+        'error_count': error_count,
+        'errors': warnings + errors,
+        'success_tasks': success_tasks,
+        'existing_tasks': existing_tasks,
+        'resumed_tasks': resumed_tasks,
+        'queued_tasks': queued_tasks,
+        'duplicate_tasks': duplicate_tasks
+    }
+
+
+def trash_tasks_job(ctx, task_ids, api_token, mirror=None):
+    """Move as tarefas para a lixeira; retorna o resumo de trash_meistertask_tasks"""
+    ctx.progress(0, len(task_ids))
+
+    def _on_progress(done, total):
+        ctx.progress(done, total, f'Excluindo {done}/{total}...')
+
+    summary = trash_meistertask_tasks(task_ids, api_token, progress_callback=_on_progress)
+    if mirror is not None:
+        mirror.remove_tasks(summary['removed_ids'])
+    return summary
+
+
+def build_job_manager(db_path=DEFAULT_JOBS_PATH, max_workers=3):
+    """JobManager com os handlers de criação e exclusão já registrados"""
+    manager = JobManager(db_path, max_workers=max_workers)
+    manager.register('create_tasks', create_tasks_job)
+    manager.register('trash_tasks', trash_tasks_job)
+    return manager
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Identificação dos clientes citados em cada publicação
+A lista de clientes (arquivo CSV) vira um autômato de Aho–Corasick sobre os
+nomes sem acento e os CPF/CNPJ só com dígitos: cada publicação é percorrida
+uma única vez, qualquer que seja o tamanho da lista (em vez de um re.search
+por cliente)
+
+Arquivo (CLIENT_ROSTER_FILE, padrão clientes.csv; separador , ou ;):
+    cliente;documento;apelidos
+    MARIA DA SILVA;123.456.789-09;
+    Construtora Alfa Ltda;12.345.678/0001-90;ALFA CONSTRUCOES|CONSTRUTORA ALFA
+
+"cliente" é a etiqueta que vai para o título da tarefa; "apelidos" (separados
+por |) são outros nomes que também identificam o cliente.
+"""
+import csv
+import os
+import re
+import unicodedata
+from collections import deque
+
+DEFAULT_ROSTER_PATH = 'clientes.csv'
+
+# Pontuação entre dígitos (CPF, CNPJ, CNJ) some: 123.456.789-09 -> 12345678909
+_DIGIT_PUNCTUATION = re.compile(r'(?<=\d)[./-](?=\d)')
+
+
+def fold(text):
+    """
+    Texto para comparação: minúsculas, sem acentos, só letras e números separados
+    por um espaço e com um espaço nas pontas (casamento por palavra inteira)
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    text = _DIGIT_PUNCTUATION.sub('', text.lower())
+    return ' ' + ' '.join(re.findall(r'[a-z0-9]+', text)) + ' '
+
+
+class AhoCorasick:
+    """
+    Autômato de Aho–Corasick: acha todas as ocorrências de muitos padrões
+    numa só passada pelo texto (tempo proporcional ao texto + ocorrências)
+
+    Uso:
+        ac = AhoCorasick()
+        ac.add(' maria da silva ', 'MARIA DA SILVA')
+        ac.build()
+        list(ac.iter_matches(' intimada maria da silva ... '))   # ['MARIA DA SILVA']
+    """
+
+    def __init__(self):
+        self._goto = [{}]      # estado -> {caractere: próximo estado}
+        self._fail = [0]
+        self._out = [[]]       # valores dos padrões que terminam no estado (incluindo sufixos)
+        self._built = False
+
+    def add(self, pattern, value):
+        if self._built:
+            raise RuntimeError('Padrões precisam ser adicionados antes de build()')
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(value)
+
+    def build(self):
+        """Liga os estados de falha (busca em largura a partir da raiz)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text):
+        """Valores de cada padrão encontrado, na ordem em que terminam no texto"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                yield from out[state]
+
+    def __len__(self):
+        return len(self._goto)
+
+
+class ClientMatcher:
+    """
+    Etiquetas dos clientes citados num texto
+
+    clients: iterável de (etiqueta, nomes, documentos)
+    """
+
+    def __init__(self, clients=()):
+        self._automaton = AhoCorasick()
+        self.count = 0
+        for tag, names, documents in clients:
+            patterns = {pattern for pattern in map(fold, names) if pattern.strip()}
+            patterns |= {f' {digits} ' for digits in (re.sub(r'\D', '', d or '') for d in documents)
+                         if len(digits) in (11, 14)}
+            for pattern in patterns:
+                self._automaton.add(pattern, tag)
+            self.count += bool(patterns)
+        self._automaton.build()
+
+    @classmethod
+    def load(cls, path=DEFAULT_ROSTER_PATH):
+        """Lê o arquivo de clientes; sem arquivo, nenhum cliente é identificado"""
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.readline()
+            f.seek(0)
+            reader = csv.DictReader(f, delimiter=';' if sample.count(';') > sample.count(',') else ',')
+            clients = []
+            for row in reader:
+                row = {k.strip().lower(): (v or '').strip() for k, v in row.items() if isinstance(k, str)}
+                tag = row.get('cliente', '')
+                if not tag:
+                    continue
+                aliases = [a for a in row.get('apelidos', '').split('|') if a.strip()]
+                clients.append((tag, [tag] + aliases, [row.get('documento', '')]))
+        return cls(clients)
+
+    def match(self, text):
+        """Etiquetas encontradas, sem repetição, na ordem em que aparecem"""
+        if not self.count:
+            return ()
+        return tuple(dict.fromkeys(self._automaton.iter_matches(fold(text))))
+
+    def tag(self, publications):
+        """Preenche .clients de cada publicação; retorna a mesma lista"""
+        if self.count:
+            for pub in publications:
+                pub.clients = self.match(pub.content)
+        return publications
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Configuração centralizada
+Lê o .env, as variáveis de ambiente e os secrets do Streamlit uma única vez e
+guarda o resultado; o .env só é lido de novo quando o arquivo muda (mtime)
+
+Precedência: variável de ambiente > st.secrets > .env
+"""
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+DEFAULT_ENV_PATH = '.env'
+
+_lock = threading.Lock()
+_cache = {}   # caminho do .env -> (mtime, valores, Settings)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Configurações tipadas usadas pelo dashboard e pelos scripts"""
+    meistertask_api_token: str = ''
+    meistertask_project_id: str = ''
+    meistertask_section_id: str = ''
+    meistertask_webhook_enabled: bool = False
+    meistertask_webhook_secret: str = ''
+    djne_nome_advogado: str = 'EDSON MARCOS FERREIRA PRATTI JUNIOR'
+    dashboard_profiler: bool = False
+    client_roster_file: str = 'clientes.csv'
+
+
+def parse_env_file(path):
+    """Lê um arquivo .env (KEY=valor por linha; ignora comentários e linhas vazias)"""
+    values = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            key, value = key.strip(), value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                value = value[1:-1]
+            values[key] = value
+    return values
+
+
+def _streamlit_secrets():
+    """
+    Valores de primeiro nível de st.secrets (só se o Streamlit já estiver carregado,
+    para não importá-lo em scripts de linha de comando)
+    """
+    st = sys.modules.get('streamlit')
+    if st is None:
+        return {}
+    try:
+        return {k: str(v) for k, v in st.secrets.items() if not hasattr(v, 'items')}
+    except Exception:
+        # Sem secrets.toml: st.secrets levanta FileNotFoundError ao ser acessado
+        return {}
+
+
+def _to_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'sim', 'on')
+
+
+def _build_settings(values):
+    def get(key, default):
+        return values.get(key) or default
+
+    defaults = Settings()
+    return Settings(
+        meistertask_api_token=get('MEISTERTASK_API_TOKEN', defaults.meistertask_api_token),
+        meistertask_project_id=get('MEISTERTASK_PROJECT_ID', defaults.meistertask_project_id),
+        meistertask_section_id=get('MEISTERTASK_SECTION_ID', defaults.meistertask_section_id),
+        meistertask_webhook_enabled=_to_bool(get('MEISTERTASK_WEBHOOK_ENABLED', 'false')),
+        meistertask_webhook_secret=get('MEISTERTASK_WEBHOOK_SECRET', defaults.meistertask_webhook_secret),
+        djne_nome_advogado=get('DJNE_NOME_ADVOGADO', defaults.djne_nome_advogado),
+        dashboard_profiler=_to_bool(get('DASHBOARD_PROFILER', 'false')),
+        client_roster_file=get('CLIENT_ROSTER_FILE', defaults.client_roster_file),
+    )
+
+
+def _load(env_path):
+    try:
+        mtime = os.stat(env_path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached = _cache.get(env_path)
+    if cached is not None and cached[0] == mtime:
+        return cached
+
+    with _lock:
+        cached = _cache.get(env_path)
+        if cached is not None and cached[0] == mtime:
+            return cached
+        values = parse_env_file(env_path) if mtime is not None else {}
+        values.update(_streamlit_secrets())
+        values.update(os.environ)
+        entry = (mtime, values, _build_settings(values))
+        _cache[env_path] = entry
+        return entry
+
+
+def get_settings(env_path=DEFAULT_ENV_PATH):
+    """Settings atuais (custa só um stat() do .env quando nada mudou)"""
+    return _load(env_path)[2]
+
+
+def get_value(key, default='', env_path=DEFAULT_ENV_PATH):
+    """Valor bruto de uma chave, para o que não tem campo em Settings"""
+    return _load(env_path)[1].get(key) or default
+
+
+def reload():
+    """Descarta o cache (ex.: depois de alterar variáveis de ambiente nos testes)"""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Deduplicação entre fontes (Gmail x DJNE) e entre rodadas
+A mesma publicação chega no resumo do Gmail e de novo pela busca no DJNE, com
+textos que não batem byte a byte (cabeçalhos, quebras de linha, CNJ sem máscara).
+Cada publicação ganha um CNJ normalizado, um simhash de 64 bits do conteúdo
+(n-gramas de palavras) e o conjunto dos números do texto (datas, prazos); o
+índice responde "já vimos esta publicação?" só com consultas a dicionários,
+sem varrer o histórico
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from meistertask_api import extract_process_number
+
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'dedupe_index.jsonl')
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3             # palavras por n-grama
+MIN_SHINGLES = 8             # abaixo disso o simhash não separa textos: só conteúdo idêntico conta
+MAX_DISTANCE = 3             # bits diferentes aceitos quando só o conteúdo liga as duas
+SAME_PROCESS_DISTANCE = 10   # bits diferentes aceitos quando o CNJ é o mesmo
+
+# CNJ sem máscara ou com separadores trocados: 20 dígitos em 6 grupos
+_CNJ_DIGITS = re.compile(
+    r'(?<!\d)(\d{7})[\s.-]?(\d{2})[\s.-]?(\d{4})[\s.-]?(\d)[\s.-]?(\d{2})[\s.-]?(\d{4})(?!\d)'
+)
+
+
+def normalize_cnj(text):
+    """CNJ no formato NNNNNNN-DD.AAAA.J.TT.OOOO, com ou sem máscara no texto; '' se não houver"""
+    text = text or ''
+    masked = extract_process_number(text)
+    if masked:
+        return masked
+    match = _CNJ_DIGITS.search(text)
+    if not match:
+        return ''
+    return '{}-{}.{}.{}.{}.{}'.format(*match.groups())
+
+
+def _tokens(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def _words(text):
+    """Minúsculas, sem acentos e só palavras: números (CNJ, datas, OAB) mudam de formato entre as fontes"""
+    return [w for w in _tokens(text) if not w.isdigit()]
+
+
+def content_numbers(text):
+    """
+    Números do conteúdo, sem os CNJ e sem zeros à esquerda (ordenados, sem repetição)
+
+    O simhash ignora números; são eles que separam duas publicações do mesmo
+    modelo (mesmo processo, outra data ou outro prazo).
+    """
+    text = _CNJ_DIGITS.sub(' ', text or '')
+    return sorted({str(int(w)) for w in _tokens(text) if w.isdigit()})
+
+
+def content_simhash(text):
+    """
+    Simhash de 64 bits do conteúdo (0 quando o texto é curto demais para comparar)
+
+    Cada n-grama de SHINGLE_SIZE palavras vota em cada bit; textos quase iguais
+    diferem em poucos bits. Usa blake2b, e não hash(): o valor fica gravado no
+    índice e precisa ser o mesmo em todas as execuções.
+    """
+    words = _words(text)
+    size = min(SHINGLE_SIZE, len(words))
+    grams = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)} if words else set()
+    if len(grams) < MIN_SHINGLES:
+        return 0
+    import numpy as np
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=8).digest(), 'little') for g in grams),
+        dtype=np.uint64, count=len(grams)
+    )
+    bits = np.unpackbits(hashes.astype('<u8').view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    majority = bits.sum(axis=0) * 2 > len(grams)
+    return int(np.packbits(majority, bitorder='little').view('<u8')[0])
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class CrossSourceIndex:
+    """
+    Publicações que já viraram tarefa (criada ou já existente), de qualquer fonte
+
+    Uma publicação nova é duplicata de uma indexada quando:
+    - o conteúdo normalizado é idêntico (só o processo veio escrito diferente), ou
+    - o CNJ é o mesmo e os simhash diferem em até same_process_distance bits, ou
+    - sem CNJ em comum (um dos lados não tem), os simhash diferem em até max_distance bits.
+    Nos dois últimos casos os números de um texto também precisam estar contidos
+    nos do outro: uma fonte pode acrescentar a data de disponibilização, mas
+    outra data ou outro prazo é outra publicação do mesmo modelo (o índice é
+    permanente e sem isso a nova seria pulada para sempre).
+    CNJs diferentes nunca são duplicatas. A mesma impressão digital também não:
+    repetir a mesma publicação é assunto do diário (TaskJournal).
+
+    Buscas sem varrer o histórico: dicionários por CNJ e por hash do conteúdo,
+    e o simhash quebrado em max_distance + 1 faixas — duas assinaturas a até
+    max_distance bits de distância têm ao menos uma faixa idêntica (casa dos
+    pombos), então basta olhar os baldes das faixas.
+
+    Persistência em JSONL só de acréscimo (path=None: só em memória).
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, max_distance=MAX_DISTANCE,
+                 same_process_distance=SAME_PROCESS_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        self.same_process_distance = same_process_distance
+        bands = max_distance + 1
+        widths = [SIMHASH_BITS // bands + (1 if i < SIMHASH_BITS % bands else 0) for i in range(bands)]
+        self._bands = [(sum(widths[:i]), (1 << w) - 1) for i, w in enumerate(widths)]
+        self._lock = threading.Lock()
+        self._by_fingerprint = {}
+        self._by_cnj = {}
+        self._by_content = {}
+        self._by_band = {}
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            # Última linha cortada por uma queda no meio da escrita (ver TaskJournal._load)
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                f.truncate(end)
+        for line in data[:end].decode('utf-8').splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._index(entry)
+
+    def _band_keys(self, simhash):
+        return [(i, (simhash >> shift) & mask) for i, (shift, mask) in enumerate(self._bands)]
+
+    def _index(self, entry):
+        if entry['fingerprint'] in self._by_fingerprint:
+            return
+        self._by_fingerprint[entry['fingerprint']] = entry
+        if entry['cnj_key']:
+            self._by_cnj.setdefault(entry['cnj_key'], []).append(entry)
+        self._by_content.setdefault(entry['content_hash'], []).append(entry)
+        if entry['simhash']:
+            for key in self._band_keys(entry['simhash']):
+                self._by_band.setdefault(key, []).append(entry)
+
+    def __len__(self):
+        return len(self._by_fingerprint)
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+    def find(self, pub):
+        """Entrada indexada da qual `pub` é duplicata (dict), ou None"""
+        cnj = pub.cnj_key
+
+        def _compatible(entry):
+            return not (cnj and entry['cnj_key'] and entry['cnj_key'] != cnj)
+
+        def _same_numbers(entry):
+            # Entradas gravadas antes dos números só valem com conteúdo idêntico
+            if entry.get('numbers') is None:
+                return False
+            theirs = set(entry['numbers'])
+            return numbers <= theirs or theirs <= numbers
+
+        with self._lock:
+            if pub.fingerprint in self._by_fingerprint:
+                return None
+            for entry in self._by_content.get(pub.content_hash, ()):
+                if _compatible(entry):
+                    return entry
+            simhash = pub.simhash
+            if not simhash:
+                return None
+            numbers = set(pub.numbers)
+            for entry in self._by_cnj.get(cnj, ()) if cnj else ():
+                if (entry['simhash'] and hamming(entry['simhash'], simhash) <= self.same_process_distance
+                        and _same_numbers(entry)):
+                    return entry
+            for key in self._band_keys(simhash):
+                for entry in self._by_band.get(key, ()):
+                    if (_compatible(entry) and hamming(entry['simhash'], simhash) <= self.max_distance
+                            and _same_numbers(entry)):
+                        return entry
+        return None
+
+    # ── Escrita ──────────────────────────────────────────────────────────────
+    def add(self, pub):
+        """Indexa a publicação (nada acontece se a impressão digital já estiver no índice)"""
+        entry = {
+            'fingerprint': pub.fingerprint,
+            'cnj_key': pub.cnj_key,
+            'content_hash': pub.content_hash,
+            'simhash': pub.simhash,
+            'numbers': pub.numbers,
+            'origem': pub.origem,
+            'process_number': pub.process_number,
+            'ts': time.time()
+        }
+        with self._lock:
+            if pub.fingerprint in self._by_fingerprint:
+                return
+            if self.path is not None:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._index(entry)
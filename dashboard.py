@@ -4,24 +4,40 @@ Dashboard de Gerenciamento da Automação Gmail → MeisterTask
 Sistema com validação manual em múltiplas etapas e gerenciamento de duplicatas
 """
 import streamlit as st
+import functools
 import json
 import os
 import subprocess
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
-import pickle
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 import base64
 from email.mime.text import MIMEText
 import re
-from openai import OpenAI
-import html2text
 import requests
-from djne_scraper import buscar_publicacoes_djne
+# Bibliotecas pesadas (Google API, pandas, html2text, djne_scraper/bs4, numpy)
+# são importadas só nas funções que as usam, para acelerar o cold start
+from meistertask_api import (
+    scan_project_tasks,
+    find_cross_section_duplicates,
+    locked_duplicate_ids,
+    MeisterTaskError,
+    get_meistertask_client,
+)
+from config import get_settings
+from gmail_client import GmailClient, search_emails
+from task_mirror import TaskMirror
+from task_journal import TaskJournal
+from retry_queue import RetryQueue, RetryWorker, STATUS_RETRY, STATUS_DEAD
+from background_jobs import (
+    build_job_manager, JobBusyError, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_INTERRUPTED
+)
+from publication import ORIGEM_DJNE, ORIGEM_GMAIL
+from publication_store import PublicationStore
+from cross_source_dedupe import CrossSourceIndex
+from client_matcher import ClientMatcher
+from publications import consolidate_publications, gmail_publications
+from rerun_profiler import RerunProfiler
 
 # Configuração da página
 st.set_page_config(
@@ -31,6 +47,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Perfilador de reruns (um por sessão; o resultado aparece no rodapé se habilitado)
+profiler = st.session_state.setdefault('rerun_profiler', RerunProfiler())
+profiler.start()
+
 # ── Tema visual ──────────────────────────────────────────────────────────────
 st.markdown("""
 <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
@@ -123,17 +143,52 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Função para carregar variáveis do .env
-def load_env_var(key, default=''):
-    """Carrega variável do arquivo .env"""
-    if os.path.exists('.env'):
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    k, v = line.strip().split('=', 1)
-                    if k == key:
-                        return v
-    return default
+# Espelho local das tarefas do MeisterTask (um por processo do servidor)
+@st.cache_resource
+def get_task_mirror():
+    return TaskMirror()
+
+# Diário de criação de tarefas (sobrevive a quedas da sessão)
+@st.cache_resource
+def get_task_journal():
+    return TaskJournal()
+
+# Fila de novas tentativas (persistente) e o worker que a esvazia em segundo plano
+@st.cache_resource
+def get_retry_queue():
+    return RetryQueue()
+
+# Arquivo das publicações já vistas (busca no histórico)
+@st.cache_resource
+def get_publication_store():
+    return PublicationStore()
+
+# Publicações já enviadas ao MeisterTask, de qualquer fonte (deduplicação Gmail x DJNE)
+@st.cache_resource
+def get_dedupe_index():
+    return CrossSourceIndex()
+
+# Clientes citados nas publicações (relido quando o arquivo da lista muda)
+@st.cache_resource
+def _load_client_matcher(path, mtime):
+    return ClientMatcher.load(path)
+
+def get_client_matcher():
+    path = get_settings().client_roster_file
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    return _load_client_matcher(path, mtime)
+
+# Lotes em segundo plano (criação e exclusão), compartilhados entre as sessões
+@st.cache_resource
+def get_job_manager():
+    return build_job_manager()
+
+@st.cache_resource
+def get_retry_worker(api_token):
+    worker = RetryWorker(get_retry_queue(), api_token,
+                         journal=get_task_journal(), mirror=get_task_mirror())
+    worker.start()
+    return worker
 
 # Inicializar session state
 if 'current_step' not in st.session_state:
@@ -149,16 +204,23 @@ if 'filtered_emails' not in st.session_state:
     st.session_state.filtered_emails = []
 
 if 'selected_email_ids' not in st.session_state:
-    st.session_state.selected_email_ids = []
+    st.session_state.selected_email_ids = set()
 
 if 'extracted_publications' not in st.session_state:
     st.session_state.extracted_publications = []
 
+if 'skipped_email_copies' not in st.session_state:
+    st.session_state.skipped_email_copies = 0  # e-mails repetidos (encaminhados) não extraídos
+
 if 'selected_publication_ids' not in st.session_state:
-    st.session_state.selected_publication_ids = []
+    st.session_state.selected_publication_ids = set()
 
 if 'task_creation_results' not in st.session_state:
     st.session_state.task_creation_results = None
+if 'creation_job_id' not in st.session_state:
+    st.session_state.creation_job_id = None
+if 'delete_job_id' not in st.session_state:
+    st.session_state.delete_job_id = None
 
 if 'tasks_to_delete' not in st.session_state:
     st.session_state.tasks_to_delete = []
@@ -188,617 +250,21 @@ if st.session_state.current_step > 2 and not st.session_state.selected_email_ids
     st.session_state.current_step = 1
 if st.session_state.current_step > 3 and not st.session_state.extracted_publications:
     st.session_state.current_step = 1
+# Cliente do Gmail: credenciais e documento de descoberta carregados uma vez por processo
+@st.cache_resource
+def get_gmail_client():
+    return GmailClient()
+
 # Função para conectar ao Gmail
 def get_gmail_service():
-    """Conecta ao Gmail API"""
-    SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
-    creds = None
-    
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if not os.path.exists('credentials.json'):
-                return None
-            flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-            creds = flow.run_local_server(port=8080)
-        
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
-    
-    return build('gmail', 'v1', credentials=creds)
-
-# Função para buscar emails com filtros
-def search_emails(service, filters):
-    """Busca emails baseado nos filtros"""
-    if not service:
-        return []
-    
-    query_parts = []
-    
-    # Filtro de texto (assunto ou corpo) - busca mais específica
-    if filters.get('text_search'):
-        # Busca no assunto OU no corpo do email
-        query_parts.append(f'(subject:{filters["text_search"]} OR {filters["text_search"]})')
-    
-    # Filtro de data - ajusta para incluir as datas selecionadas
-    # Gmail usa 'after' e 'before' de forma EXCLUSIVA, então ajustamos:
-    if filters.get('date_from'):
-        # Subtrai 1 dia para incluir a data selecionada
-        date_obj = filters['date_from'] if hasattr(filters['date_from'], 'strftime') else datetime.strptime(filters['date_from'], '%Y/%m/%d').date()
-        adjusted_date = date_obj - timedelta(days=1)
-        query_parts.append(f'after:{adjusted_date.strftime("%Y/%m/%d")}')
-    if filters.get('date_to'):
-        # Adiciona 1 dia para incluir a data selecionada
-        date_obj = filters['date_to'] if hasattr(filters['date_to'], 'strftime') else datetime.strptime(filters['date_to'], '%Y/%m/%d').date()
-        adjusted_date = date_obj + timedelta(days=1)
-        query_parts.append(f'before:{adjusted_date.strftime("%Y/%m/%d")}')
-    
-    # Filtro de lido/não lido
-    if filters.get('read_status') == 'unread':
-        query_parts.append('is:unread')
-    elif filters.get('read_status') == 'read':
-        query_parts.append('is:read')
-    
-    query = ' '.join(query_parts) if query_parts else 'in:inbox'
-    
-    try:
-        results = service.users().messages().list(
-            userId='me',
-            q=query,
-            maxResults=50
-        ).execute()
-        
-        messages = results.get('messages', [])
-        
-        email_list = []
-        for msg in messages:
-            msg_data = service.users().messages().get(
-                userId='me',
-                id=msg['id'],
-                format='full'
-            ).execute()
-            
-            headers = msg_data['payload']['headers']
-            subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'Sem assunto')
-            sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Desconhecido')
-            date = next((h['value'] for h in headers if h['name'].lower() == 'date'), 'Sem data')
-            
-            # Extrair corpo do email
-            body = extract_email_body(msg_data)
-            
-            # Verificar se está lido
-            is_read = 'UNREAD' not in msg_data.get('labelIds', [])
-            
-            email_list.append({
-                'id': msg['id'],
-                'subject': subject,
-                'sender': sender,
-                'date': date,
-                'body': body,
-                'is_read': is_read,
-                'raw_data': msg_data
-            })
-        
-        return email_list
-    
-    except Exception as e:
-        st.error(f"Erro ao buscar emails: {str(e)}")
-        return []
-
-# Função para extrair corpo do email
-def extract_email_body(message):
-    """Extrai o corpo do email e converte HTML para texto plano"""
-    h = html2text.HTML2Text()
-    h.ignore_links = False
-    h.ignore_images = True
-    h.ignore_emphasis = False
-    h.body_width = 0  # Sem quebra de linha automática
-    
-    try:
-        if 'parts' in message['payload']:
-            parts = message['payload']['parts']
-            body = ''
-            html_body = ''
-            
-            # Prioriza text/plain, mas guarda HTML como fallback
-            for part in parts:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        body += base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                elif part['mimeType'] == 'text/html':
-                    if 'data' in part['body']:
-                        html_body += base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-            
-            # Se não tem text/plain, converte HTML para texto
-            if not body and html_body:
-                body = h.handle(html_body)
-            
-            return body
-        else:
-            if 'data' in message['payload']['body']:
-                raw_data = base64.urlsafe_b64decode(message['payload']['body']['data']).decode('utf-8')
-                # Se parece com HTML, converte para texto
-                if raw_data.strip().startswith('<'):
-                    return h.handle(raw_data)
-                return raw_data
-    except:
-        return "Não foi possível extrair o corpo do email"
-    
-    return ""
-
-# Função para extrair publicações de um email
-def extract_publications_from_email(email_body, email_subject):
-    """
-    Extrai múltiplas publicações de processos judiciais de um email
-    Usa APENAS números como separadores (Publicação: 1, 2, 3...)
-    Ignora "Publicação: Intimacao" e similares
-    """
-    publications = []
-    
-    # Padrão SIMPLES e DIRETO: Publicação seguido de número
-    pattern = r'Publicação:\s*(\d+)\s+'
-    pub_matches = list(re.finditer(pattern, email_body, re.IGNORECASE))
-    
-    if pub_matches:
-        for i, match in enumerate(pub_matches):
-            start_pos = match.start()
-            end_pos = pub_matches[i + 1].start() if i + 1 < len(pub_matches) else len(email_body)
-            pub_content = email_body[start_pos:end_pos].strip()
-            
-            process_pattern_marked = r'PROCESSO:\s*(\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4})'
-            process_match_marked = re.search(process_pattern_marked, pub_content, re.IGNORECASE)
-            if process_match_marked:
-                process_number = process_match_marked.group(1)
-            else:
-                process_pattern = r'(\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4})'
-                process_match = re.search(process_pattern, pub_content)
-                process_number = process_match.group(0) if process_match else f'Publicação {match.group(1)}'
-            
-            publications.append({
-                'process_number': process_number,
-                'content': pub_content,
-                'source_subject': email_subject
-            })
-        return publications
-    
-    # Tenta 'PROCESSO:' como separador
-    process_pattern = r'PROCESSO:\s*(\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4})'
-    process_matches = list(re.finditer(process_pattern, email_body, re.IGNORECASE))
-    if process_matches:
-        for i, match in enumerate(process_matches):
-            process_number = match.group(1)
-            start = max(0, match.start() - 200)
-            end = process_matches[i + 1].start() if i + 1 < len(process_matches) else len(email_body)
-            pub_content = email_body[start:end].strip()
-            publications.append({
-                'process_number': process_number,
-                'content': pub_content,
-                'source_subject': email_subject
-            })
-        return publications
-    
-    # Fallback: padrão direto de processo
-    process_pattern_simple = r'\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4}'
-    process_matches_simple = list(re.finditer(process_pattern_simple, email_body))
-    if process_matches_simple:
-        for match in process_matches_simple:
-            process_number = match.group(0)
-            start = max(0, match.start() - 200)
-            end = min(len(email_body), match.end() + 1500)
-            pub_content = email_body[start:end].strip()
-            publications.append({
-                'process_number': process_number,
-                'content': pub_content,
-                'source_subject': email_subject
-            })
-        return publications
-    
-    # Nenhum padrão encontrado — trata como publicação única
-    publications.append({
-        'process_number': 'Sem número identificado',
-        'content': email_body[:5000],
-        'source_subject': email_subject
-    })
-    return publications
-
-# Função para extrair nomes das partes de uma publicação
-def extract_parties_from_publication(pub_content):
-    """
-    Extrai nomes das partes (autor/requerente vs réu/requerido) de uma publicação
-    """
-    parties = ""
-    
-    # Padrões comuns para identificar partes
-    patterns = [
-        # REQUERENTE: NOME vs REQUERIDO: NOME
-        r'REQUERENTE:\s*([^\n]+).*?REQUERIDO:\s*([^\n]+)',
-        # EXEQUENTE: NOME vs EXECUTADO: NOME
-        r'EXEQUENTE:\s*([^\n]+).*?EXECUTADO:\s*([^\n]+)',
-        # AUTOR: NOME vs RÉU: NOME
-        r'AUTOR:\s*([^\n]+).*?R[ÉE]U:\s*([^\n]+)',
-        # APELANTE: NOME vs APELADO: NOME
-        r'APELANTE:\s*([^\n]+).*?APELADO:\s*([^\n]+)',
-        # RECORRENTE: NOME vs RECORRIDO: NOME
-        r'RECORRENTE:\s*([^\n]+).*?RECORRIDO:\s*([^\n]+)',
-        # EMBARGANTE: NOME vs EMBARGADO: NOME
-        r'EMBARGANTE:\s*([^\n]+).*?EMBARGADO:\s*([^\n]+)',
-        # AGRAVANTE: NOME vs AGRAVADO: NOME
-        r'AGRAVANTE:\s*([^\n]+).*?AGRAVADO:\s*([^\n]+)',
-        # INTERESSADO: NOME vs INTERESSADO: NOME (segunda parte)
-        r'INTERESSADO:\s*([^\n]+).*?INTERESSADO:\s*([^\n]+)',
-        # IMPETRADO vs IMPETRANTE
-        r'IMPETRANTE:\s*([^\n]+).*?IMPETRADO:\s*([^\n]+)',
-        # CONSULENTE: NOME vs CONSULADO: NOME
-        r'CONSULENTE:\s*([^\n]+).*?CONSULADO:\s*([^\n]+)',
-        # Partes: NOME vs NOME
-        r'Partes:\s*([^\n]+?)\s+vs\s+([^\n]+)',
-        # Parte Autora vs Parte Ré (genérico)
-        r'Parte\s+(?:Autora|Ativa):\s*([^\n]+).*?Parte\s+(?:R[ée]|Passiva):\s*([^\n]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, pub_content, re.IGNORECASE | re.DOTALL)
-        if match:
-            party1 = match.group(1).strip()
-            party2 = match.group(2).strip()
-            
-            # Remove CPF/CNPJ e números
-            party1 = re.sub(r'\d{11,}', '', party1).strip()
-            party2 = re.sub(r'\d{11,}', '', party2).strip()
-            
-            # Limita tamanho
-            if len(party1) > 50:
-                party1 = party1[:50].strip()
-            if len(party2) > 50:
-                party2 = party2[:50].strip()
-            
-            parties = f"{party1} x {party2}"
-            break
-    
-    # Se não encontrou padrão, tenta pegar primeiros nomes encontrados
-    if not parties:
-        # Procura por linhas que começam com POLO ATIVO/PASSIVO
-        polo_ativo = re.search(r'POLO ATIVO:\s*([^\n]+)', pub_content, re.IGNORECASE)
-        polo_passivo = re.search(r'POLO PASSIVO:\s*([^\n]+)', pub_content, re.IGNORECASE)
-        
-        if polo_ativo and polo_passivo:
-            party1 = polo_ativo.group(1).strip()[:50]
-            party2 = polo_passivo.group(1).strip()[:50]
-            parties = f"{party1} x {party2}"
-    
-    # Se ainda não encontrou, tenta buscar padrão genérico de qualquer parte
-    if not parties:
-        # Busca por palavras-chave de tipos de partes (captura múltiplas ocorrências)
-        parte_keywords = r'(?:INTERESSADO|APELANTE|APELADO|RECORRENTE|RECORRIDO|REQUERENTE|REQUERIDO|EXEQUENTE|EXECUTADO|AUTOR|R[ÉE]U|EMBARGANTE|EMBARGADO|AGRAVANTE|AGRAVADO|IMPETRANTE|IMPETRADO)'
-        matches = re.findall(rf'{parte_keywords}[:\s]+([^\n]+)', pub_content, re.IGNORECASE)
-        
-        if len(matches) >= 2:
-            # Pega as duas primeiras partes encontradas
-            party1 = matches[0].strip()
-            party2 = matches[1].strip()
-            
-            # Remove CPF/CNPJ e números
-            party1 = re.sub(r'\d{11,}', '', party1).strip()
-            party2 = re.sub(r'\d{11,}', '', party2).strip()
-            
-            # Limita tamanho
-            if len(party1) > 50:
-                party1 = party1[:50].strip()
-            if len(party2) > 50:
-                party2 = party2[:50].strip()
-            
-            parties = f"{party1} x {party2}"
-    
-    return parties if parties else "Partes não identificadas"
-
-# Função para criar tarefa no MeisterTask
-def create_meistertask_task(process_number, parties, description, section_id, api_token):
-    """
-    Cria uma tarefa no MeisterTask via API
-    """
-    url = f"https://www.meistertask.com/api/sections/{section_id}/tasks"
-    
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json"
-    }
-    
-    # Título: [numero do processo] - [nome das partes]
-    title = f"{process_number} - {parties}"
-    
-    # Limita tamanho do título (MeisterTask tem limite)
-    if len(title) > 250:
-        title = title[:247] + "..."
-    
-    payload = {
-        "name": title,
-        "notes": description
-    }
-    
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        
-        # MeisterTask retorna 200 ou 201 para sucesso
-        if response.status_code in [200, 201]:
-            return True, response.json()
-        else:
-            error_detail = f"Status {response.status_code}: {response.text}"
-            return False, error_detail
-            
-    except requests.exceptions.RequestException as e:
-        return False, f"Erro de conexão: {str(e)}"
-
-
-def list_meistertask_tasks(section_id, api_token):
-    """
-    Lista TODAS as tarefas de uma seção do MeisterTask (com paginação)
-    A API retorna no máximo 50 tarefas por página, então precisamos fazer múltiplas requisições
-    """
-    # Validação básica dos parâmetros
-    if not section_id or not api_token:
-        return False, "❌ Section ID ou API Token não configurados"
-    
-    all_tasks = []
-    page = 1
-    
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json"
-    }
-    
-    try:
-        while True:
-            # MeisterTask usa offset/limit ao invés de page/per_page
-            offset = (page - 1) * 50
-            url = f"https://www.meistertask.com/api/sections/{section_id}/tasks"
-            
-            # Tenta com parâmetros de paginação
-            params = {"limit": 100, "offset": offset}
-            
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                tasks = response.json()
-                
-                # Se não retornou tarefas, chegamos ao fim
-                if not tasks or len(tasks) == 0:
-                    break
-                
-                all_tasks.extend(tasks)
-                
-                # Se retornou menos que 50, é a última página
-                if len(tasks) < 50:
-                    break
-                
-                # Vai para próxima página
-                page += 1
-                
-                # Proteção contra loop infinito
-                if page > 20:  # Máximo 1000 tarefas (20 páginas x 50)
-                    break
-            
-            elif response.status_code == 404:
-                # Section ID inválido ou não existe
-                error_msg = f"""
-❌ **Erro 404: Seção não encontrada**
-
-A seção com ID `{section_id}` não existe ou você não tem acesso a ela.
-
-**Possíveis causas:**
-1. O `MEISTERTASK_SECTION_ID` no arquivo `.env` está incorreto
-2. A seção foi deletada do MeisterTask
-3. Você não tem permissão para acessar esta seção
-
-**Como corrigir:**
-1. Acesse o MeisterTask no navegador
-2. Vá até o quadro/projeto desejado
-3. Abra a seção "Publicações" (ou outra que deseja usar)
-4. Copie o ID da seção da URL (número após `/sections/`)
-5. Atualize o valor de `MEISTERTASK_SECTION_ID` no arquivo `.env`
-
-**ID atual configurado:** `{section_id}`
-"""
-                return False, error_msg
-            
-            elif response.status_code == 401:
-                # Token inválido ou expirado
-                error_msg = """
-❌ **Erro 401: Não autorizado**
-
-O token de API está inválido ou expirado.
-
-**Como corrigir:**
-1. Acesse o MeisterTask: Account Settings → Developer
-2. Gere um novo token de API
-3. Atualize `MEISTERTASK_API_TOKEN` no arquivo `.env`
-"""
-                return False, error_msg
-            
-            elif response.status_code == 403:
-                # Sem permissão
-                return False, f"❌ Erro 403: Sem permissão para acessar a seção {section_id}"
-            
-            else:
-                # Outros erros
-                try:
-                    error_detail = response.json()
-                    error_msg = error_detail.get('message', response.text[:200])
-                except:
-                    error_msg = response.text[:200]
-                return False, f"❌ Erro HTTP {response.status_code}: {error_msg}"
-        
-        return True, all_tasks
-            
-    except requests.exceptions.Timeout:
-        return False, "❌ Timeout: A requisição demorou mais de 30 segundos"
-    except requests.exceptions.ConnectionError:
-        return False, "❌ Erro de conexão: Verifique sua internet"
-    except requests.exceptions.RequestException as e:
-        return False, f"❌ Erro de conexão: {str(e)}"
-
-
-def get_meistertask_task(task_id, api_token):
-    """
-    Busca informações de uma tarefa específica do MeisterTask
-    """
-    url = f"https://www.meistertask.com/api/tasks/{task_id}"
-    
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json"
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, timeout=30)
-        
-        if response.status_code == 200:
-            return True, response.json()
-        elif response.status_code == 404:
-            return False, "404_NOT_FOUND"
-        else:
-            return False, f"HTTP_{response.status_code}"
-            
-    except requests.exceptions.RequestException as e:
-        return False, f"CONNECTION_ERROR: {str(e)}"
-
-
-def delete_meistertask_task(task_id, api_token):
-    """
-    Move uma tarefa do MeisterTask para a lixeira (trash)
-    A API do MeisterTask usa PUT com status=18 para enviar tarefas para a lixeira
-    
-    Retorna:
-        (bool, str): (sucesso, mensagem)
-        - True se a tarefa foi deletada ou já estava deletada (404)
-        - False apenas se houver um erro real que impeça a operação
-    """
-    url = f"https://www.meistertask.com/api/tasks/{task_id}"
-    
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json"
-    }
-    
-    try:
-        # Tenta mover para lixeira (trash) usando status=18
-        trash_data = {"status": 18}
-        response = requests.put(url, headers=headers, json=trash_data, timeout=30)
-        
-        if response.status_code in [200, 204]:
-            # Sucesso: tarefa movida para lixeira
-            if response.status_code == 200:
-                try:
-                    result = response.json()
-                    new_status = result.get('status', 'unknown')
-                    return True, f"✓ Tarefa ID {task_id[:8]}... movida para lixeira (status: {new_status})"
-                except:
-                    return True, f"✓ Tarefa ID {task_id[:8]}... movida para lixeira"
-            return True, f"✓ Tarefa ID {task_id[:8]}... deletada com sucesso"
-        
-        elif response.status_code == 404:
-            # 404 NOT_FOUND: tarefa já foi deletada anteriormente ou nunca existiu
-            # Consideramos como SUCESSO pois o objetivo (tarefa não existir) foi alcançado
-            return True, f"⚠ Tarefa ID {task_id[:8]}... já estava deletada (404: NOT_FOUND)"
-        
-        elif response.status_code == 403:
-            # 403 FORBIDDEN: sem permissão
-            return False, f"✗ Sem permissão para deletar tarefa ID {task_id[:8]}... (403: FORBIDDEN)"
-        
-        elif response.status_code == 400:
-            # 400 BAD_REQUEST: parâmetros inválidos
-            try:
-                error_detail = response.json()
-                error_msg = error_detail.get('message', response.text[:200])
-            except:
-                error_msg = response.text[:200]
-            return False, f"✗ Requisição inválida para tarefa ID {task_id[:8]}... (400): {error_msg}"
-        
-        else:
-            # Outros erros HTTP
-            try:
-                error_msg = response.text[:200]
-            except:
-                error_msg = "Resposta não disponível"
-            return False, f"✗ Erro HTTP {response.status_code} ao deletar tarefa ID {task_id[:8]}...: {error_msg}"
-            
-    except requests.exceptions.Timeout:
-        return False, f"✗ Timeout ao deletar tarefa ID {task_id[:8]}... (>30s)"
-    except requests.exceptions.ConnectionError:
-        return False, f"✗ Erro de conexão ao deletar tarefa ID {task_id[:8]}..."
-    except requests.exceptions.RequestException as e:
-        return False, f"✗ Erro de rede ao deletar tarefa ID {task_id[:8]}...: {str(e)[:100]}"
-
-
-def extract_process_number(task_name):
-    """
-    Extrai o número do processo do nome da tarefa.
-    Formato esperado: "XXXXXXX-XX.XXXX.X.XX.XXXX - Nome das Partes"
-    Aceita variações com 1 ou 2 dígitos no segmento do meio
-    """
-    import re
-    # Padrão mais flexível para número de processo brasileiro
-    # Aceita: NNNNNNN-DD.AAAA.J.TT.OOOO onde J pode ser 1 ou 2 dígitos
-    pattern = r'(\d{7}-\d{2}\.\d{4}\.\d{1,2}\.\d{2}\.\d{4})'
-    match = re.search(pattern, task_name)
-    if match:
-        return match.group(1)
-    return None
-
-
-def find_duplicate_tasks(tasks, only_unassigned=True):
-    """
-    Identifica tarefas duplicadas baseadas no número do processo
-    Retorna um dicionário: {numero_processo: [lista de tarefas]}
-    
-    Args:
-        tasks: Lista de tarefas do MeisterTask
-        only_unassigned: Se True, considera apenas tarefas sem responsável designado
-    """
-    # Primeiro, filtra tarefas sem responsável se solicitado
-    if only_unassigned:
-        filtered_tasks = [task for task in tasks if not task.get('assigned_to_id')]
-    else:
-        filtered_tasks = tasks
-    
-    process_dict = {}
-    seen_task_ids = set()
-    tasks_without_process = []  # Tarefas sem número de processo válido
-    
-    for task in filtered_tasks:
-        task_id = task.get('id')
-        task_name = task.get('name', '')
-        
-        # Pula se já vimos esta tarefa
-        if task_id in seen_task_ids:
-            continue
-        
-        process_number = extract_process_number(task_name)
-        
-        # Só agrupa tarefas que TÊM número de processo válido
-        if process_number:
-            if process_number not in process_dict:
-                process_dict[process_number] = []
-            
-            process_dict[process_number].append(task)
-            seen_task_ids.add(task_id)
-        else:
-            # Tarefa sem número de processo - não agrupa
-            tasks_without_process.append(task_name[:80])
-    
-    # Filtra APENAS processos que têm MAIS DE UMA tarefa
-    duplicates = {k: v for k, v in process_dict.items() if len(v) > 1}
-    
-    return duplicates
+    """Conecta ao Gmail API (serviço reaproveitado entre buscas)"""
+    return get_gmail_client().service()
+
 # =============================================================================
 # SESSION STATE — navegação por páginas
 # =============================================================================
 if 'page' not in st.session_state:
-    st.session_state.page = 'home'  # home | source_select | flow | duplicatas
+    st.session_state.page = 'home'  # home | source_select | flow | duplicatas | fila | busca
 if 'fonte_dados' not in st.session_state:
     st.session_state.fonte_dados = None  # 'Gmail' | 'DJNE'
 if 'current_step' not in st.session_state:
@@ -806,17 +272,23 @@ if 'current_step' not in st.session_state:
 if 'filtered_emails' not in st.session_state:
     st.session_state.filtered_emails = []
 if 'selected_email_ids' not in st.session_state:
-    st.session_state.selected_email_ids = []
+    st.session_state.selected_email_ids = set()
 if 'extracted_publications' not in st.session_state:
     st.session_state.extracted_publications = []
 if 'selected_publication_ids' not in st.session_state:
-    st.session_state.selected_publication_ids = []
+    st.session_state.selected_publication_ids = set()
 if 'task_creation_results' not in st.session_state:
     st.session_state.task_creation_results = None
+if 'creation_job_id' not in st.session_state:
+    st.session_state.creation_job_id = None
+if 'delete_job_id' not in st.session_state:
+    st.session_state.delete_job_id = None
 if 'found_tasks' not in st.session_state:
     st.session_state.found_tasks = None
 if 'found_duplicates' not in st.session_state:
     st.session_state.found_duplicates = None
+if 'found_near_duplicates' not in st.session_state:
+    st.session_state.found_near_duplicates = []
 if 'filters' not in st.session_state:
     st.session_state.filters = {
         'text_search': '',
@@ -830,18 +302,297 @@ def go(page, reset_flow=False):
     if reset_flow:
         st.session_state.current_step = 1
         st.session_state.filtered_emails = []
-        st.session_state.selected_email_ids = []
+        st.session_state.selected_email_ids = set()
         st.session_state.extracted_publications = []
-        st.session_state.selected_publication_ids = []
+        st.session_state.skipped_email_copies = 0
+        st.session_state.selected_publication_ids = set()
         st.session_state.task_creation_results = None
+        st.session_state.creation_job_id = None
         st.session_state.fonte_dados = None
     st.rerun()
 
+# Helper: lista de revisão paginada (passos 2 e 3)
+# Só a página visível vira widget; o conteúdo só é enviado ao navegador quando aberto.
+# A seleção fica num set (passado em `selected`), alterado pelos callbacks dos checkboxes.
+REVIEW_PAGE_SIZE = 20
+
+def _review_toggle(selected, item_id, widget_key):
+    if st.session_state[widget_key]:
+        selected.add(item_id)
+    else:
+        selected.discard(item_id)
+
+def _review_goto(page_key, page):
+    st.session_state[page_key] = page
+
+def render_review_list(key, items, selected, item_id, label, search_text, render_content,
+                       select_label='Selecionar'):
+    col_f, col_v = st.columns([3, 1])
+    with col_f:
+        query = st.text_input('Filtrar', key=f'{key}_filter', placeholder='Buscar por processo, assunto, texto...',
+                              label_visibility='collapsed').strip().lower()
+    with col_v:
+        view = st.selectbox('Mostrar', ['todos', 'selecionados', 'nao_selecionados'], key=f'{key}_view',
+                            format_func={'todos': 'Todos', 'selecionados': 'Selecionados',
+                                         'nao_selecionados': 'Não selecionados'}.get,
+                            label_visibility='collapsed')
+
+    visible = items
+    if query:
+        visible = [it for it in visible if query in search_text(it)]
+    if view == 'selecionados':
+        visible = [it for it in visible if item_id(it) in selected]
+    elif view == 'nao_selecionados':
+        visible = [it for it in visible if item_id(it) not in selected]
+
+    col_all, col_none, col_info = st.columns([1, 1, 2])
+    with col_all:
+        if st.button(f'☑️ Marcar {len(visible)}', key=f'{key}_all', use_container_width=True):
+            selected.update(item_id(it) for it in visible)
+    with col_none:
+        if st.button(f'⬜ Desmarcar {len(visible)}', key=f'{key}_none', use_container_width=True):
+            selected.difference_update(item_id(it) for it in visible)
+    with col_info:
+        st.caption(f'{len(selected)} de {len(items)} selecionado(s)'
+                   + (f' — {len(visible)} no filtro' if len(visible) != len(items) else ''))
+
+    pages = max(1, -(-len(visible) // REVIEW_PAGE_SIZE))
+    page_key = f'{key}_page'
+    page = min(st.session_state.get(page_key, 1), pages)
+    start = (page - 1) * REVIEW_PAGE_SIZE
+
+    for it in visible[start:start + REVIEW_PAGE_SIZE]:
+        iid = item_id(it)
+        widget_key = f'{key}_sel_{iid}'
+        # O estado do checkbox é sempre derivado do set (vale para ações em lote e troca de página)
+        st.session_state[widget_key] = iid in selected
+        col_ck, col_lbl, col_open = st.columns([1, 8, 1])
+        with col_ck:
+            st.checkbox(select_label, key=widget_key, label_visibility='collapsed',
+                        on_change=_review_toggle, args=(selected, iid, widget_key))
+        with col_lbl:
+            st.markdown(label(it, iid in selected))
+        with col_open:
+            opened = st.toggle('Ver', key=f'{key}_open_{iid}', label_visibility='collapsed')
+        if opened:
+            render_content(it)
+
+    if pages > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button('← Anterior', key=f'{key}_prev', use_container_width=True, disabled=page <= 1,
+                      on_click=_review_goto, args=(page_key, page - 1))
+        with col_page:
+            st.caption(f'Página {page} de {pages}')
+        with col_next:
+            st.button('Próxima →', key=f'{key}_next', use_container_width=True, disabled=page >= pages,
+                      on_click=_review_goto, args=(page_key, page + 1))
+
+# Helper: cabeçalho de etapas do fluxo (HTML montado uma vez por etapa, num único elemento)
+@functools.lru_cache(maxsize=None)
+def step_header_html(labels, current):
+    cells = []
+    for step_num, label in enumerate(labels, 1):
+        if step_num == current:
+            cells.append(f'<div style="flex:1; text-align:center; color:#4f6ef7; font-weight:700; font-size:0.85rem; border-bottom:2px solid #4f6ef7; padding-bottom:6px;">▶ {label}</div>')
+        elif step_num < current:
+            cells.append(f'<div style="flex:1; text-align:center; color:#10b981; font-size:0.85rem; padding-bottom:6px;">✓ {label}</div>')
+        else:
+            cells.append(f'<div style="flex:1; text-align:center; color:#9ca3af; font-size:0.85rem; padding-bottom:6px;">{label}</div>')
+    return f'<div style="display:flex; gap:1rem; margin-bottom:1.5rem;">{"".join(cells)}</div>'
+
+# Helper: itens do passo 4, recalculados só quando a seleção ou o agrupamento mudam
+def get_task_items(consolidate):
+    pubs = st.session_state.extracted_publications
+    selected = st.session_state.selected_publication_ids
+    cache_key = (id(pubs), len(pubs), frozenset(selected), consolidate)
+    cached = st.session_state.get('task_items_cache')
+    if cached is None or cached['key'] != cache_key:
+        selected_pubs = [p for p in pubs if p.pub_id in selected]
+        task_items = consolidate_publications(selected_pubs) if consolidate else selected_pubs
+        preview = '\n'.join(
+            f"{i}. {item.title}"
+            + (f"  ({item.merged_count} publicações)" if item.merged_count > 1 else '')
+            for i, item in enumerate(task_items, 1)
+        )
+        cached = {'key': cache_key, 'selected_pubs': selected_pubs,
+                  'task_items': task_items, 'preview': preview}
+        st.session_state.task_items_cache = cached
+    return cached
+
+# Helper: revisão do passo 3 em tabela (st.data_editor)
+# A tabela é montada de um "retrato" da seleção que só muda quando os filtros ou as
+# ações em lote mudam; cliques no checkbox não recriam o editor (nem perdem a ordenação).
+# O callback aplica as edições ao set de selecionados.
+def _apply_table_edits(editor_key, row_ids, selected):
+    for pos, changes in st.session_state[editor_key].get('edited_rows', {}).items():
+        if 'Incluir' in changes:
+            pub_id = row_ids[int(pos)]
+            if changes['Incluir']:
+                selected.add(pub_id)
+            else:
+                selected.discard(pub_id)
+
+def render_publication_table(pubs, selected):
+    import pandas as pd
+
+    orgaos = sorted({p.orgao or '—' for p in pubs})
+    col_f, col_o = st.columns([3, 2])
+    with col_f:
+        query = st.text_input('Filtrar', key='pub_table_filter', placeholder='Buscar por processo, partes, texto...',
+                              label_visibility='collapsed').strip().lower()
+    with col_o:
+        chosen_orgaos = st.multiselect('Órgão', orgaos, key='pub_table_orgaos', placeholder='Todos os órgãos',
+                                       label_visibility='collapsed')
+
+    visible = pubs
+    if chosen_orgaos:
+        visible = [p for p in visible if (p.orgao or '—') in chosen_orgaos]
+    if query:
+        visible = [p for p in visible
+                   if query in f"{p.process_number} {p.parties} {' '.join(p.clients)} {p.content}".lower()]
+
+    col_all, col_none, col_info = st.columns([1, 1, 2])
+    bulk = None
+    with col_all:
+        if st.button(f'☑️ Marcar {len(visible)}', key='pub_table_all', use_container_width=True):
+            selected.update(p.pub_id for p in visible)
+            bulk = True
+    with col_none:
+        if st.button(f'⬜ Desmarcar {len(visible)}', key='pub_table_none', use_container_width=True):
+            selected.difference_update(p.pub_id for p in visible)
+            bulk = True
+    with col_info:
+        st.caption(f'{len(selected)} de {len(pubs)} selecionada(s)'
+                   + (f' — {len(visible)} no filtro' if len(visible) != len(pubs) else ''))
+
+    signature = (query, tuple(chosen_orgaos), len(pubs))
+    if bulk or st.session_state.get('pub_table_signature') != signature:
+        st.session_state.pub_table_signature = signature
+        st.session_state.pub_table_snapshot = set(selected)
+    snapshot = st.session_state.pub_table_snapshot
+
+    row_ids = [p.pub_id for p in visible]
+    df = pd.DataFrame({
+        'Incluir': [p.pub_id in snapshot for p in visible],
+        'Processo': [p.process_number for p in visible],
+        'Clientes': [', '.join(p.clients) for p in visible],
+        'Partes': [p.parties for p in visible],
+        'Órgão': [p.orgao for p in visible],
+        'Data': [p.email_date for p in visible],
+    })
+
+    col_table, col_detail = st.columns([3, 2])
+    with col_table:
+        st.data_editor(
+            df, key='pub_table_editor', hide_index=True, use_container_width=True, height=460,
+            disabled=['Processo', 'Clientes', 'Partes', 'Órgão', 'Data'],
+            column_config={
+                'Incluir': st.column_config.CheckboxColumn('Incluir', width='small'),
+                'Processo': st.column_config.TextColumn('Processo', width='medium'),
+                'Partes': st.column_config.TextColumn('Partes', width='large'),
+            },
+            on_change=_apply_table_edits, args=('pub_table_editor', row_ids, selected)
+        )
+    with col_detail:
+        if visible:
+            labels = {p.pub_id: f"{p.process_number} — {p.parties[:40]}" for p in visible}
+            detail_id = st.selectbox('Detalhes', row_ids, format_func=labels.get, key='pub_table_detail')
+            pub = next(p for p in visible if p.pub_id == detail_id)
+            st.caption(f"**Data:** {pub.email_date}  |  **Origem:** {pub.origem}")
+            if pub.clients: st.caption(f"🏷️ **Clientes:** {', '.join(pub.clients)}")
+            if pub.tribunal: st.caption(f"**Tribunal:** {pub.tribunal}")
+            if pub.orgao:    st.caption(f"**Órgão:** {pub.orgao}")
+            st.text_area('Conteúdo', value=pub.content, height=360, key=f"ptd_{pub.pub_id}", disabled=True)
+        else:
+            st.info('Nenhuma publicação no filtro.')
+
+# Helper: grupo de duplicatas com checkbox "Manter" por tarefa; retorna os IDs mantidos
+# locked_ids: tarefas que não podem ser excluídas por aqui (ficam sempre marcadas)
+def render_duplicate_group(key_prefix, task_list, keep_all=False, locked_ids=()):
+    kept = []
+    for idx, task in enumerate(task_list, 1):
+        task_id = task.get('id')
+        locked = task_id in locked_ids
+        col_ck, col_info = st.columns([1, 9])
+        with col_ck:
+            if st.checkbox('Manter', value=keep_all or idx == 1 or locked, disabled=locked,
+                           key=f'{key_prefix}_{idx}_{task_id}',
+                           label_visibility='collapsed'):
+                kept.append(task_id)
+        with col_info:
+            created = task.get('created_at', '')[:10]
+            where = f" — seção **{task['section_name']}**" if task.get('section_name') else ''
+            owner = ' — 👤 com responsável' if task.get('assigned_to_id') else ''
+            st.markdown(f'**{idx}.** `{task.get("name","")}` — criada em {created}{where}{owner}')
+    return kept
+
 # Helper: botão de voltar ao início (sidebar minimalista)
 def render_sidebar_back():
     with st.sidebar:
         if st.button('← Início', use_container_width=True):
             go('home', reset_flow=True)
+        render_api_stats()
+        render_job_list()
+
+# Helper: lotes em segundo plano recentes (continuam rodando com a aba fechada)
+JOB_STATUS_LABELS = {
+    JOB_QUEUED: '⏳ Na fila', JOB_RUNNING: '⚙️ Rodando', JOB_DONE: '✅ Concluído',
+    JOB_FAILED: '❌ Falhou', JOB_INTERRUPTED: '⚠️ Interrompido'
+}
+
+def render_job_list():
+    jobs = get_job_manager().recent(limit=5)
+    if not jobs:
+        return
+    running = sum(j['status'] in (JOB_QUEUED, JOB_RUNNING) for j in jobs)
+    with st.expander(f'🧵 Lotes ({running} em andamento)', expanded=running > 0):
+        for job in jobs:
+            st.markdown(f"**{job['label']}** — {JOB_STATUS_LABELS[job['status']]}")
+            if job['status'] == JOB_DONE and job['result']:
+                r = job['result']
+                done = r.get('success_count', 0)
+                st.caption(f"{done} ok, {r.get('error_count', 0)} erro(s)")
+            elif job['total']:
+                st.caption(f"{job['done']}/{job['total']}")
+
+# Helper: barra de progresso de um lote; faz polling (rerun) enquanto ele roda
+def render_job_progress(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return None
+    if job['status'] in (JOB_QUEUED, JOB_RUNNING):
+        fraction = job['done'] / job['total'] if job['total'] else 0.0
+        st.progress(min(fraction, 1.0), text=job['message'] or job['label'])
+        st.caption('O lote roda no servidor: pode fechar a aba e voltar depois.')
+        time.sleep(1)
+        st.rerun()
+    elif job['status'] == JOB_FAILED:
+        st.error(f"❌ O lote falhou: {job['error']}")
+    elif job['status'] == JOB_INTERRUPTED:
+        st.warning('⚠️ O lote foi interrompido por um reinício do servidor. '
+                   'Execute de novo: o diário pula o que já foi criado.')
+    return job
+
+# Helper: latência por endpoint da API do MeisterTask (só aparece depois da 1ª chamada)
+def render_api_stats():
+    api_token = get_settings().meistertask_api_token
+    if not api_token:
+        return
+    client = get_meistertask_client(api_token)
+    stats = client.latency_stats()
+    if not stats:
+        return
+    import pandas as pd
+
+    with st.expander('📈 API MeisterTask', expanded=False):
+        st.caption(f'Concorrência atual: {client.controller.limit}')
+        st.dataframe(
+            pd.DataFrame.from_dict(stats, orient='index').round(0),
+            use_container_width=True
+        )
+
+profiler.mark('setup')
 
 # =============================================================================
 # PÁGINA: HOME
@@ -886,6 +637,22 @@ if st.session_state.page == 'home':
         if st.button('Gerenciar Duplicatas', use_container_width=True, key='btn_dup'):
             go('duplicatas')
 
+    st.markdown('<div style="height:1.5rem"></div>', unsafe_allow_html=True)
+    _, col_b, _ = st.columns([1, 4, 1])
+    with col_b:
+        if st.button('🔎 Buscar no histórico de publicações', use_container_width=True, key='btn_busca'):
+            go('busca')
+
+    # Fila de reenvio: só aparece quando há algo pendente ou falho
+    queue_counts = get_retry_queue().counts()
+    if queue_counts[STATUS_RETRY] or queue_counts[STATUS_DEAD]:
+        st.markdown('<div style="height:1.5rem"></div>', unsafe_allow_html=True)
+        _, col_q, _ = st.columns([1, 4, 1])
+        with col_q:
+            if st.button(f"📮 Fila de reenvio — {queue_counts[STATUS_RETRY]} aguardando, "
+                         f"{queue_counts[STATUS_DEAD]} com falha", use_container_width=True, key='btn_fila'):
+                go('fila')
+
 # =============================================================================
 # PÁGINA: ESCOLHA DA FONTE DE DADOS
 # =============================================================================
@@ -946,17 +713,7 @@ elif st.session_state.page == 'flow':
     current = st.session_state.current_step
     fonte_icon = '📧' if fonte == 'Gmail' else '⚖️'
 
-    cols_prog = st.columns(4)
-    for i, label in enumerate(steps_labels):
-        step_num = i + 1
-        with cols_prog[i]:
-            if step_num == current:
-                st.markdown(f'<div style="text-align:center; color:#4f6ef7; font-weight:700; font-size:0.85rem; border-bottom:2px solid #4f6ef7; padding-bottom:6px;">▶ {label}</div>', unsafe_allow_html=True)
-            elif step_num < current:
-                st.markdown(f'<div style="text-align:center; color:#10b981; font-size:0.85rem; padding-bottom:6px;">✓ {label}</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div style="text-align:center; color:#9ca3af; font-size:0.85rem; padding-bottom:6px;">{label}</div>', unsafe_allow_html=True)
-    st.markdown('<div style="height:1.5rem"></div>', unsafe_allow_html=True)
+    st.markdown(step_header_html(tuple(steps_labels), current), unsafe_allow_html=True)
 
     # ── ETAPA 1: Filtros ─────────────────────────────────────────────────────
     if current == 1:
@@ -979,7 +736,7 @@ elif st.session_state.page == 'flow':
         else:  # DJNE
             text_search = ''
             read_status = 'all'
-            nome_adv = load_env_var('DJNE_NOME_ADVOGADO', 'EDSON MARCOS FERREIRA PRATTI JUNIOR')
+            nome_adv = get_settings().djne_nome_advogado
             col1, col2 = st.columns(2)
             with col1:
                 st.info(f'👤 **Advogado:** {nome_adv}')
@@ -1003,7 +760,11 @@ elif st.session_state.page == 'flow':
                     with st.spinner('Buscando e-mails...'):
                         gmail_service = get_gmail_service()
                         if gmail_service:
-                            emails = search_emails(gmail_service, st.session_state.filters)
+                            try:
+                                emails = search_emails(gmail_service, st.session_state.filters)
+                            except Exception as e:
+                                st.error(f"Erro ao buscar emails: {str(e)}")
+                                emails = []
                             st.session_state.filtered_emails = emails
                             if emails:
                                 st.session_state.current_step = 2
@@ -1015,17 +776,11 @@ elif st.session_state.page == 'flow':
                 else:  # DJNE
                     with st.spinner('Buscando no DJNE...'):
                         try:
-                            nome_adv = load_env_var('DJNE_NOME_ADVOGADO', 'EDSON MARCOS FERREIRA PRATTI JUNIOR')
-                            publicacoes = buscar_publicacoes_djne(nome_adv, date_from, date_to)
-                            for idx, pub in enumerate(publicacoes):
-                                pub.update({
-                                    'email_id': f'djne_{idx}',
-                                    'email_subject': pub.get('source_subject', f"DJNE - {pub.get('process_number','')}"),
-                                    'email_sender': 'DJNE',
-                                    'email_date': pub.get('data_disponibilizacao', ''),
-                                    'pub_id': f'djne_{idx}',
-                                    'origem': 'DJNE'
-                                })
+                            from djne_scraper import buscar_publicacoes_djne
+
+                            nome_adv = get_settings().djne_nome_advogado
+                            publicacoes = get_client_matcher().tag(buscar_publicacoes_djne(nome_adv, date_from, date_to))
+                            get_publication_store().add(publicacoes)
                             st.session_state.extracted_publications = publicacoes
                             if publicacoes:
                                 st.success(f'✅ {len(publicacoes)} publicações encontradas!')
@@ -1041,20 +796,18 @@ elif st.session_state.page == 'flow':
     elif current == 2:
         st.subheader(f'📬 Selecione os e-mails ({len(st.session_state.filtered_emails)} encontrados)')
 
-        for email in st.session_state.filtered_emails:
-            icon = '✉️' if not email['is_read'] else '📬'
-            with st.expander(f"{icon} {email['subject'][:90]}  —  {email['sender'][:50]}", expanded=False):
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    st.caption(f"**De:** {email['sender']}   |   **Data:** {email['date']}")
-                    body_preview = email['body'][:500] + '...' if len(email['body']) > 500 else email['body']
-                    st.text_area('Conteúdo', value=body_preview, height=180, key=f"body_{email['id']}", disabled=True)
-                with col2:
-                    selected = st.checkbox('Selecionar', value=email['id'] in st.session_state.selected_email_ids, key=f"sel_{email['id']}")
-                    if selected and email['id'] not in st.session_state.selected_email_ids:
-                        st.session_state.selected_email_ids.append(email['id'])
-                    elif not selected and email['id'] in st.session_state.selected_email_ids:
-                        st.session_state.selected_email_ids.remove(email['id'])
+        def _render_email(email):
+            st.caption(f"**De:** {email['sender']}   |   **Data:** {email['date']}")
+            body_preview = email['body'][:500] + '...' if len(email['body']) > 500 else email['body']
+            st.text_area('Conteúdo', value=body_preview, height=180, key=f"body_{email['id']}", disabled=True)
+
+        render_review_list(
+            'emails', st.session_state.filtered_emails, st.session_state.selected_email_ids,
+            item_id=lambda e: e['id'],
+            label=lambda e, sel: f"{'✉️' if not e['is_read'] else '📬'} **{e['subject'][:90]}**  —  {e['sender'][:50]}",
+            search_text=lambda e: f"{e['subject']} {e['sender']} {e['body']}".lower(),
+            render_content=_render_email
+        )
 
         st.markdown('---')
         col1, col2, col3 = st.columns([1, 1, 2])
@@ -1066,20 +819,12 @@ elif st.session_state.page == 'flow':
             n = len(st.session_state.selected_email_ids)
             if st.button(f'📤 Extrair publicações ({n} selecionados)', use_container_width=True, type='primary', disabled=n == 0):
                 with st.spinner('Extraindo publicações...'):
-                    publications = []
-                    for email in st.session_state.filtered_emails:
-                        if email['id'] in st.session_state.selected_email_ids:
-                            email_pubs = extract_publications_from_email(email['body'], email['subject'])
-                            for pub in email_pubs:
-                                pub.update({
-                                    'email_id': email['id'],
-                                    'email_subject': email['subject'],
-                                    'email_sender': email['sender'],
-                                    'email_date': email['date'],
-                                    'pub_id': f"{email['id']}_{len(publications)}",
-                                    'origem': 'Gmail'
-                                })
-                                publications.append(pub)
+                    selected_emails = [e for e in st.session_state.filtered_emails
+                                       if e['id'] in st.session_state.selected_email_ids]
+                    bodies = set()
+                    publications = get_client_matcher().tag(gmail_publications(selected_emails, seen_bodies=bodies))
+                    st.session_state.skipped_email_copies = len(selected_emails) - len(bodies)
+                    get_publication_store().add(publications)
                     st.session_state.extracted_publications = publications
                     if publications:
                         st.session_state.current_step = 3
@@ -1091,25 +836,32 @@ elif st.session_state.page == 'flow':
     elif current == 3:
         pubs = st.session_state.extracted_publications
         st.subheader(f'📋 Validar publicações ({len(pubs)} encontradas)')
-
-        for pub in pubs:
-            is_sel = pub['pub_id'] in st.session_state.selected_publication_ids
-            icon = '✅' if is_sel else '📄'
-            with st.expander(f"{icon} {pub['process_number']}  —  {pub.get('email_subject','')[:60]}", expanded=False):
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    st.caption(f"**Data:** {pub.get('email_date','')}  |  **Origem:** {pub.get('origem','')}")
-                    if pub.get('origem') == 'DJNE':
-                        if pub.get('tribunal'): st.caption(f"**Tribunal:** {pub['tribunal']}")
-                        if pub.get('orgao'):    st.caption(f"**Órgão:** {pub['orgao']}")
-                    st.text_area('Conteúdo', value=pub['content'], height=250,
-                                 key=f"pc_{pub['pub_id']}", disabled=True)
-                with col2:
-                    sel = st.checkbox('Incluir', value=is_sel, key=f"sp_{pub['pub_id']}")
-                    if sel and pub['pub_id'] not in st.session_state.selected_publication_ids:
-                        st.session_state.selected_publication_ids.append(pub['pub_id'])
-                    elif not sel and pub['pub_id'] in st.session_state.selected_publication_ids:
-                        st.session_state.selected_publication_ids.remove(pub['pub_id'])
+        if st.session_state.skipped_email_copies and fonte == 'Gmail':
+            st.caption(f'🔁 {st.session_state.skipped_email_copies} e-mail(s) repetido(s) '
+                       '(encaminhados) extraído(s) uma vez só')
+
+        def _render_publication(pub):
+            st.caption(f"**Data:** {pub.email_date}  |  **Origem:** {pub.origem}")
+            if pub.clients: st.caption(f"🏷️ **Clientes:** {', '.join(pub.clients)}")
+            if pub.origem == ORIGEM_DJNE:
+                if pub.tribunal: st.caption(f"**Tribunal:** {pub.tribunal}")
+                if pub.orgao:    st.caption(f"**Órgão:** {pub.orgao}")
+            st.text_area('Conteúdo', value=pub.content, height=250,
+                         key=f"pc_{pub.pub_id}", disabled=True)
+
+        review_mode = st.radio('Modo de revisão', ['📊 Tabela', '📄 Lista'], horizontal=True,
+                               key='pub_review_mode', label_visibility='collapsed')
+        if review_mode == '📊 Tabela':
+            render_publication_table(pubs, st.session_state.selected_publication_ids)
+        else:
+            render_review_list(
+                'pubs', pubs, st.session_state.selected_publication_ids,
+                item_id=lambda p: p.pub_id,
+                label=lambda p, sel: f"{'✅' if sel else '📄'} **{p.process_number}**  —  {p.email_subject[:60]}",
+                search_text=lambda p: f"{p.process_number} {' '.join(p.clients)} {p.email_subject} {p.content}".lower(),
+                render_content=_render_publication,
+                select_label='Incluir'
+            )
 
         st.markdown('---')
         volta_passo = 1 if st.session_state.fonte_dados == 'DJNE' else 2
@@ -1126,10 +878,9 @@ elif st.session_state.page == 'flow':
 
     # ── ETAPA 4: Gerar tarefas ───────────────────────────────────────────────
     elif current == 4:
-        selected_pubs = [
-            p for p in st.session_state.extracted_publications
-            if p['pub_id'] in st.session_state.selected_publication_ids
-        ]
+        consolidate = st.session_state.get('consolidate_by_process', False)
+        derived = get_task_items(consolidate)
+        selected_pubs, task_items = derived['selected_pubs'], derived['task_items']
 
         if not selected_pubs:
             st.warning('Nenhuma publicação selecionada.')
@@ -1137,12 +888,15 @@ elif st.session_state.page == 'flow':
                 st.session_state.current_step = 3
                 st.rerun()
         else:
-            st.subheader(f'🚀 Gerar {len(selected_pubs)} tarefa(s) no MeisterTask')
+            st.checkbox('🧩 Agrupar publicações do mesmo processo em uma única tarefa',
+                        key='consolidate_by_process')
+
+            st.subheader(f'🚀 Gerar {len(task_items)} tarefa(s) no MeisterTask')
+            if len(task_items) < len(selected_pubs):
+                st.caption(f'{len(selected_pubs)} publicações agrupadas em {len(task_items)} tarefas.')
 
             with st.expander('Preview das tarefas', expanded=False):
-                for i, pub in enumerate(selected_pubs, 1):
-                    parties = extract_parties_from_publication(pub['content'])
-                    st.code(f"{i}. {pub['process_number']} — {parties}")
+                st.code(derived['preview'], language=None)
 
             col1, col2 = st.columns(2)
             with col1:
@@ -1156,42 +910,43 @@ elif st.session_state.page == 'flow':
                 if st.button('← Voltar', use_container_width=True):
                     st.session_state.current_step = 3
                     st.rerun()
+            # Um lote de criação por vez: cliques repetidos criariam as mesmas tarefas de novo
+            creation_job = (get_job_manager().get(st.session_state.creation_job_id)
+                            if st.session_state.creation_job_id else None)
+            creating = bool(creation_job and creation_job['status'] in (JOB_QUEUED, JOB_RUNNING))
             with col_act:
-                if st.button(f'🚀 Criar {len(selected_pubs)} tarefa(s)', use_container_width=True, type='primary'):
-                    api_token  = load_env_var('MEISTERTASK_API_TOKEN')
-                    section_id = load_env_var('MEISTERTASK_SECTION_ID')
+                if st.button(f'🚀 Criar {len(task_items)} tarefa(s)', use_container_width=True, type='primary',
+                             disabled=creating):
+                    settings   = get_settings()
+                    api_token  = settings.meistertask_api_token
+                    section_id = settings.meistertask_section_id
 
                     if not api_token or not section_id:
                         st.error('❌ Configure MEISTERTASK_API_TOKEN e MEISTERTASK_SECTION_ID no arquivo .env')
                     else:
-                        progress_bar = st.progress(0)
-                        status_text  = st.empty()
-                        success_count, error_count = 0, 0
-                        errors, success_tasks = [], []
-
-                        for idx, pub in enumerate(selected_pubs):
-                            progress_bar.progress((idx + 1) / len(selected_pubs))
-                            status_text.text(f'Criando {idx+1}/{len(selected_pubs)}: {pub["process_number"]}')
-                            parties = extract_parties_from_publication(pub['content'])
-                            ok, result = create_meistertask_task(
-                                pub['process_number'], parties, pub['content'], section_id, api_token
+                        # O lote roda em segundo plano: sobrevive a reruns e ao fechamento da aba
+                        items = list(task_items)
+                        get_retry_worker(api_token)
+                        try:
+                            st.session_state.creation_job_id = get_job_manager().submit(
+                                'create_tasks', f'Criar {len(items)} tarefa(s)', total=len(items),
+                                exclusive_key=f'create_tasks:{section_id}',
+                                items=items, section_id=section_id, api_token=api_token,
+                                journal=get_task_journal(), mirror=get_task_mirror(),
+                                retry_queue=get_retry_queue(), dedupe_index=get_dedupe_index(),
+                                use_mirror_index=settings.meistertask_webhook_enabled
                             )
-                            if ok:
-                                success_count += 1
-                                success_tasks.append(pub['process_number'])
-                            else:
-                                error_count += 1
-                                errors.append(f"{pub['process_number']}: {result}")
-                            time.sleep(0.5)
-
-                        progress_bar.empty()
-                        status_text.empty()
-                        st.session_state.task_creation_results = {
-                            'success_count': success_count,
-                            'error_count': error_count,
-                            'errors': errors,
-                            'success_tasks': success_tasks
-                        }
+                        except JobBusyError as e:
+                            # Lote aberto em outra aba: acompanha o que já está rodando
+                            st.session_state.creation_job_id = e.job_id
+                        st.session_state.task_creation_results = None
+                        st.rerun()
+
+            # Andamento do lote em segundo plano
+            if st.session_state.creation_job_id and not st.session_state.task_creation_results:
+                job = render_job_progress(st.session_state.creation_job_id)
+                if job and job['status'] == JOB_DONE:
+                    st.session_state.task_creation_results = job['result']
 
             # Resultados
             if st.session_state.task_creation_results:
@@ -1203,11 +958,25 @@ elif st.session_state.page == 'flow':
                     if r['success_tasks']:
                         with st.expander('Ver tarefas criadas'):
                             for t in r['success_tasks']: st.text(f'✓ {t}')
+                    if r.get('resumed_tasks'):
+                        st.info(f"↩️ {len(r['resumed_tasks'])} já criada(s) em execução anterior (puladas)")
+                    if r.get('duplicate_tasks'):
+                        st.info(f"🔁 {len(r['duplicate_tasks'])} já enviada(s) por outra fonte (puladas)")
+                        with st.expander('Ver publicações duplicadas'):
+                            for proc, origem in r['duplicate_tasks']: st.text(f'• {proc} — já veio do {origem}')
+                    if r.get('existing_tasks'):
+                        st.info(f"ℹ️ {len(r['existing_tasks'])} já existia(m) na seção (não recriadas)")
+                        with st.expander('Ver tarefas já existentes'):
+                            for proc, url in r['existing_tasks']: st.markdown(f'• `{proc}` — [abrir no MeisterTask]({url})')
                 with col2:
                     if r['error_count'] > 0:
                         st.error(f"❌ {r['error_count']} erro(s)")
                         with st.expander('Ver erros', expanded=True):
                             for e in r['errors']: st.code(e, language=None)
+                        if r.get('queued_tasks'):
+                            st.info(f"🔁 {len(r['queued_tasks'])} serão tentada(s) de novo automaticamente")
+                        if st.button('📮 Ver fila de reenvio', use_container_width=True):
+                            go('fila')
 
                 st.markdown('---')
                 if st.button('🏠 Voltar ao início', use_container_width=True, type='primary'):
@@ -1223,8 +992,9 @@ elif st.session_state.page == 'duplicatas':
     st.caption('Identifica e remove tarefas com o mesmo número de processo na seção **Publicações**.')
     st.markdown('---')
 
-    api_token  = load_env_var('MEISTERTASK_API_TOKEN')
-    section_id = load_env_var('MEISTERTASK_SECTION_ID')
+    settings   = get_settings()
+    api_token  = settings.meistertask_api_token
+    section_id = settings.meistertask_section_id
 
     col1, col2 = st.columns(2)
     with col1:
@@ -1237,40 +1007,81 @@ elif st.session_state.page == 'duplicatas':
     if not api_token or not section_id:
         st.error('Configure as variáveis no arquivo `.env` para continuar.')
     else:
+        mirror = get_task_mirror()
+        project_id = settings.meistertask_project_id
+        webhook_enabled = settings.meistertask_webhook_enabled
         _, col_btn, _ = st.columns([1, 2, 1])
         with col_btn:
+            scope = st.radio('Escopo da busca:', ['secao', 'projeto'], horizontal=True,
+                             format_func=lambda x: {'secao': '📌 Seção Publicações',
+                                                    'projeto': '🗂️ Projeto inteiro (entre seções)'}[x])
+            full_sync = st.checkbox('Recarregar todas as tarefas (ignorar cache local)', key='mirror_full_sync',
+                                    disabled=scope == 'projeto')
             if st.button('🔄 Buscar tarefas', use_container_width=True, type='primary'):
                 with st.spinner('Buscando tarefas...'):
-                    ok, result = list_meistertask_tasks(section_id, api_token)
-                    if ok:
-                        st.session_state.found_tasks = result
-                        st.session_state.found_duplicates = find_duplicate_tasks(result)
-                        st.success(f'{len(result)} tarefas carregadas.')
-                    else:
-                        st.error(f'Erro: {result}')
-
-        if st.session_state.found_duplicates:
-            duplicates = st.session_state.found_duplicates
-            st.warning(f'⚠️ {len(duplicates)} processo(s) com duplicatas encontrados.')
+                    try:
+                        if scope == 'projeto':
+                            if not project_id:
+                                raise MeisterTaskError('❌ Configure MEISTERTASK_PROJECT_ID no arquivo .env')
+                            sections, tasks_by_section = scan_project_tasks(project_id, api_token)
+                            tasks = []
+                            for sec_id, sec_tasks in tasks_by_section.items():
+                                mirror.replace_section(sec_id, sec_tasks)
+                                tasks.extend(sec_tasks)
+                            st.session_state.found_tasks = tasks
+                            st.session_state.found_duplicates = find_cross_section_duplicates(
+                                tasks, inbox_section_id=section_id)
+                            st.success(f'{len(tasks)} tarefas carregadas de {len(sections)} seções.')
+                        else:
+                            if webhook_enabled and mirror.is_fresh(section_id) and not full_sync:
+                                # Espelho mantido pelos webhooks: nenhuma chamada de listagem
+                                # (vencido o intervalo, refresh faz a completa e pega eventos perdidos)
+                                sync = {'mode': 'webhook', 'fetched': 0}
+                            else:
+                                sync = mirror.refresh(section_id, api_token, full=full_sync)
+                            tasks = mirror.tasks(section_id)
+                            st.session_state.found_tasks = tasks
+                            st.session_state.found_duplicates = mirror.find_duplicates(section_id)
+                            if sync['mode'] == 'webhook':
+                                st.success(f'{len(tasks)} tarefas no cache local (atualizado por webhook).')
+                            elif sync['mode'] == 'full':
+                                st.success(f'{len(tasks)} tarefas carregadas.')
+                            else:
+                                st.success(f"{len(tasks)} tarefas no cache local ({sync['fetched']} atualizada(s)).")
+                        from near_duplicates import find_near_duplicate_tasks
+
+                        exact_ids = {t['id'] for tl in st.session_state.found_duplicates.values() for t in tl}
+                        unassigned = [t for t in tasks if not t.get('assigned_to_id')]
+                        st.session_state.found_near_duplicates = find_near_duplicate_tasks(unassigned, exclude_ids=exact_ids)
+                    except MeisterTaskError as e:
+                        st.error(f'Erro: {e}')
+
+        if st.session_state.found_duplicates or st.session_state.found_near_duplicates:
+            duplicates = st.session_state.found_duplicates or {}
+            near_groups = st.session_state.found_near_duplicates
+            st.warning(f'⚠️ {len(duplicates)} processo(s) com duplicatas e {len(near_groups)} grupo(s) de texto similar encontrados.')
             st.markdown('---')
             st.info('Marque as tarefas que deseja **MANTER**. As desmarcadas serão excluídas.')
 
             tasks_to_keep = []
-            for p_idx, (proc_num, task_list) in enumerate(duplicates.items()):
-                with st.expander(f'📂 {proc_num}  ({len(task_list)} duplicatas)', expanded=True):
-                    for idx, task in enumerate(task_list, 1):
-                        task_id = task.get('id')
-                        col_ck, col_info = st.columns([1, 9])
-                        with col_ck:
-                            if st.checkbox('Manter', value=(idx == 1),
-                                           key=f'keep_{p_idx}_{idx}_{task_id}',
-                                           label_visibility='collapsed'):
-                                tasks_to_keep.append(task_id)
-                        with col_info:
-                            created = task.get('created_at', '')[:10]
-                            st.markdown(f'**{idx}.** `{task.get("name","")}` — criada em {created}')
-
-            all_ids    = [t['id'] for tl in duplicates.values() for t in tl]
+            # Nas duas abas só as cópias sem responsável na seção Publicações podem ser excluídas
+            locked_ids = locked_duplicate_ids(list(duplicates.values()) + near_groups, section_id)
+            tab_exact, tab_near = st.tabs([f'📂 Mesmo processo ({len(duplicates)})',
+                                           f'🧬 Texto similar ({len(near_groups)})'])
+            with tab_exact:
+                for p_idx, (proc_num, task_list) in enumerate(duplicates.items()):
+                    with st.expander(f'📂 {proc_num}  ({len(task_list)} duplicatas)', expanded=True):
+                        tasks_to_keep += render_duplicate_group(f'keep_{p_idx}', task_list, locked_ids=locked_ids)
+            with tab_near:
+                if near_groups:
+                    st.caption('Notas com conteúdo quase idêntico, mas sem o mesmo número de processo no título. '
+                               'Por segurança todas vêm marcadas para manter.')
+                for g_idx, task_list in enumerate(near_groups):
+                    with st.expander(f'🧬 Grupo {g_idx + 1}  ({len(task_list)} tarefas similares)', expanded=False):
+                        tasks_to_keep += render_duplicate_group(f'near_{g_idx}', task_list, keep_all=True,
+                                                                 locked_ids=locked_ids)
+
+            all_ids    = [t['id'] for tl in list(duplicates.values()) + near_groups for t in tl]
             to_delete  = [tid for tid in all_ids if tid not in tasks_to_keep]
 
             st.markdown('---')
@@ -1286,41 +1097,14 @@ elif st.session_state.page == 'duplicatas':
                 with col_conf:
                     if st.checkbox('Confirmo a exclusão', key='confirm_delete'):
                         if st.button('🗑️ Excluir tarefas selecionadas', use_container_width=True, type='primary'):
-                            progress_bar = st.progress(0)
-                            status_text  = st.empty()
-                            success_count = already_count = error_count = 0
-                            errors = []
-
-                            for idx, tid in enumerate(to_delete, 1):
-                                status_text.text(f'Excluindo {idx}/{len(to_delete)}...')
-                                progress_bar.progress(idx / len(to_delete))
-                                ok, msg = delete_meistertask_task(tid, api_token)
-                                if ok:
-                                    if '404' in msg or 'já estava' in msg:
-                                        already_count += 1
-                                    else:
-                                        success_count += 1
-                                else:
-                                    error_count += 1
-                                    errors.append(msg)
-                                time.sleep(0.3)
-
-                            progress_bar.empty()
-                            status_text.empty()
-
-                            col1, col2, col3 = st.columns(3)
-                            col1.metric('✅ Excluídas', success_count)
-                            col2.metric('⚠️ Já excluídas', already_count)
-                            col3.metric('❌ Erros', error_count)
-
-                            if error_count == 0:
-                                st.balloons()
-                                st.success('Concluído sem erros!')
-                            else:
-                                for e in errors: st.code(e)
-
+                            st.session_state.delete_job_id = get_job_manager().submit(
+                                'trash_tasks', f'Excluir {len(to_delete)} duplicata(s)', total=len(to_delete),
+                                task_ids=to_delete, api_token=api_token, mirror=mirror
+                            )
                             st.session_state.found_duplicates = None
+                            st.session_state.found_near_duplicates = []
                             st.session_state.found_tasks = None
+                            st.rerun()
             else:
                 st.info('✅ Todas as duplicatas estão marcadas para manter.')
 
@@ -1328,6 +1112,156 @@ elif st.session_state.page == 'duplicatas':
             st.success('✅ Nenhuma duplicata encontrada!')
             st.balloons()
 
+        # Exclusão em segundo plano: progresso e resumo
+        if st.session_state.delete_job_id:
+            st.markdown('---')
+            job = render_job_progress(st.session_state.delete_job_id)
+            if job and job['status'] == JOB_DONE:
+                summary = job['result']
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric('✅ Excluídas', summary['success_count'])
+                col2.metric('⚠️ Já excluídas', summary['already_count'])
+                col3.metric('❌ Erros', summary['error_count'])
+                col4.metric('⚡ Tarefas/s', f"{summary['throughput']:.1f}")
+                st.caption(f"{job['total']} tarefa(s) processadas em {summary['elapsed']:.1f}s")
+
+                if summary['error_count'] == 0:
+                    st.success('Concluído sem erros!')
+                else:
+                    for e in summary['errors']: st.code(e)
+                if st.button('OK', key='dismiss_delete_job'):
+                    st.session_state.delete_job_id = None
+                    st.rerun()
+
+# =============================================================================
+# PÁGINA: FILA DE REENVIO (novas tentativas e lista de mortas)
+# =============================================================================
+elif st.session_state.page == 'fila':
+    render_sidebar_back()
+    st.subheader('📮 Fila de reenvio')
+
+    retry_queue = get_retry_queue()
+    api_token = get_settings().meistertask_api_token
+    if api_token:
+        # Garante o worker rodando mesmo depois de reiniciar o servidor
+        get_retry_worker(api_token)
+
+    waiting = retry_queue.waiting()
+    dead = retry_queue.dead_letters()
+    col1, col2 = st.columns(2)
+    col1.metric('🔁 Aguardando nova tentativa', len(waiting))
+    col2.metric('☠️ Falharam definitivamente', len(dead))
+
+    if waiting:
+        with st.expander('Aguardando nova tentativa', expanded=False):
+            for item in waiting:
+                when = datetime.fromtimestamp(item['next_attempt_at']).strftime('%d/%m %H:%M:%S')
+                st.markdown(f"• `{item['process_number']}` — tentativa {item['attempts'] + 1} às {when}")
+                st.caption(item['last_error'][:300])
+
+    if dead:
+        st.markdown('---')
+        st.markdown('**Falharam definitivamente**')
+        labels = {item['fingerprint']: f"{item['process_number']} — {item['attempts']} tentativa(s)" for item in dead}
+        chosen = st.multiselect('Selecione as publicações', list(labels), format_func=labels.get,
+                                key='dlq_selected')
+        for item in dead:
+            with st.expander(labels[item['fingerprint']], expanded=False):
+                st.code(item['last_error'], language=None)
+
+        col_all, col_sel, col_drop = st.columns(3)
+        with col_all:
+            if st.button(f'🔁 Reenviar todas ({len(dead)})', use_container_width=True, type='primary'):
+                retry_queue.replay()
+                st.rerun()
+        with col_sel:
+            if st.button('🔁 Reenviar selecionadas', use_container_width=True, disabled=not chosen):
+                retry_queue.replay(chosen)
+                st.rerun()
+        with col_drop:
+            if st.button('🗑️ Descartar selecionadas', use_container_width=True, disabled=not chosen):
+                retry_queue.discard(chosen)
+                st.rerun()
+
+    if not waiting and not dead:
+        st.success('✅ Nenhuma criação pendente.')
+    elif st.button('🔄 Atualizar', use_container_width=True):
+        st.rerun()
+
+# =============================================================================
+# PÁGINA: BUSCA NO HISTÓRICO DE PUBLICAÇÕES
+# =============================================================================
+elif st.session_state.page == 'busca':
+    render_sidebar_back()
+    st.subheader('🔎 Histórico de publicações')
+
+    store = get_publication_store()
+    counts = store.counts()
+    st.caption(f"{counts['total']} publicação(ões) arquivada(s) — "
+               f"Gmail: {counts.get(ORIGEM_GMAIL, 0)}, DJNE: {counts.get(ORIGEM_DJNE, 0)}")
+
+    # Qualquer mudança nos filtros volta para a primeira página
+    reset_page = dict(on_change=_review_goto, args=('busca_page', 1))
+    field_labels = {None: 'Tudo', 'parties': 'Partes', 'process_number': 'Processo',
+                    'orgao': 'Órgão', 'content': 'Texto'}
+    col_q, col_field = st.columns([3, 1])
+    with col_q:
+        query = st.text_input('Buscar', key='busca_query', **reset_page,
+                              placeholder='Parte, número do processo ou palavras do texto',
+                              label_visibility='collapsed')
+    with col_field:
+        field = st.selectbox('Campo', list(field_labels), format_func=field_labels.get, key='busca_field',
+                             **reset_page, label_visibility='collapsed')
+    col_o, col_de, col_ate = st.columns(3)
+    with col_o:
+        origem = st.selectbox('Origem', ['Todas', ORIGEM_GMAIL, ORIGEM_DJNE], key='busca_origem',
+                              **reset_page)
+    with col_de:
+        date_from = st.date_input('De', value=None, key='busca_de', format='DD/MM/YYYY',
+                                  **reset_page)
+    with col_ate:
+        date_to = st.date_input('Até', value=None, key='busca_ate', format='DD/MM/YYYY',
+                                **reset_page)
+
+    page = st.session_state.get('busca_page', 1)
+    started = time.perf_counter()
+    rows, total = store.search(query, field=field, origem=None if origem == 'Todas' else origem,
+                               date_from=date_from, date_to=date_to,
+                               limit=REVIEW_PAGE_SIZE, offset=(page - 1) * REVIEW_PAGE_SIZE)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.caption(f'{total} resultado(s) em {elapsed_ms:.0f} ms')
+
+    for row in rows:
+        when = datetime.strptime(row['published_on'], '%Y-%m-%d').strftime('%d/%m/%Y') if row['published_on'] else '—'
+        with st.expander(f"**{row['process_number']}** — {row['parties'] or ''}  ·  {when}  ·  {row['origem']}"):
+            if row['orgao']:
+                st.caption(f"**Órgão:** {row['orgao']}")
+            if row['email_subject']:
+                st.caption(f"**Assunto:** {row['email_subject']}")
+            st.markdown(f"…{row['snippet']}…" if query else row['snippet'])
+            st.text_area('Conteúdo', value=row['content'], height=250,
+                         key=f"busca_{row['fingerprint']}", disabled=True)
+
+    pages = max(1, -(-total // REVIEW_PAGE_SIZE))
+    if pages > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button('← Anterior', key='busca_prev', use_container_width=True, disabled=page <= 1,
+                      on_click=_review_goto, args=('busca_page', page - 1))
+        with col_page:
+            st.caption(f'Página {page} de {pages}')
+        with col_next:
+            st.button('Próxima →', key='busca_next', use_container_width=True, disabled=page >= pages,
+                      on_click=_review_goto, args=('busca_page', page + 1))
+
 # Footer
 st.markdown('---')
 st.caption('📧 Sistema de Automação Gmail → MeisterTask')
+
+profiler.mark(st.session_state.page)
+profiler.finish()
+if get_settings().dashboard_profiler:
+    stats = profiler.summary()
+    st.caption(f"⏱️ Rerun: {stats['last_ms']:.0f} ms — média {stats['avg_ms']:.0f} ms, "
+               f"p95 {stats['p95_ms']:.0f} ms ({stats['runs']} reruns)  |  "
+               + '  ·  '.join(f'{name} {ms:.0f} ms' for name, ms in stats['sections'].items()))
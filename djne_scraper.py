@@ -8,6 +8,25 @@ import requests
 from datetime import datetime, date
 import json
 
+from publication import Publication, ORIGEM_DJNE
+
+
+def _publicacao(idx, process_number, data_disponibilizacao, **campos):
+    """Publication do DJNE com os campos de origem que o dashboard exibe"""
+    subject = f"DJNE - {process_number}"
+    return Publication(
+        process_number=process_number,
+        data_disponibilizacao=data_disponibilizacao,
+        source_subject=subject,
+        origem=ORIGEM_DJNE,
+        pub_id=f'djne_{idx}',
+        email_id=f'djne_{idx}',
+        email_subject=subject,
+        email_sender='DJNE',
+        email_date=data_disponibilizacao,
+        **campos
+    )
+
 
 def buscar_publicacoes_djne(nome_advogado, data_inicio, data_fim=None):
     """
@@ -19,7 +38,7 @@ def buscar_publicacoes_djne(nome_advogado, data_inicio, data_fim=None):
         data_fim (date ou str, opcional): Data final da busca. Se não informado, usa data_inicio
     
     Returns:
-        list: Lista de dicionários com as publicações encontradas
+        list: Lista de Publication com as publicações encontradas
     """
     
     # Converte datas para string no formato YYYY-MM-DD
@@ -94,15 +113,14 @@ def buscar_publicacoes_djne(nome_advogado, data_inicio, data_fim=None):
                 for com in comunicacoes:
                     numero_processo = com.get('numeroprocessocommascara') or com.get('numero_processo') or com.get('numeroProcesso') or 'Não identificado'
                     
-                    publicacao = {
-                        'process_number': numero_processo,
-                        'orgao': com.get('nomeOrgao') or com.get('orgao') or 'Não identificado',
-                        'data_disponibilizacao': com.get('datadisponibilizacao') or com.get('data_disponibilizacao') or com.get('dataDisponibilizacao') or '',
-                        'tipo_comunicacao': com.get('tipoComunicacao') or com.get('tipo_comunicacao') or 'Intimação',
-                        'content': com.get('texto') or com.get('conteudo') or com.get('content') or '',
-                        'source_subject': f"DJNE - {numero_processo}",
-                        'origem': 'DJNE'
-                    }
+                    publicacao = _publicacao(
+                        len(publicacoes),
+                        process_number=numero_processo,
+                        orgao=com.get('nomeOrgao') or com.get('orgao') or 'Não identificado',
+                        data_disponibilizacao=com.get('datadisponibilizacao') or com.get('data_disponibilizacao') or com.get('dataDisponibilizacao') or '',
+                        tipo_comunicacao=com.get('tipoComunicacao') or com.get('tipo_comunicacao') or 'Intimação',
+                        content=com.get('texto') or com.get('conteudo') or com.get('content') or '',
+                    )
                     
                     print(f"DEBUG: Publicação extraída - Processo: {numero_processo}")
                     publicacoes.append(publicacao)
@@ -159,15 +177,14 @@ def buscar_publicacoes_djne(nome_advogado, data_inicio, data_fim=None):
             tipo_match = re.search(r'Tipo de comunicação:\s*([^\n]+)', bloco_conteudo)
             
             # Monta a publicação
-            publicacao = {
-                'process_number': numero_processo,
-                'orgao': orgao_match.group(1).strip() if orgao_match else 'Não identificado',
-                'data_disponibilizacao': data_match.group(1) if data_match else '',
-                'tipo_comunicacao': tipo_match.group(1).strip() if tipo_match else 'Intimação',
-                'content': bloco_conteudo[:5000],  # Limita a 5000 caracteres
-                'source_subject': f"DJNE - {numero_processo}",
-                'origem': 'DJNE'
-            }
+            publicacao = _publicacao(
+                len(publicacoes),
+                process_number=numero_processo,
+                orgao=orgao_match.group(1).strip() if orgao_match else 'Não identificado',
+                data_disponibilizacao=data_match.group(1) if data_match else '',
+                tipo_comunicacao=tipo_match.group(1).strip() if tipo_match else 'Intimação',
+                content=bloco_conteudo[:5000],  # Limita a 5000 caracteres
+            )
             
             publicacoes.append(publicacao)
         
@@ -214,11 +231,11 @@ if __name__ == "__main__":
         print(f"\n✅ Encontradas {len(pubs)} publicações:")
         
         for idx, pub in enumerate(pubs, 1):
-            print(f"\n{idx}. Processo: {pub['process_number']}")
-            print(f"   Órgão: {pub['orgao']}")
-            print(f"   Data: {pub['data_disponibilizacao']}")
-            print(f"   Tipo: {pub['tipo_comunicacao']}")
-            print(f"   Conteúdo (primeiros 200 chars): {pub['content'][:200]}...")
+            print(f"\n{idx}. Processo: {pub.process_number}")
+            print(f"   Órgão: {pub.orgao}")
+            print(f"   Data: {pub.data_disponibilizacao}")
+            print(f"   Tipo: {pub.tipo_comunicacao}")
+            print(f"   Conteúdo (primeiros 200 chars): {pub.content[:200]}...")
             
     except Exception as e:
         print(f"❌ Erro: {str(e)}")
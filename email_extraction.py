@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Extração de publicações a partir de e-mails (sem dependência do Streamlit)
+Usado pelo dashboard e pelo executor agendado (pipeline_runner.py)
+"""
+import base64
+import hashlib
+import re
+
+from publication import Publication
+from task_journal import normalize_content
+
+# Início de um encaminhamento ou de uma resposta com citação (Gmail, Outlook, Apple Mail)
+_FORWARD_MARKER = re.compile(
+    r'^[ \t]*(?:-{2,}[ \t]*(?:Forwarded message|Mensagem encaminhada|Original Message|Mensagem original)[ \t]*-{2,}'
+    r'|Begin forwarded message:|In[ií]cio da mensagem encaminhada:'
+    r'|.*@.*\b(?:escreveu|wrote):)[ \t]*$',   # "Em ..., Fulano <x@y> escreveu:"
+    re.IGNORECASE | re.MULTILINE
+)
+# Cabeçalhos que acompanham o marcador (De/Para/Data/Assunto, em negrito no HTML convertido)
+_FORWARD_HEADER = re.compile(
+    r'^[ \t]*\**(?:De|From|Para|To|Cc|Cco|Bcc|Data|Date|Enviada em|Enviado em|Sent|Assunto|Subject)\**[ \t]*:',
+    re.IGNORECASE
+)
+# Prefixos de citação ("> ", ">> ") no início das linhas
+_QUOTE_PREFIX = re.compile(r'^(?:[ \t]*>)+[ \t]?', re.MULTILINE)
+
+# Devolvido por extract_email_body quando a mensagem não pôde ser decodificada
+BODY_UNAVAILABLE = "Não foi possível extrair o corpo do email"
+
+
+# Função para extrair corpo do email
+def extract_email_body(message):
+    """Extrai o corpo do email e converte HTML para texto plano"""
+    import html2text
+
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.ignore_images = True
+    h.ignore_emphasis = False
+    h.body_width = 0  # Sem quebra de linha automática
+    
+    try:
+        if 'parts' in message['payload']:
+            parts = message['payload']['parts']
+            body = ''
+            html_body = ''
+            
+            # Prioriza text/plain, mas guarda HTML como fallback
+            for part in parts:
+                if part['mimeType'] == 'text/plain':
+                    if 'data' in part['body']:
+                        body += base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
+                elif part['mimeType'] == 'text/html':
+                    if 'data' in part['body']:
+                        html_body += base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
+            
+            # Se não tem text/plain, converte HTML para texto
+            if not body and html_body:
+                body = h.handle(html_body)
+            
+            return body
+        else:
+            if 'data' in message['payload']['body']:
+                raw_data = base64.urlsafe_b64decode(message['payload']['body']['data']).decode('utf-8')
+                # Se parece com HTML, converte para texto
+                if raw_data.strip().startswith('<'):
+                    return h.handle(raw_data)
+                return raw_data
+    except:
+        return BODY_UNAVAILABLE
+    
+    return ""
+
+def unwrap_forwarded_body(email_body):
+    """
+    Corpo do e-mail sem as marcas de encaminhamento e citação
+    Tira os prefixos "> ", o texto de quem encaminhou (antes do primeiro marcador)
+    e cada marcador com o bloco De/Para/Data/Assunto que vem logo abaixo.
+    Um e-mail que não foi encaminhado volta igual
+    """
+    text = _QUOTE_PREFIX.sub('', email_body)
+    first = _FORWARD_MARKER.search(text)
+    if not first:
+        return text
+    lines, in_header = [], True
+    for line in text[first.end():].splitlines():
+        if _FORWARD_MARKER.match(line):
+            in_header = True
+            continue
+        if in_header:
+            if not line.strip() or _FORWARD_HEADER.match(line):
+                continue
+            in_header = False
+        lines.append(line)
+    return '\n'.join(lines).strip()
+
+
+def email_body_key(email_body):
+    """
+    Hash do corpo normalizado: cópias encaminhadas do mesmo e-mail têm a mesma chave
+    None para corpo vazio ou ilegível (BODY_UNAVAILABLE): e-mails diferentes
+    teriam a mesma chave e o segundo seria pulado como cópia
+    """
+    normalized = normalize_content(email_body)
+    if not normalized or normalized == normalize_content(BODY_UNAVAILABLE):
+        return None
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+# Função para extrair publicações de um email
+def extract_publications_from_email(email_body, email_subject, **fields):
+    """
+    Extrai múltiplas publicações de processos judiciais de um email
+    Usa APENAS números como separadores (Publicação: 1, 2, 3...)
+    Ignora "Publicação: Intimacao" e similares
+
+    Retorna objetos Publication; `fields` (email_id, email_sender, ...) vão para todas
+    """
+    publications = []
+    
+    # Padrão SIMPLES e DIRETO: Publicação seguido de número
+    pattern = r'Publicação:\s*(\d+)\s+'
+    pub_matches = list(re.finditer(pattern, email_body, re.IGNORECASE))
+    
+    if pub_matches:
+        for i, match in enumerate(pub_matches):
+            start_pos = match.start()
+            end_pos = pub_matches[i + 1].start() if i + 1 < len(pub_matches) else len(email_body)
+            pub_content = email_body[start_pos:end_pos].strip()
+            
+            process_pattern_marked = r'PROCESSO:\s*(\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4})'
+            process_match_marked = re.search(process_pattern_marked, pub_content, re.IGNORECASE)
+            if process_match_marked:
+                process_number = process_match_marked.group(1)
+            else:
+                process_pattern = r'(\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4})'
+                process_match = re.search(process_pattern, pub_content)
+                process_number = process_match.group(0) if process_match else f'Publicação {match.group(1)}'
+            
+            publications.append(Publication(
+                process_number=process_number,
+                content=pub_content,
+                source_subject=email_subject,
+                email_subject=email_subject,
+                **fields
+            ))
+        return publications
+    
+    # Tenta 'PROCESSO:' como separador
+    process_pattern = r'PROCESSO:\s*(\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4})'
+    process_matches = list(re.finditer(process_pattern, email_body, re.IGNORECASE))
+    if process_matches:
+        for i, match in enumerate(process_matches):
+            process_number = match.group(1)
+            start = max(0, match.start() - 200)
+            end = process_matches[i + 1].start() if i + 1 < len(process_matches) else len(email_body)
+            pub_content = email_body[start:end].strip()
+            publications.append(Publication(
+                process_number=process_number,
+                content=pub_content,
+                source_subject=email_subject,
+                email_subject=email_subject,
+                **fields
+            ))
+        return publications
+    
+    # Fallback: padrão direto de processo
+    process_pattern_simple = r'\d{7}-\d{2}\.\d{4}\.\d+\.\d{2}\.\d{4}'
+    process_matches_simple = list(re.finditer(process_pattern_simple, email_body))
+    if process_matches_simple:
+        for match in process_matches_simple:
+            process_number = match.group(0)
+            start = max(0, match.start() - 200)
+            end = min(len(email_body), match.end() + 1500)
+            pub_content = email_body[start:end].strip()
+            publications.append(Publication(
+                process_number=process_number,
+                content=pub_content,
+                source_subject=email_subject,
+                email_subject=email_subject,
+                **fields
+            ))
+        return publications
+    
+    # Nenhum padrão encontrado — trata como publicação única
+    publications.append(Publication(
+        process_number='Sem número identificado',
+        content=email_body[:5000],
+        source_subject=email_subject,
+        email_subject=email_subject,
+        **fields
+    ))
+    return publications
+
+# Função para extrair nomes das partes de uma publicação
+def extract_parties_from_publication(pub_content):
+    """
+    Extrai nomes das partes (autor/requerente vs réu/requerido) de uma publicação
+    """
+    parties = ""
+    
+    # Padrões comuns para identificar partes
+    patterns = [
+        # REQUERENTE: NOME vs REQUERIDO: NOME
+        r'REQUERENTE:\s*([^\n]+).*?REQUERIDO:\s*([^\n]+)',
+        # EXEQUENTE: NOME vs EXECUTADO: NOME
+        r'EXEQUENTE:\s*([^\n]+).*?EXECUTADO:\s*([^\n]+)',
+        # AUTOR: NOME vs RÉU: NOME
+        r'AUTOR:\s*([^\n]+).*?R[ÉE]U:\s*([^\n]+)',
+        # APELANTE: NOME vs APELADO: NOME
+        r'APELANTE:\s*([^\n]+).*?APELADO:\s*([^\n]+)',
+        # RECORRENTE: NOME vs RECORRIDO: NOME
+        r'RECORRENTE:\s*([^\n]+).*?RECORRIDO:\s*([^\n]+)',
+        # EMBARGANTE: NOME vs EMBARGADO: NOME
+        r'EMBARGANTE:\s*([^\n]+).*?EMBARGADO:\s*([^\n]+)',
+        # AGRAVANTE: NOME vs AGRAVADO: NOME
+        r'AGRAVANTE:\s*([^\n]+).*?AGRAVADO:\s*([^\n]+)',
+        # INTERESSADO: NOME vs INTERESSADO: NOME (segunda parte)
+        r'INTERESSADO:\s*([^\n]+).*?INTERESSADO:\s*([^\n]+)',
+        # IMPETRADO vs IMPETRANTE
+        r'IMPETRANTE:\s*([^\n]+).*?IMPETRADO:\s*([^\n]+)',
+        # CONSULENTE: NOME vs CONSULADO: NOME
+        r'CONSULENTE:\s*([^\n]+).*?CONSULADO:\s*([^\n]+)',
+        # Partes: NOME vs NOME
+        r'Partes:\s*([^\n]+?)\s+vs\s+([^\n]+)',
+        # Parte Autora vs Parte Ré (genérico)
+        r'Parte\s+(?:Autora|Ativa):\s*([^\n]+).*?Parte\s+(?:R[ée]|Passiva):\s*([^\n]+)',
+    ]
+    
+    for pattern in patterns:
+        match = re.search(pattern, pub_content, re.IGNORECASE | re.DOTALL)
+        if match:
+            party1 = match.group(1).strip()
+            party2 = match.group(2).strip()
+            
+            # Remove CPF/CNPJ e números
+            party1 = re.sub(r'\d{11,}', '', party1).strip()
+            party2 = re.sub(r'\d{11,}', '', party2).strip()
+            
+            # Limita tamanho
+            if len(party1) > 50:
+                party1 = party1[:50].strip()
+            if len(party2) > 50:
+                party2 = party2[:50].strip()
+            
+            parties = f"{party1} x {party2}"
+            break
+    
+    # Se não encontrou padrão, tenta pegar primeiros nomes encontrados
+    if not parties:
+        # Procura por linhas que começam com POLO ATIVO/PASSIVO
+        polo_ativo = re.search(r'POLO ATIVO:\s*([^\n]+)', pub_content, re.IGNORECASE)
+        polo_passivo = re.search(r'POLO PASSIVO:\s*([^\n]+)', pub_content, re.IGNORECASE)
+        
+        if polo_ativo and polo_passivo:
+            party1 = polo_ativo.group(1).strip()[:50]
+            party2 = polo_passivo.group(1).strip()[:50]
+            parties = f"{party1} x {party2}"
+    
+    # Se ainda não encontrou, tenta buscar padrão genérico de qualquer parte
+    if not parties:
+        # Busca por palavras-chave de tipos de partes (captura múltiplas ocorrências)
+        parte_keywords = r'(?:INTERESSADO|APELANTE|APELADO|RECORRENTE|RECORRIDO|REQUERENTE|REQUERIDO|EXEQUENTE|EXECUTADO|AUTOR|R[ÉE]U|EMBARGANTE|EMBARGADO|AGRAVANTE|AGRAVADO|IMPETRANTE|IMPETRADO)'
+        matches = re.findall(rf'{parte_keywords}[:\s]+([^\n]+)', pub_content, re.IGNORECASE)
+        
+        if len(matches) >= 2:
+            # Pega as duas primeiras partes encontradas
+            party1 = matches[0].strip()
+            party2 = matches[1].strip()
+            
+            # Remove CPF/CNPJ e números
+            party1 = re.sub(r'\d{11,}', '', party1).strip()
+            party2 = re.sub(r'\d{11,}', '', party2).strip()
+            
+            # Limita tamanho
+            if len(party1) > 50:
+                party1 = party1[:50].strip()
+            if len(party2) > 50:
+                party2 = party2[:50].strip()
+            
+            parties = f"{party1} x {party2}"
+    
+    return parties if parties else "Partes não identificadas"
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Servidor MeisterTask falso para testes locais
+Implementa só o necessário da API: listar, buscar, criar e mover tarefas para a lixeira
+"""
+import json
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import meistertask_api
+
+
+class FakeMeisterTask:
+    """
+    Guarda tarefas em memória e as serve por HTTP em 127.0.0.1
+
+    Args:
+        max_page_size: Maior `limit` aceito por requisição (o resto é cortado,
+                       como a API real faz)
+        throttle_every: Se definido, a cada N requisições responde 429 (Retry-After: 0)
+        honor_sort: Se False, ignora o parâmetro `sort` (devolve na ordem de criação)
+    """
+
+    def __init__(self, max_page_size=100, throttle_every=None, honor_sort=True):
+        self.max_page_size = max_page_size
+        self.honor_sort = honor_sort
+        self.throttle_every = throttle_every   # a cada N requisições, responde 429
+        self.projects = {}     # project_id -> [{'id': ..., 'name': ...}, ...]
+        self.sections = {}     # section_id -> [task_id, ...] na ordem de criação
+        self.tasks = {}        # task_id -> dict da tarefa
+        self.requests = []     # (método, caminho) de cada requisição recebida
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._server = None
+
+    # ── Dados ────────────────────────────────────────────────────────────────
+    def add_section(self, project_id, section_id, name):
+        with self._lock:
+            self.projects.setdefault(project_id, []).append({'id': section_id, 'name': name})
+            self.sections.setdefault(section_id, [])
+
+    def add_task(self, section_id, name, notes='', **fields):
+        with self._lock:
+            task_id = self._next_id
+            self._next_id += 1
+            task = {
+                'id': task_id,
+                'token': f'tok{task_id}',
+                'name': name,
+                'notes': notes,
+                'section_id': section_id,
+                'status': 1,
+                'assigned_to_id': None,
+                'created_at': '2026-01-01T00:00:00Z',
+                'updated_at': '2026-01-01T00:00:00Z',
+            }
+            task.update(fields)
+            self.tasks[task_id] = task
+            self.sections.setdefault(section_id, []).append(task_id)
+            return task
+
+    def section_tasks(self, section_id):
+        with self._lock:
+            return [self.tasks[tid] for tid in self.sections.get(section_id, [])
+                    if self.tasks[tid]['status'] != 18]
+
+    # ── Servidor HTTP ────────────────────────────────────────────────────────
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=None):
+                data = json.dumps(body).encode('utf-8') if body is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}')
+
+            def _dispatch(self, method):
+                parsed = urlparse(self.path)
+                parts = [p for p in parsed.path.split('/') if p]
+                query = parse_qs(parsed.query)
+                with fake._lock:
+                    fake.requests.append((method, parsed.path))
+                    throttled = fake.throttle_every and len(fake.requests) % fake.throttle_every == 0
+                if throttled:
+                    if method in ('POST', 'PUT'):
+                        self._body()
+                    self.send_response(429)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if parts[:1] == ['api']:
+                    parts = parts[1:]
+                status, body = fake.handle(method, parts, query, self._body() if method in ('POST', 'PUT') else None)
+                self._send(status, body)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def do_PUT(self):
+                self._dispatch('PUT')
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @contextmanager
+    def patched_api(self):
+        """Sobe o servidor e aponta meistertask_api para ele durante o bloco"""
+        original_url = meistertask_api.MEISTERTASK_API_URL
+        with self:
+            meistertask_api.MEISTERTASK_API_URL = f"{self.url}/api"
+            try:
+                yield self
+            finally:
+                meistertask_api.MEISTERTASK_API_URL = original_url
+
+    # ── Rotas ────────────────────────────────────────────────────────────────
+    def handle(self, method, parts, query, body):
+        if len(parts) == 3 and parts[0] == 'sections' and parts[2] == 'tasks':
+            section_id = _as_id(parts[1])
+            if section_id not in self.sections:
+                return 404, {'message': 'NOT_FOUND'}
+            if method == 'GET':
+                limit = min(int(query.get('limit', ['20'])[0]), self.max_page_size)
+                offset = int(query.get('offset', ['0'])[0])
+                tasks = self.section_tasks(section_id)
+                if self.honor_sort and query.get('sort') == ['-updated_at']:
+                    tasks = sorted(tasks, key=lambda t: t['updated_at'], reverse=True)
+                return 200, tasks[offset:offset + limit]
+            if method == 'POST':
+                return 201, self.add_task(section_id, body.get('name', ''), body.get('notes', ''))
+
+        if len(parts) == 3 and parts[0] == 'projects' and parts[2] == 'sections':
+            project_id = _as_id(parts[1])
+            if project_id not in self.projects:
+                return 404, {'message': 'NOT_FOUND'}
+            return 200, self.projects[project_id]
+
+        if len(parts) == 2 and parts[0] == 'tasks':
+            task = self.tasks.get(_as_id(parts[1]))
+            if task is None or task['status'] == 18:
+                return 404, {'message': 'NOT_FOUND'}
+            if method == 'GET':
+                return 200, task
+            if method == 'PUT':
+                with self._lock:
+                    task.update(body)
+                return 200, task
+
+        return 404, {'message': 'NOT_FOUND'}
+
+
+def _as_id(value):
+    return int(value) if str(value).isdigit() else value
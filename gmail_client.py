@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Acesso autorizado à API do Gmail
+O serviço é montado uma vez por thread e reaproveitado entre as buscas.
+As credenciais são compartilhadas entre as sessões e renovadas sob um lock.
+Também traz a busca de e-mails (search_emails), usada pelo dashboard, e as
+etapas dela em separado (listar, baixar, converter), usadas pelo pipeline em
+streaming do executor agendado
+"""
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+
+from email_extraction import extract_email_body
+
+SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
+
+
+class GmailClient:
+    """
+    Credenciais + serviço do Gmail de um processo
+
+    - credentials(): carrega o token.pickle uma vez; renova quando expira
+      (uma única thread renova, as outras esperam e reaproveitam o resultado)
+    - service(): um objeto de serviço por thread (httplib2 não é thread-safe),
+      montado do documento de descoberta que vem com o google-api-python-client
+
+    Args:
+        token_path: token OAuth serializado (criado no primeiro login)
+        credentials_path: client secrets do Google Cloud, usado só no login interativo
+        interactive: se False, nunca abre o login no navegador (execução sem tela)
+    """
+
+    def __init__(self, token_path='token.pickle', credentials_path='credentials.json', interactive=True):
+        self.token_path = token_path
+        self.interactive = interactive
+        self.credentials_path = credentials_path
+        self._lock = threading.Lock()
+        self._creds = None
+        self._loaded = False
+        self._generation = 0          # muda quando as credenciais são trocadas
+        self._local = threading.local()
+
+    # ── Credenciais ──────────────────────────────────────────────────────────
+    def _save(self, creds):
+        tmp_path = self.token_path + '.tmp'
+        with open(tmp_path, 'wb') as token:
+            pickle.dump(creds, token)
+        os.replace(tmp_path, self.token_path)
+
+    def credentials(self):
+        """Credenciais válidas, ou None se não há token nem credentials.json"""
+        creds = self._creds
+        if creds is not None and creds.valid:
+            return creds
+
+        with self._lock:
+            if not self._loaded:
+                if os.path.exists(self.token_path):
+                    with open(self.token_path, 'rb') as token:
+                        self._creds = pickle.load(token)
+                self._loaded = True
+
+            creds = self._creds
+            if creds is not None and creds.valid:
+                # Outra thread renovou enquanto esta esperava o lock
+                return creds
+
+            if creds and creds.expired and creds.refresh_token:
+                from google.auth.transport.requests import Request
+                creds.refresh(Request())
+            else:
+                if not self.interactive or not os.path.exists(self.credentials_path):
+                    return None
+                from google_auth_oauthlib.flow import InstalledAppFlow
+                flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, SCOPES)
+                creds = flow.run_local_server(port=8080)
+                self._creds = creds
+                self._generation += 1
+
+            self._save(creds)
+            return creds
+
+    # ── Serviço ──────────────────────────────────────────────────────────────
+    def service(self):
+        """Serviço do Gmail desta thread, ou None se não há como autenticar"""
+        creds = self.credentials()
+        if creds is None:
+            return None
+        cached = getattr(self._local, 'service', None)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+
+        from googleapiclient.discovery import build
+        service = build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
+        self._local.service = (self._generation, service)
+        return service
+
+
+def build_search_query(filters):
+    """Monta a consulta do Gmail a partir dos filtros do dashboard"""
+    query_parts = []
+    
+    # Filtro de texto (assunto ou corpo) - busca mais específica
+    if filters.get('text_search'):
+        # Busca no assunto OU no corpo do email
+        query_parts.append(f'(subject:{filters["text_search"]} OR {filters["text_search"]})')
+    
+    # Filtro de data - ajusta para incluir as datas selecionadas
+    # Gmail usa 'after' e 'before' de forma EXCLUSIVA, então ajustamos:
+    if filters.get('date_from'):
+        # Subtrai 1 dia para incluir a data selecionada
+        date_obj = filters['date_from'] if hasattr(filters['date_from'], 'strftime') else datetime.strptime(filters['date_from'], '%Y/%m/%d').date()
+        adjusted_date = date_obj - timedelta(days=1)
+        query_parts.append(f'after:{adjusted_date.strftime("%Y/%m/%d")}')
+    if filters.get('date_to'):
+        # Adiciona 1 dia para incluir a data selecionada
+        date_obj = filters['date_to'] if hasattr(filters['date_to'], 'strftime') else datetime.strptime(filters['date_to'], '%Y/%m/%d').date()
+        adjusted_date = date_obj + timedelta(days=1)
+        query_parts.append(f'before:{adjusted_date.strftime("%Y/%m/%d")}')
+    
+    # Filtro de lido/não lido
+    if filters.get('read_status') == 'unread':
+        query_parts.append('is:unread')
+    elif filters.get('read_status') == 'read':
+        query_parts.append('is:read')
+    
+    return ' '.join(query_parts) if query_parts else 'in:inbox'
+
+
+def list_message_ids(service, filters, max_results=50):
+    """IDs das mensagens que atendem aos filtros (só a listagem, sem baixar o conteúdo)"""
+    results = service.users().messages().list(
+        userId='me',
+        q=build_search_query(filters),
+        maxResults=max_results
+    ).execute()
+    return [msg['id'] for msg in results.get('messages', [])]
+
+
+def fetch_message(service, message_id):
+    """Mensagem completa (formato bruto da API)"""
+    return service.users().messages().get(
+        userId='me',
+        id=message_id,
+        format='full'
+    ).execute()
+
+
+def parse_message(msg_data):
+    """Converte a mensagem bruta no dict de e-mail usado pelo dashboard e pelo executor"""
+    headers = msg_data['payload']['headers']
+    subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'Sem assunto')
+    sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Desconhecido')
+    date = next((h['value'] for h in headers if h['name'].lower() == 'date'), 'Sem data')
+    
+    # Extrair corpo do email
+    body = extract_email_body(msg_data)
+    
+    # Verificar se está lido
+    is_read = 'UNREAD' not in msg_data.get('labelIds', [])
+    
+    return {
+        'id': msg_data['id'],
+        'subject': subject,
+        'sender': sender,
+        'date': date,
+        'body': body,
+        'is_read': is_read,
+        'raw_data': msg_data
+    }
+
+
+def search_emails(service, filters, max_results=50):
+    """
+    Busca emails baseado nos filtros
+    Erros da API são propagados (quem chama decide como mostrar)
+    """
+    if not service:
+        return []
+    return [parse_message(fetch_message(service, message_id))
+            for message_id in list_message_ids(service, filters, max_results)]
@@ -1,35 +1,21 @@
 #!/usr/bin/env python3
 """Script para listar todas as seções de um projeto do MeisterTask"""
 
-import requests
-import os
+from config import get_settings
+from meistertask_api import list_project_sections
 
 # Carrega configurações
-def load_env_var(key):
-    if os.path.exists('.env'):
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    k, v = line.strip().split('=', 1)
-                    if k == key:
-                        return v
-    return None
-
-api_token = load_env_var('MEISTERTASK_API_TOKEN')
-project_id = load_env_var('MEISTERTASK_PROJECT_ID')
+settings = get_settings()
+api_token = settings.meistertask_api_token
+project_id = settings.meistertask_project_id
 
 if not api_token or not project_id:
     print("❌ Erro: MEISTERTASK_API_TOKEN ou MEISTERTASK_PROJECT_ID não encontrados no .env")
     exit(1)
 
 # Lista todas as seções do projeto
-url = f"https://www.meistertask.com/api/projects/{project_id}/sections"
-headers = {"Authorization": f"Bearer {api_token}"}
-
 try:
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    sections = response.json()
+    sections = list_project_sections(project_id, api_token)
     
     print(f"\n📋 Seções do Projeto (ID: {project_id}):\n")
     print(f"{'ID':<15} {'Nome':<30}")
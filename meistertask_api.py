@@ -0,0 +1,793 @@
+#!/usr/bin/env python3
+"""
+MeisterTask API - Cliente de acesso às tarefas do MeisterTask
+Criação, listagem, exclusão (lixeira) e identificação de duplicatas
+
+Todas as chamadas passam por um MeisterTaskClient por token, que reúne a
+sessão HTTP, o controle de concorrência (AIMD) e as estatísticas de latência.
+As funções create_meistertask_task, list_meistertask_tasks, etc. continuam
+disponíveis e usam esse cliente compartilhado.
+"""
+import re
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# URL base da API (sobrescrita nos testes pelo servidor falso local)
+MEISTERTASK_API_URL = "https://www.meistertask.com/api"
+
+# Status HTTP que indicam sobrecarga temporária: vale a pena tentar de novo
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class MeisterTaskError(Exception):
+    """
+    Erro retornado pela API do MeisterTask (mensagem pronta para exibir)
+    
+    unknown_outcome: a requisição chegou a sair e a resposta se perdeu (timeout,
+    conexão caiu): numa criação, a tarefa pode ou não existir no servidor.
+    """
+    
+    def __init__(self, message, status_code=None, unknown_outcome=False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.unknown_outcome = unknown_outcome
+    
+    @property
+    def transient(self):
+        """True para falhas que podem passar sozinhas e podem ser repetidas (rede, 429, 5xx)"""
+        if self.unknown_outcome:
+            return False
+        return self.status_code is None or self.status_code in RETRYABLE_STATUS
+
+
+def _never_sent(error):
+    """True quando a conexão nem chegou a ser aberta (a requisição não saiu)"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+class AIMDController:
+    """
+    Controle de concorrência compartilhado (aumento aditivo, redução multiplicativa)
+    
+    O limite de requisições simultâneas sobe +1 a cada "janela" de respostas
+    rápidas e cai pela metade quando a API responde 429/5xx, falha por rede
+    ou demora mais que latency_target segundos.
+    """
+    
+    def __init__(self, initial=4, minimum=1, maximum=8, latency_target=3.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.limit = max(minimum, min(initial, maximum))
+        self.in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+    
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+    
+    def release(self, latency, overloaded=False):
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded or latency > self.latency_target:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                # Sobe o limite depois de uma janela inteira sem problemas
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+class _EndpointStats:
+    """Contagem, erros e latências recentes de um endpoint"""
+    
+    def __init__(self, window=500):
+        self.count = 0
+        self.errors = 0
+        self.max_latency = 0.0
+        self.latencies = deque(maxlen=window)
+    
+    def add(self, latency, error):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.max_latency = max(self.max_latency, latency)
+        self.latencies.append(latency)
+    
+    def summary(self):
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {'count': self.count, 'errors': self.errors,
+                    'avg_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': 1000 * sum(ordered) / len(ordered),
+            'p50_ms': 1000 * ordered[len(ordered) // 2],
+            'p95_ms': 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'max_ms': 1000 * self.max_latency,
+        }
+
+
+def _retry_delay(response, attempt, base_delay):
+    """Tempo de espera antes da próxima tentativa (Retry-After ou backoff exponencial)"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            pass
+    return min(base_delay * (2 ** attempt), 30.0)
+
+
+class MeisterTaskClient:
+    """
+    Cliente da API do MeisterTask
+    
+    Args:
+        api_token: Token da API
+        max_concurrency: Teto de requisições simultâneas (somando todas as operações)
+        latency_target: Latência (s) acima da qual o cliente reduz a concorrência
+        base_delay: Espera inicial (s) do backoff exponencial entre tentativas
+    """
+    
+    def __init__(self, api_token, max_concurrency=8, latency_target=3.0, base_delay=0.5, timeout=30):
+        self.api_token = api_token
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.controller = AIMDController(maximum=max_concurrency, latency_target=latency_target)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        })
+        adapter = HTTPAdapter(pool_maxsize=max(16, max_concurrency * 2))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+    
+    # ── Núcleo ───────────────────────────────────────────────────────────────
+    def request(self, endpoint, method, path, retry_statuses=(), max_retries=0, retry_network=True,
+                **kwargs):
+        """
+        Faz uma requisição controlada pelo AIMD e registra a latência em `endpoint`
+        
+        Repete (com backoff) quando o status está em retry_statuses e, se
+        retry_network, em timeout/erro de conexão (só para requisições que podem
+        ser repetidas sem efeito colateral: GET e a PUT da lixeira).
+        Exceções de rede são propagadas após a última tentativa.
+        """
+        url = f"{MEISTERTASK_API_URL}{path}"
+        attempt = 0
+        while True:
+            self.controller.acquire()
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                latency = time.monotonic() - started
+                network = isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+                self.controller.release(latency, overloaded=network)
+                self._record(endpoint, latency, error=True)
+                if not network or not retry_network or attempt >= max_retries:
+                    raise
+            else:
+                latency = time.monotonic() - started
+                self.controller.release(latency, overloaded=response.status_code in RETRYABLE_STATUS)
+                self._record(endpoint, latency, error=response.status_code >= 400)
+                if response.status_code not in retry_statuses or attempt >= max_retries:
+                    return response
+            
+            time.sleep(_retry_delay(response, attempt, self.base_delay))
+            attempt += 1
+    
+    def _record(self, endpoint, latency, error):
+        with self._stats_lock:
+            self._stats.setdefault(endpoint, _EndpointStats()).add(latency, error)
+    
+    def latency_stats(self):
+        """{endpoint: {count, errors, avg_ms, p50_ms, p95_ms, max_ms}}"""
+        with self._stats_lock:
+            return {name: stats.summary() for name, stats in self._stats.items()}
+    
+    # ── Tarefas ──────────────────────────────────────────────────────────────
+    def create_task(self, process_number, parties, description, section_id, existing_index=None,
+                    tags=()):
+        """
+        Cria uma tarefa na seção
+        
+        Se existing_index (ver build_process_index) for informado, a tarefa só é
+        criada quando o processo ainda não está na seção. Nesse caso retorna
+        (True, {'already_exists': True, 'task': tarefa_existente, 'url': link})
+        sem chamar a API; tarefas criadas entram no índice para o resto do lote.
+        
+        tags: etiquetas no início do título (veja task_title).
+        Em caso de falha retorna (False, MeisterTaskError).
+        """
+        key = extract_process_number(process_number)
+        if existing_index is not None and key and key in existing_index:
+            existing = existing_index[key]
+            return True, {
+                'already_exists': True,
+                'task': existing,
+                'url': meistertask_task_url(existing)
+            }
+        
+        payload = {
+            "name": task_title(process_number, parties, tags),
+            "notes": description
+        }
+        
+        try:
+            # POST não é idempotente: só o 429 garante que a tarefa NÃO foi criada.
+            # Timeout ou conexão perdida não são repetidos aqui; o diário e o espelho
+            # decidem depois se a tarefa chegou a ser criada
+            response = self.request('create_task', 'POST', f"/sections/{section_id}/tasks",
+                                    retry_statuses={429}, max_retries=3, retry_network=False, json=payload)
+        except requests.exceptions.RequestException as e:
+            if _never_sent(e):
+                return False, MeisterTaskError(f"Erro de conexão: {str(e)}")
+            return False, MeisterTaskError(f"Sem resposta do MeisterTask (a tarefa pode ter sido criada): {str(e)}",
+                                           unknown_outcome=True)
+        
+        # MeisterTask retorna 200 ou 201 para sucesso
+        if response.status_code in [200, 201]:
+            task = response.json()
+            if existing_index is not None and key:
+                existing_index[key] = task
+            return True, task
+        return False, MeisterTaskError(f"Status {response.status_code}: {response.text}", response.status_code)
+    
+    def update_task(self, task_id, fields):
+        """
+        Altera campos de uma tarefa (PUT com os valores completos: repetir é seguro)
+        Retorna (True, tarefa) ou (False, MeisterTaskError)
+        """
+        try:
+            response = self.request('update_task', 'PUT', f"/tasks/{task_id}",
+                                    retry_statuses=RETRYABLE_STATUS, max_retries=3, json=fields)
+        except requests.exceptions.RequestException as e:
+            return False, MeisterTaskError(f"Erro de conexão: {str(e)}")
+        if response.status_code == 200:
+            return True, response.json()
+        return False, MeisterTaskError(f"Status {response.status_code}: {response.text}", response.status_code)
+    
+    def _fetch_tasks_page(self, section_id, offset, limit, extra_params=None):
+        """Busca uma página de tarefas; levanta MeisterTaskError em qualquer falha"""
+        params = {"limit": limit, "offset": offset}
+        if extra_params:
+            params.update(extra_params)
+        
+        try:
+            response = self.request('list_tasks', 'GET', f"/sections/{section_id}/tasks",
+                                    retry_statuses=RETRYABLE_STATUS, max_retries=3, params=params)
+        except requests.exceptions.Timeout:
+            raise MeisterTaskError("❌ Timeout: A requisição demorou mais de 30 segundos")
+        except requests.exceptions.ConnectionError:
+            raise MeisterTaskError("❌ Erro de conexão: Verifique sua internet")
+        except requests.exceptions.RequestException as e:
+            raise MeisterTaskError(f"❌ Erro de conexão: {str(e)}")
+        
+        if response.status_code != 200:
+            raise MeisterTaskError(_list_error_message(section_id, response), response.status_code)
+        return response.json() or []
+    
+    def iter_tasks(self, section_id, page_size=100, prefetch=4, extra_params=None):
+        """
+        Percorre TODAS as tarefas de uma seção, página a página, sem limite de páginas
+        
+        A primeira página confirma quantas tarefas o servidor devolve por requisição
+        (ele pode limitar abaixo de page_size). A partir daí o offset avança sempre
+        por esse tamanho - sem páginas sobrepostas - e as próximas `prefetch`
+        páginas são buscadas em paralelo enquanto as tarefas já recebidas são
+        entregues ao chamador.
+        
+        Levanta MeisterTaskError se alguma página falhar.
+        """
+        first = self._fetch_tasks_page(section_id, 0, page_size, extra_params)
+        yield from first
+        if not first:
+            return
+        
+        step = len(first)
+        if step < page_size:
+            # Página curta: ou é a última, ou o servidor limita o tamanho da página
+            second = self._fetch_tasks_page(section_id, step, page_size, extra_params)
+            yield from second
+            if len(second) < step:
+                return
+            next_offset = step * 2
+        else:
+            next_offset = step
+        
+        pool = ThreadPoolExecutor(max_workers=max(1, prefetch))
+        try:
+            pending = []
+            while True:
+                # Mantém `prefetch` páginas em voo à frente da que está sendo entregue
+                while len(pending) < prefetch:
+                    pending.append(pool.submit(
+                        self._fetch_tasks_page, section_id, next_offset, step, extra_params
+                    ))
+                    next_offset += step
+                
+                tasks = pending.pop(0).result()
+                yield from tasks
+                
+                # Página incompleta = fim da seção
+                if len(tasks) < step:
+                    return
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def get_task(self, task_id):
+        """Busca uma tarefa; (False, "404_NOT_FOUND" | "HTTP_xxx" | "CONNECTION_ERROR: ...") em falha"""
+        try:
+            response = self.request('get_task', 'GET', f"/tasks/{task_id}",
+                                    retry_statuses=RETRYABLE_STATUS, max_retries=2)
+        except requests.exceptions.RequestException as e:
+            return False, f"CONNECTION_ERROR: {str(e)}"
+        
+        if response.status_code == 200:
+            return True, response.json()
+        elif response.status_code == 404:
+            return False, "404_NOT_FOUND"
+        return False, f"HTTP_{response.status_code}"
+    
+    def trash_task(self, task_id, max_retries=0):
+        """
+        Move uma tarefa para a lixeira (PUT status=18)
+        
+        Retorna:
+            (bool, str): (sucesso, mensagem)
+            - True se a tarefa foi deletada ou já estava deletada (404)
+            - False apenas se houver um erro real que impeça a operação
+        """
+        retry = RETRYABLE_STATUS if max_retries else ()
+        try:
+            response = self.request('trash_task', 'PUT', f"/tasks/{task_id}",
+                                    retry_statuses=retry, max_retries=max_retries, json={"status": 18})
+        except requests.exceptions.RequestException as e:
+            return _trash_result_from_exception(task_id, e)
+        return _trash_result_from_response(task_id, response)
+    
+    def trash_tasks(self, task_ids, max_workers=8, max_retries=5, progress_callback=None):
+        """
+        Move várias tarefas para a lixeira em paralelo
+        
+        A concorrência efetiva é a do AIMDController do cliente: cresce enquanto
+        a API responde bem e cai pela metade a cada 429/5xx, com a tarefa
+        repetida após backoff. 404 conta como "já excluída".
+        
+        Retorna:
+            dict com success_count, already_count, error_count, errors,
+            removed_ids (excluídas ou já excluídas), elapsed (s) e throughput (tarefas/s)
+        """
+        summary = {
+            'success_count': 0,
+            'already_count': 0,
+            'error_count': 0,
+            'errors': [],
+            'removed_ids': [],
+            'elapsed': 0.0,
+            'throughput': 0.0
+        }
+        total = len(task_ids)
+        if total == 0:
+            return summary
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.trash_task, tid, max_retries): tid for tid in task_ids}
+            for done, future in enumerate(as_completed(futures), 1):
+                ok, msg = future.result()
+                if ok:
+                    summary['removed_ids'].append(futures[future])
+                    if '404' in msg or 'já estava' in msg:
+                        summary['already_count'] += 1
+                    else:
+                        summary['success_count'] += 1
+                else:
+                    summary['error_count'] += 1
+                    summary['errors'].append(msg)
+                if progress_callback:
+                    progress_callback(done, total)
+        
+        summary['elapsed'] = time.monotonic() - started
+        summary['throughput'] = total / summary['elapsed'] if summary['elapsed'] > 0 else 0.0
+        return summary
+    
+    # ── Projeto ──────────────────────────────────────────────────────────────
+    def list_sections(self, project_id):
+        """Lista as seções de um projeto; levanta MeisterTaskError em caso de falha"""
+        try:
+            response = self.request('list_sections', 'GET', f"/projects/{project_id}/sections",
+                                    retry_statuses=RETRYABLE_STATUS, max_retries=3)
+        except requests.exceptions.RequestException as e:
+            raise MeisterTaskError(f"❌ Erro de conexão: {str(e)}")
+        
+        if response.status_code != 200:
+            raise MeisterTaskError(
+                f"❌ Erro HTTP {response.status_code} ao listar seções do projeto {project_id}",
+                response.status_code
+            )
+        return response.json() or []
+    
+    def scan_project(self, project_id, max_workers=4):
+        """
+        Busca as tarefas de TODAS as seções do projeto em paralelo
+        
+        Cada seção é paginada por iter_tasks (que já faz prefetch); até
+        max_workers seções são lidas ao mesmo tempo. Cada tarefa recebe
+        'section_name' com o nome da seção onde está.
+        
+        Retorna:
+            (sections, tasks_by_section): lista de seções e {section_id: [tarefas]}
+        """
+        sections = self.list_sections(project_id)
+        names = {s.get('id'): s.get('name', 'Sem nome') for s in sections}
+        
+        def _fetch(section_id):
+            tasks = list(self.iter_tasks(section_id))
+            for task in tasks:
+                task['section_name'] = names.get(section_id, '')
+            return tasks
+        
+        tasks_by_section = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_fetch, section_id): section_id for section_id in names}
+            for future in as_completed(futures):
+                tasks_by_section[futures[future]] = future.result()
+        # Na ordem das seções do projeto, não na ordem em que as buscas terminaram
+        return sections, {section_id: tasks_by_section[section_id] for section_id in names}
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_meistertask_client(api_token):
+    """Cliente compartilhado por token (mesma sessão e mesmo controle de carga)"""
+    with _clients_lock:
+        client = _clients.get(api_token)
+        if client is None:
+            client = _clients[api_token] = MeisterTaskClient(api_token)
+        return client
+
+
+# =============================================================================
+# Funções de conveniência (usam o cliente compartilhado do token)
+# =============================================================================
+# Função para criar tarefa no MeisterTask
+def create_meistertask_task(process_number, parties, description, section_id, api_token,
+                            existing_index=None, tags=()):
+    """
+    Cria uma tarefa no MeisterTask via API
+    Veja MeisterTaskClient.create_task
+    """
+    return get_meistertask_client(api_token).create_task(
+        process_number, parties, description, section_id, existing_index=existing_index, tags=tags
+    )
+
+
+def update_meistertask_task(task_id, fields, api_token):
+    """
+    Altera campos de uma tarefa (ex.: {'notes': ...})
+    Veja MeisterTaskClient.update_task
+    """
+    return get_meistertask_client(api_token).update_task(task_id, fields)
+
+
+def iter_meistertask_tasks(section_id, api_token, page_size=100, prefetch=4, extra_params=None):
+    """
+    Percorre TODAS as tarefas de uma seção em streaming
+    Veja MeisterTaskClient.iter_tasks
+    """
+    return get_meistertask_client(api_token).iter_tasks(
+        section_id, page_size=page_size, prefetch=prefetch, extra_params=extra_params
+    )
+
+
+def list_meistertask_tasks(section_id, api_token):
+    """
+    Lista TODAS as tarefas de uma seção do MeisterTask (com paginação)
+    Veja iter_meistertask_tasks para a versão em streaming
+    """
+    # Validação básica dos parâmetros
+    if not section_id or not api_token:
+        return False, "❌ Section ID ou API Token não configurados"
+    
+    try:
+        return True, list(iter_meistertask_tasks(section_id, api_token))
+    except MeisterTaskError as e:
+        return False, str(e)
+
+
+def list_project_sections(project_id, api_token):
+    """Lista as seções de um projeto do MeisterTask (levanta MeisterTaskError)"""
+    return get_meistertask_client(api_token).list_sections(project_id)
+
+
+def scan_project_tasks(project_id, api_token, max_workers=4):
+    """Tarefas de todas as seções do projeto; veja MeisterTaskClient.scan_project"""
+    return get_meistertask_client(api_token).scan_project(project_id, max_workers=max_workers)
+
+
+def get_meistertask_task(task_id, api_token):
+    """
+    Busca informações de uma tarefa específica do MeisterTask
+    """
+    return get_meistertask_client(api_token).get_task(task_id)
+
+
+def delete_meistertask_task(task_id, api_token):
+    """
+    Move uma tarefa do MeisterTask para a lixeira (trash)
+    A API do MeisterTask usa PUT com status=18 para enviar tarefas para a lixeira
+    
+    Retorna:
+        (bool, str): (sucesso, mensagem)
+        - True se a tarefa foi deletada ou já estava deletada (404)
+        - False apenas se houver um erro real que impeça a operação
+    """
+    return get_meistertask_client(api_token).trash_task(task_id)
+
+
+def trash_meistertask_tasks(task_ids, api_token, max_workers=8, max_retries=5, progress_callback=None):
+    """
+    Move várias tarefas para a lixeira em paralelo
+    Veja MeisterTaskClient.trash_tasks
+    """
+    return get_meistertask_client(api_token).trash_tasks(
+        task_ids, max_workers=max_workers, max_retries=max_retries, progress_callback=progress_callback
+    )
+
+
+# =============================================================================
+# Auxiliares
+# =============================================================================
+def task_title(process_number, parties, tags=()):
+    """
+    Título da tarefa: [numero do processo] - [nome das partes], limitado a 250 caracteres
+    Com etiquetas (clientes identificados): "[CLIENTE A, CLIENTE B] numero - partes"
+    """
+    title = f"{process_number} - {parties}"
+    if tags:
+        title = f"[{', '.join(tags)}] {title}"
+    # MeisterTask tem limite de tamanho no título
+    if len(title) > 250:
+        title = title[:247] + "..."
+    return title
+
+
+def meistertask_task_url(task):
+    """Link para abrir a tarefa no MeisterTask (app web)"""
+    token = task.get('token')
+    if token:
+        return f"https://www.meistertask.com/app/task/{token}"
+    return f"https://www.meistertask.com/app/task/{task.get('id')}"
+
+
+def build_process_index(tasks):
+    """
+    Índice em memória {numero_processo: tarefa} das tarefas já existentes
+    Aceita qualquer iterável (ex.: iter_meistertask_tasks); guarda a primeira
+    tarefa encontrada de cada processo
+    """
+    index = {}
+    for task in tasks:
+        process_number = extract_process_number(task.get('name', ''))
+        if process_number and process_number not in index:
+            index[process_number] = task
+    return index
+
+
+def _list_error_message(section_id, response):
+    """Monta a mensagem de erro da listagem de tarefas para um status HTTP"""
+    if response.status_code == 404:
+        # Section ID inválido ou não existe
+        return f"""
+❌ **Erro 404: Seção não encontrada**
+
+A seção com ID `{section_id}` não existe ou você não tem acesso a ela.
+
+**Possíveis causas:**
+1. O `MEISTERTASK_SECTION_ID` no arquivo `.env` está incorreto
+2. A seção foi deletada do MeisterTask
+3. Você não tem permissão para acessar esta seção
+
+**Como corrigir:**
+1. Acesse o MeisterTask no navegador
+2. Vá até o quadro/projeto desejado
+3. Abra a seção "Publicações" (ou outra que deseja usar)
+4. Copie o ID da seção da URL (número após `/sections/`)
+5. Atualize o valor de `MEISTERTASK_SECTION_ID` no arquivo `.env`
+
+**ID atual configurado:** `{section_id}`
+"""
+    
+    elif response.status_code == 401:
+        # Token inválido ou expirado
+        return """
+❌ **Erro 401: Não autorizado**
+
+O token de API está inválido ou expirado.
+
+**Como corrigir:**
+1. Acesse o MeisterTask: Account Settings → Developer
+2. Gere um novo token de API
+3. Atualize `MEISTERTASK_API_TOKEN` no arquivo `.env`
+"""
+    
+    elif response.status_code == 403:
+        # Sem permissão
+        return f"❌ Erro 403: Sem permissão para acessar a seção {section_id}"
+    
+    # Outros erros
+    try:
+        error_detail = response.json()
+        error_msg = error_detail.get('message', response.text[:200])
+    except:
+        error_msg = response.text[:200]
+    return f"❌ Erro HTTP {response.status_code}: {error_msg}"
+
+
+def _trash_result_from_response(task_id, response):
+    """
+    Classifica a resposta do PUT status=18 (lixeira) de uma tarefa
+    
+    Retorna:
+        (bool, str): (sucesso, mensagem) - mesmas regras de delete_meistertask_task
+    """
+    if response.status_code in [200, 204]:
+        # Sucesso: tarefa movida para lixeira
+        if response.status_code == 200:
+            try:
+                result = response.json()
+                new_status = result.get('status', 'unknown')
+                return True, f"✓ Tarefa ID {str(task_id)[:8]}... movida para lixeira (status: {new_status})"
+            except:
+                return True, f"✓ Tarefa ID {str(task_id)[:8]}... movida para lixeira"
+        return True, f"✓ Tarefa ID {str(task_id)[:8]}... deletada com sucesso"
+    
+    elif response.status_code == 404:
+        # 404 NOT_FOUND: tarefa já foi deletada anteriormente ou nunca existiu
+        # Consideramos como SUCESSO pois o objetivo (tarefa não existir) foi alcançado
+        return True, f"⚠ Tarefa ID {str(task_id)[:8]}... já estava deletada (404: NOT_FOUND)"
+    
+    elif response.status_code == 403:
+        # 403 FORBIDDEN: sem permissão
+        return False, f"✗ Sem permissão para deletar tarefa ID {str(task_id)[:8]}... (403: FORBIDDEN)"
+    
+    elif response.status_code == 400:
+        # 400 BAD_REQUEST: parâmetros inválidos
+        try:
+            error_detail = response.json()
+            error_msg = error_detail.get('message', response.text[:200])
+        except:
+            error_msg = response.text[:200]
+        return False, f"✗ Requisição inválida para tarefa ID {str(task_id)[:8]}... (400): {error_msg}"
+    
+    else:
+        # Outros erros HTTP
+        try:
+            error_msg = response.text[:200]
+        except:
+            error_msg = "Resposta não disponível"
+        return False, f"✗ Erro HTTP {response.status_code} ao deletar tarefa ID {str(task_id)[:8]}...: {error_msg}"
+
+
+def _trash_result_from_exception(task_id, exc):
+    """Converte uma exceção de rede na mensagem padrão de erro de exclusão"""
+    if isinstance(exc, requests.exceptions.Timeout):
+        return False, f"✗ Timeout ao deletar tarefa ID {str(task_id)[:8]}... (>30s)"
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return False, f"✗ Erro de conexão ao deletar tarefa ID {str(task_id)[:8]}..."
+    return False, f"✗ Erro de rede ao deletar tarefa ID {str(task_id)[:8]}...: {str(exc)[:100]}"
+
+
+def extract_process_number(task_name):
+    """
+    Extrai o número do processo do nome da tarefa.
+    Formato esperado: "XXXXXXX-XX.XXXX.X.XX.XXXX - Nome das Partes"
+    Aceita variações com 1 ou 2 dígitos no segmento do meio
+    """
+    import re
+    # Padrão mais flexível para número de processo brasileiro
+    # Aceita: NNNNNNN-DD.AAAA.J.TT.OOOO onde J pode ser 1 ou 2 dígitos
+    pattern = r'(\d{7}-\d{2}\.\d{4}\.\d{1,2}\.\d{2}\.\d{4})'
+    match = re.search(pattern, task_name)
+    if match:
+        return match.group(1)
+    return None
+
+
+def find_duplicate_tasks(tasks, only_unassigned=True):
+    """
+    Identifica tarefas duplicadas baseadas no número do processo
+    Retorna um dicionário: {numero_processo: [lista de tarefas]}
+    
+    Args:
+        tasks: Lista de tarefas do MeisterTask
+        only_unassigned: Se True, considera apenas tarefas sem responsável designado
+    """
+    # Primeiro, filtra tarefas sem responsável se solicitado
+    if only_unassigned:
+        filtered_tasks = [task for task in tasks if not task.get('assigned_to_id')]
+    else:
+        filtered_tasks = tasks
+    
+    process_dict = {}
+    tasks_without_process = []  # Tarefas sem número de processo válido
+    
+    for task in filtered_tasks:
+        task_name = task.get('name', '')
+        process_number = extract_process_number(task_name)
+        
+        # Só agrupa tarefas que TÊM número de processo válido
+        if process_number:
+            if process_number not in process_dict:
+                process_dict[process_number] = []
+            
+            process_dict[process_number].append(task)
+        else:
+            # Tarefa sem número de processo - não agrupa
+            tasks_without_process.append(task_name[:80])
+    
+    # Filtra APENAS processos que têm MAIS DE UMA tarefa
+    duplicates = {k: v for k, v in process_dict.items() if len(v) > 1}
+    
+    return duplicates
+
+
+def find_cross_section_duplicates(tasks, inbox_section_id=None):
+    """
+    Duplicatas do projeto inteiro que aparecem em MAIS DE UMA seção
+    (ex.: uma tarefa foi movida para "Em andamento" e outra nova caiu em "Publicações")
+
+    Considera todas as tarefas, inclusive as com responsável: a que foi movida
+    para "Em andamento" normalmente já tem um. Cada grupo vem ordenado com as
+    tarefas fora da seção de entrada (inbox_section_id, "Publicações") primeiro
+    e, entre elas, a mais antiga: a primeira é a que deve ser mantida.
+    """
+    inbox = str(inbox_section_id) if inbox_section_id is not None else None
+
+    def _order(task):
+        return (str(task.get('section_id')) == inbox, task.get('created_at') or '', str(task.get('id')))
+
+    duplicates = find_duplicate_tasks(tasks, only_unassigned=False)
+    return {
+        process_number: sorted(duplicates[process_number], key=_order)
+        for process_number in sorted(duplicates)
+        if len({t.get('section_id') for t in duplicates[process_number]}) > 1
+    }
+
+
+def locked_duplicate_ids(groups, inbox_section_id):
+    """
+    IDs das tarefas de grupos de duplicatas (mesmo processo ou texto similar)
+    que não podem ir para a lixeira pelo dashboard: as com responsável e as que
+    estão fora da seção de entrada
+    """
+    inbox = str(inbox_section_id)
+    return {
+        t['id'] for group in groups for t in group
+        if t.get('assigned_to_id') or str(t.get('section_id', inbox_section_id)) != inbox
+    }
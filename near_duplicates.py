@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Detecção de tarefas quase duplicadas por MinHash/LSH sobre as notas
+Pega duplicatas que a comparação exata do número do processo não vê:
+tarefas "Sem número identificado", "Publicação 3" ou com erro de digitação no CNJ
+"""
+import re
+import unicodedata
+
+import numpy as np
+
+from meistertask_api import extract_process_number
+
+# Primo de Mersenne 2^31-1: a*x+b cabe em uint64 para x, a, b < 2^31
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def _normalize(text):
+    """Minúsculas, sem acentos e só letras/números"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+# Base do hash polinomial dos n-gramas
+_BASE = np.uint64(1000003)
+
+
+def shingles(text, size=5):
+    """Hashes (únicos) dos n-gramas de palavras do texto, como array numpy"""
+    words = _normalize(text)
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    # hash() do Python varia entre processos, mas as assinaturas só são
+    # comparadas dentro da mesma execução
+    word_hashes = (np.fromiter(map(hash, words), dtype=np.int64, count=len(words))
+                   & 0x7fffffff).astype(np.uint64)
+    if len(words) <= size:
+        size = len(words)
+    count = len(words) - size + 1
+    acc = np.zeros(count, dtype=np.uint64)
+    for k in range(size):
+        acc = (acc * _BASE + word_hashes[k:k + count]) % _PRIME
+    return np.unique(acc)
+
+
+class MinHasher:
+    """Gera assinaturas MinHash com num_perm permutações (a*x+b mod p)"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+
+    def signature(self, values):
+        hashed = (np.outer(self._a, values) + self._b[:, None]) % _PRIME
+        return hashed.min(axis=1)
+
+
+def find_near_duplicate_tasks(tasks, threshold=0.8, num_perm=64, bands=16, exclude_ids=None):
+    """
+    Agrupa tarefas com notas parecidas (similaridade de Jaccard estimada >= threshold)
+
+    Cada tarefa vira uma assinatura MinHash; as assinaturas são quebradas em
+    `bands` faixas e só tarefas que caem no mesmo balde de alguma faixa são
+    comparadas - custo aproximadamente linear no número de tarefas.
+
+    Args:
+        tasks: Lista de tarefas do MeisterTask (usa 'notes' e, na falta, 'name')
+        exclude_ids: IDs que não devem entrar nos grupos (ex.: já nas duplicatas exatas)
+
+    Retorna:
+        lista de grupos (listas de tarefas), cada um com 2 ou mais tarefas
+    """
+    exclude_ids = set(exclude_ids or ())
+    hasher = MinHasher(num_perm=num_perm)
+    rows = num_perm // bands
+
+    candidates = []
+    signatures = []
+    for task in tasks:
+        if task.get('id') in exclude_ids:
+            continue
+        values = shingles(task.get('notes') or task.get('name', ''))
+        if not len(values):
+            continue
+        candidates.append(task)
+        signatures.append(hasher.signature(values))
+    if len(candidates) < 2:
+        return []
+
+    parent = list(range(len(candidates)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    matrix = np.vstack(signatures)
+    checked = set()
+    for band in range(bands):
+        buckets = {}
+        for idx, row in enumerate(matrix[:, band * rows:(band + 1) * rows]):
+            buckets.setdefault(row.tobytes(), []).append(idx)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            first = members[0]
+            for other in members[1:]:
+                pair = (first, other)
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                similarity = float(np.mean(matrix[first] == matrix[other]))
+                if similarity >= threshold:
+                    parent[find(other)] = find(first)
+
+    groups = {}
+    for idx, task in enumerate(candidates):
+        groups.setdefault(find(idx), []).append(task)
+
+    result = []
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        # Grupos em que todas têm o mesmo CNJ já aparecem na busca exata
+        numbers = {extract_process_number(t.get('name', '')) for t in group}
+        if len(numbers) == 1 and None not in numbers:
+            continue
+        result.append(group)
+    return result
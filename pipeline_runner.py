@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Execução automática do fluxo Gmail/DJNE → MeisterTask, sem o dashboard
+A cada rodada: busca as publicações, extrai, aplica as regras de aprovação
+automática, descarta as que já viraram tarefa e cria o restante. O resumo de
+cada rodada é impresso e acrescentado a .cache/runner_reports.jsonl
+
+Uso:
+    python pipeline_runner.py --once                 # uma rodada e sai
+    python pipeline_runner.py --every 15             # a cada 15 minutos
+    python pipeline_runner.py --once --dry-run       # só mostra o que seria criado
+
+O Gmail precisa de um token.pickle já autorizado (faça o login uma vez pelo
+dashboard); aqui o login interativo nunca é aberto.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, timedelta
+
+from background_jobs import (
+    create_task_item, existing_process_index, ITEM_CREATED, ITEM_EXISTING, ITEM_RESUMED, ITEM_QUEUED,
+    ITEM_FAILED
+)
+from client_matcher import ClientMatcher
+from config import get_settings, get_value
+from cross_source_dedupe import CrossSourceIndex
+from email_extraction import unwrap_forwarded_body, email_body_key
+from gmail_client import GmailClient, list_message_ids, fetch_message, parse_message
+from meistertask_api import MeisterTaskError, update_meistertask_task
+from publication_store import PublicationStore
+from publications import gmail_publications, consolidate_publications
+from retry_queue import RetryQueue, RetryWorker
+from streaming_pipeline import StreamingPipeline, Stage
+from task_journal import TaskJournal
+from task_mirror import TaskMirror
+
+DEFAULT_RULES_PATH = 'auto_approve_rules.json'
+DEFAULT_REPORTS_PATH = os.path.join('.cache', 'runner_reports.jsonl')
+
+SOURCE_GMAIL = 'Gmail'
+SOURCE_DJNE = 'DJNE'
+
+# Outra publicação de um processo cuja tarefa foi criada nesta mesma rodada
+ITEM_APPENDED = 'appended'
+
+
+@dataclass(frozen=True)
+class AutoApproveRules:
+    """
+    Regras para uma publicação virar tarefa sem revisão
+
+    As que não passam ficam retidas: aparecem no relatório da rodada para
+    serem tratadas pelo dashboard.
+    """
+    require_process_number: bool = True      # só publicações com CNJ válido
+    include_keywords: tuple = ()             # se houver, o texto precisa ter ao menos uma
+    exclude_keywords: tuple = ()             # nenhuma pode aparecer no texto
+    orgaos: tuple = ()                       # se houver, o órgão precisa conter um destes
+    max_per_run: int = 50                    # acima disso, o excedente fica para a revisão
+    consolidate: bool = False                # uma tarefa por processo (cria só após extrair tudo)
+    gmail_query: str = ''                    # texto da busca no Gmail (assunto ou corpo)
+    lookback_days: int = 1                   # dias anteriores a hoje incluídos na busca
+
+    @classmethod
+    def load(cls, path=DEFAULT_RULES_PATH):
+        """Lê as regras de um JSON; chaves ausentes ficam com o padrão"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Regras desconhecidas em {path}: {', '.join(sorted(unknown))}")
+        values = {k: tuple(v) if isinstance(v, list) else v for k, v in data.items()}
+        return cls(**values)
+
+    def rejection(self, pub):
+        """Motivo para reter a publicação, ou None se ela está aprovada"""
+        if self.require_process_number and not pub.cnj_key:
+            return 'sem número de processo'
+        text = pub.content.lower()
+        if self.include_keywords and not any(k.lower() in text for k in self.include_keywords):
+            return 'nenhuma palavra-chave obrigatória'
+        for keyword in self.exclude_keywords:
+            if keyword.lower() in text:
+                return f'contém "{keyword}"'
+        if self.orgaos:
+            orgao = pub.orgao.lower()
+            if not any(o.lower() in orgao for o in self.orgaos):
+                return 'órgão fora da lista'
+        return None
+
+
+@dataclass
+class RunReport:
+    """Resumo de uma rodada (gravado como uma linha de runner_reports.jsonl)"""
+    started_at: str
+    finished_at: str = ''
+    dry_run: bool = False
+    fetched: dict = field(default_factory=dict)      # fonte -> e-mails/publicações lidos
+    duplicate_emails: int = 0                        # cópias encaminhadas não extraídas
+    extracted: int = 0
+    held: list = field(default_factory=list)         # [{process_number, origem, reason}]
+    already_processed: int = 0
+    duplicates: list = field(default_factory=list)   # [{process_number, origem, duplicate_of}]
+    items: int = 0
+    created: list = field(default_factory=list)
+    appended: list = field(default_factory=list)     # acrescentadas a uma tarefa criada nesta rodada
+    existing: list = field(default_factory=list)
+    queued: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    first_task_s: float = None                       # segundos até a primeira tarefa criada
+    pipeline: dict = field(default_factory=dict)     # contadores de cada estágio
+
+    def as_dict(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def format(self):
+        lines = [f"📋 Rodada {self.started_at}" + (' (simulação)' if self.dry_run else '')]
+        for source, count in self.fetched.items():
+            lines.append(f"  {source}: {count} lido(s)")
+        if self.duplicate_emails:
+            lines.append(f"  E-mails repetidos (encaminhados) ignorados: {self.duplicate_emails}")
+        lines.append(f"  Publicações extraídas: {self.extracted}")
+        lines.append(f"  Já processadas antes: {self.already_processed}")
+        if self.duplicates:
+            lines.append(f"  Duplicadas (outra fonte ou rodada): {len(self.duplicates)}")
+            for pub in self.duplicates:
+                lines.append(f"    - {pub['process_number']} ({pub['origem']}) = {pub['duplicate_of']}")
+        lines.append(f"  Retidas para revisão: {len(self.held)}")
+        for pub in self.held:
+            lines.append(f"    - {pub['process_number']} ({pub['origem']}): {pub['reason']}")
+        lines.append(f"  {'Seriam criadas' if self.dry_run else 'Criadas'}: "
+                     f"{self.items if self.dry_run else len(self.created)}")
+        if self.first_task_s is not None:
+            lines.append(f"  Primeira tarefa em {self.first_task_s:.1f}s")
+        if self.appended:
+            lines.append(f"  Acrescentadas a tarefas criadas nesta rodada: {len(self.appended)}")
+        if self.existing:
+            lines.append(f"  Já existiam na seção: {len(self.existing)}")
+        if self.queued:
+            lines.append(f"  Na fila de novas tentativas: {len(self.queued)}")
+        for error in self.errors:
+            lines.append(f"  ❌ {error}")
+        return '\n'.join(lines)
+
+
+# Threads por estágio (a deduplicação é sempre uma só: guarda o estado da rodada)
+DEFAULT_CONCURRENCY = {'fetch': 4, 'decode': 2, 'extract': 2, 'fingerprint': 2, 'create': 2}
+DEFAULT_BUFFER = 16
+
+
+class PipelineRunner:
+    """
+    Uma rodada completa do fluxo, em streaming (veja streaming_pipeline.py):
+
+        fonte → fetch → decode → extract → fingerprint → dedupe → create
+
+    - fonte: IDs das mensagens do Gmail e publicações do DJNE
+    - fetch/decode: baixa cada mensagem e converte no dict de e-mail (só Gmail)
+    - extract: publicações (Publication) do e-mail, uma vez por corpo (cópias
+      encaminhadas do mesmo resumo são puladas); as do DJNE já chegam prontas.
+      Todas recebem as etiquetas dos clientes citados (ClientMatcher)
+    - fingerprint: simhash e números do conteúdo (CNJ normalizado já vem da Publication)
+    - dedupe: arquiva no histórico (PublicationStore); descarta as do diário (já
+      criadas), as repetidas na rodada e as que já chegaram pela outra fonte ou
+      numa rodada anterior (CrossSourceIndex); aplica as regras de aprovação
+    - create: create_task_item (índice da seção + fila de novas tentativas); sem
+      agrupamento, outra publicação de um processo criado na mesma rodada é
+      acrescentada às notas dessa tarefa
+
+    As primeiras tarefas são criadas enquanto os e-mails seguintes ainda estão
+    sendo baixados. Com rules.consolidate o agrupamento por processo precisa de
+    todas as publicações, então a criação só começa depois da extração.
+
+    gmail_client: GmailClient (padrão: o token.pickle local, sem login interativo)
+    djne_fetch: fn(inicio, fim) -> lista de Publication (padrão: buscar_publicacoes_djne)
+    client_matcher: ClientMatcher (padrão: settings.client_roster_file)
+    """
+
+    def __init__(self, settings, rules, sources=(SOURCE_GMAIL, SOURCE_DJNE), journal=None,
+                 mirror=None, retry_queue=None, store=None, dedupe_index=None,
+                 client_matcher=None, gmail_client=None, djne_fetch=None,
+                 reports_path=DEFAULT_REPORTS_PATH, delay=0.5, concurrency=None, buffer=DEFAULT_BUFFER):
+        self.settings = settings
+        self.rules = rules
+        self.sources = sources
+        self.journal = journal if journal is not None else TaskJournal()
+        self.mirror = mirror if mirror is not None else TaskMirror()
+        self.retry_queue = retry_queue if retry_queue is not None else RetryQueue()
+        self.store = store if store is not None else PublicationStore()
+        self.dedupe_index = dedupe_index if dedupe_index is not None else CrossSourceIndex()
+        self.client_matcher = (client_matcher if client_matcher is not None
+                               else ClientMatcher.load(settings.client_roster_file))
+        self.gmail_client = gmail_client
+        self.djne_fetch = djne_fetch or self._fetch_djne
+        self.reports_path = reports_path
+        self.delay = delay
+        self.concurrency = dict(DEFAULT_CONCURRENCY, **(concurrency or {}))
+        self.buffer = buffer
+        # Mesmo processo nunca é criado por duas threads ao mesmo tempo
+        self._process_locks = [threading.Lock() for _ in range(32)]
+
+    # ── Fontes ───────────────────────────────────────────────────────────────
+    def _gmail_service(self):
+        """Serviço do Gmail da thread atual (cada thread do estágio fetch tem o seu)"""
+        if self.gmail_client is None:
+            self.gmail_client = GmailClient(interactive=False)
+        service = self.gmail_client.service()
+        if service is None:
+            raise RuntimeError('Gmail sem token autorizado (faça o login pelo dashboard)')
+        return service
+
+    def _fetch_djne(self, date_from, date_to):
+        from djne_scraper import buscar_publicacoes_djne
+        return buscar_publicacoes_djne(self.settings.djne_nome_advogado, date_from, date_to)
+
+    def _source(self, report, today):
+        """Gera (fonte, item): IDs de mensagem do Gmail, publicações prontas do DJNE"""
+        date_from = today - timedelta(days=self.rules.lookback_days)
+        for source in self.sources:
+            try:
+                if source == SOURCE_GMAIL:
+                    filters = {'text_search': self.rules.gmail_query, 'date_from': date_from, 'date_to': today}
+                    max_results = int(get_value('MAX_EMAILS_PER_CHECK', '50'))
+                    items = list_message_ids(self._gmail_service(), filters, max_results=max_results)
+                else:
+                    items = self.djne_fetch(date_from, today)
+            except Exception as e:
+                report.errors.append(f"Erro ao buscar no {source}: {e}")
+                continue
+            report.fetched[source] = len(items)
+            for item in items:
+                yield source, item
+
+    # ── Estágios ─────────────────────────────────────────────────────────────
+    def _stage_fetch(self, envelope):
+        source, item = envelope
+        if source == SOURCE_GMAIL:
+            item = fetch_message(self._gmail_service(), item)
+        return [(source, item)]
+
+    def _stage_decode(self, envelope):
+        source, item = envelope
+        if source == SOURCE_GMAIL:
+            item = parse_message(item)
+        return [(source, item)]
+
+    def _make_extract(self, report):
+        seen = set()
+        lock = threading.Lock()
+
+        def _stage_extract(envelope):
+            source, item = envelope
+            if source != SOURCE_GMAIL:
+                return self.client_matcher.tag([item])
+            key = email_body_key(unwrap_forwarded_body(item['body']))
+            if key is not None:    # corpo vazio ou ilegível nunca é cópia
+                with lock:
+                    if key in seen:
+                        report.duplicate_emails += 1
+                        return None
+                    seen.add(key)
+            return self.client_matcher.tag(gmail_publications([item]))
+
+        return _stage_extract
+
+    @staticmethod
+    def _stage_fingerprint(pub):
+        pub.simhash
+        pub.numbers
+        return [pub]
+
+    def _make_dedupe(self, report):
+        seen = set()
+        # Aprovadas nesta rodada (ainda sem tarefa): o índice persistente só
+        # recebe a publicação depois que a tarefa existe (estágio create)
+        run_index = CrossSourceIndex(None)
+        approved = [0]
+
+        def _stage_dedupe(pub):
+            report.extracted += 1
+            self.store.add([pub])
+            fp = pub.fingerprint
+            # Diário: já virou tarefa numa rodada anterior (ou no dashboard)
+            if self.journal.is_done(fp):
+                report.already_processed += 1
+                return None
+            if fp in seen:
+                return None
+            seen.add(fp)
+            # Mesma publicação vinda da outra fonte (ou de rodada anterior, com texto diferente)
+            match = self.dedupe_index.find(pub) or run_index.find(pub)
+            if match is not None:
+                report.duplicates.append({'process_number': pub.process_number, 'origem': pub.origem,
+                                          'duplicate_of': f"{match['cnj_key'] or match['process_number']} ({match['origem']})"})
+                return None
+            reason = self.rules.rejection(pub)
+            if reason is None and approved[0] >= self.rules.max_per_run:
+                reason = f'limite de {self.rules.max_per_run} por rodada'
+            if reason is not None:
+                report.held.append({'process_number': pub.process_number,
+                                    'origem': pub.origem, 'reason': reason})
+                return None
+            approved[0] += 1
+            run_index.add(pub)
+            return [pub]
+
+        return _stage_dedupe
+
+    def _append_to_task(self, item, task, section_id, api_token):
+        """
+        Acrescenta a publicação às notas de uma tarefa criada nesta rodada
+        (sem agrupamento, a segunda publicação do processo não pode sumir como "já existia")
+        """
+        fp, process_number = item.fingerprint, item.process_number
+        header = '━━━ Publicação adicional'
+        if item.email_date or item.data_disponibilizacao:
+            header += f" — {item.email_date or item.data_disponibilizacao}"
+        if item.origem:
+            header += f" ({item.origem})"
+        notes = f"{task.get('notes') or ''}\n\n{header} ━━━\n\n{item.content.strip()}"
+        self.journal.record_intent(fp, process_number)
+        ok, result = update_meistertask_task(task['id'], {'notes': notes}, api_token)
+        if not ok:
+            self.journal.record_failed(fp, process_number, result)
+            return ITEM_FAILED, result
+        self.journal.record_done(fp, process_number, result)
+        self.mirror.upsert_tasks(section_id, [result])
+        return ITEM_APPENDED, result
+
+    def _make_create(self, report, started, existing_index):
+        section_id = self.settings.meistertask_section_id
+        api_token = self.settings.meistertask_api_token
+        lock = threading.Lock()
+        run_tasks = {}    # CNJ -> tarefa criada nesta rodada (notas atualizadas a cada acréscimo)
+
+        def _stage_create(item):
+            process_number = item.process_number
+            key = item.cnj_key or process_number
+            with self._process_locks[hash(key) % len(self._process_locks)]:
+                task = run_tasks.get(item.cnj_key) if item.cnj_key else None
+                if task is not None and not self.journal.is_done(item.fingerprint):
+                    outcome, detail = self._append_to_task(item, task, section_id, api_token)
+                else:
+                    outcome, detail = create_task_item(
+                        item, section_id, api_token, self.journal, existing_index,
+                        mirror=self.mirror, retry_queue=self.retry_queue
+                    )
+                if outcome in (ITEM_CREATED, ITEM_APPENDED) and item.cnj_key:
+                    run_tasks[item.cnj_key] = detail
+            if outcome in (ITEM_CREATED, ITEM_EXISTING, ITEM_APPENDED):
+                self.dedupe_index.add(item)
+            with lock:
+                if outcome == ITEM_CREATED:
+                    report.created.append(process_number)
+                    if report.first_task_s is None:
+                        report.first_task_s = round(time.perf_counter() - started, 3)
+                elif outcome == ITEM_APPENDED:
+                    report.appended.append(process_number)
+                elif outcome == ITEM_EXISTING:
+                    report.existing.append(process_number)
+                elif outcome == ITEM_RESUMED:
+                    report.already_processed += 1
+                else:
+                    if outcome == ITEM_QUEUED:
+                        report.queued.append(process_number)
+                    report.errors.append(f"{process_number}: {detail}")
+            if self.delay and outcome == ITEM_CREATED:
+                time.sleep(self.delay)
+            return [item]
+
+        return _stage_create
+
+    def _stage(self, name, func, workers=None):
+        return Stage(name, func, workers=workers or self.concurrency[name], buffer=self.buffer)
+
+    def _existing_index(self, report):
+        """Espelho atualizado (incremental): a checagem de duplicatas não lista a seção inteira"""
+        section_id = self.settings.meistertask_section_id
+        api_token = self.settings.meistertask_api_token
+        use_mirror_index = True
+        try:
+            self.mirror.refresh(section_id, api_token)
+        except MeisterTaskError as e:
+            report.errors.append(f'Espelho não atualizado, listando a seção: {e}')
+            use_mirror_index = False
+        index, warnings = existing_process_index(None, section_id, api_token, self.journal,
+                                                 mirror=self.mirror, use_mirror_index=use_mirror_index)
+        report.errors.extend(warnings)
+        return index
+
+    # ── Rodada ───────────────────────────────────────────────────────────────
+    def run_once(self, dry_run=False, today=None):
+        """Executa uma rodada; retorna o RunReport (também gravado em reports_path)"""
+        started = time.perf_counter()
+        report = RunReport(started_at=datetime.now().isoformat(timespec='seconds'), dry_run=dry_run)
+
+        create = None
+        if not dry_run:
+            if self.settings.meistertask_section_id and self.settings.meistertask_api_token:
+                create = self._stage('create', self._make_create(report, started, self._existing_index(report)))
+            else:
+                report.errors.append('MEISTERTASK_API_TOKEN ou MEISTERTASK_SECTION_ID não configurados')
+
+        def _on_error(stage, item, error):
+            report.errors.append(f"Erro no estágio {stage}: {error}")
+
+        stages = [
+            self._stage('fetch', self._stage_fetch),
+            self._stage('decode', self._stage_decode),
+            self._stage('extract', self._make_extract(report)),
+            self._stage('fingerprint', self._stage_fingerprint),
+            self._stage('dedupe', self._make_dedupe(report), workers=1),
+        ]
+        if create is not None and not self.rules.consolidate:
+            stages.append(create)
+        pipeline = StreamingPipeline(stages, on_error=_on_error)
+        outputs = pipeline.run(self._source(report, today or date.today()))
+        if not self.rules.consolidate:
+            # Só conta: guardar as saídas anularia a memória limitada do pipeline
+            report.items = sum(1 for _ in outputs)
+            report.pipeline = pipeline.summary()
+        else:
+            # O agrupamento precisa de todas as publicações do processo antes de criar
+            items = consolidate_publications(list(outputs))
+            report.pipeline = pipeline.summary()
+            report.items = len(items)
+            if create is not None and items:
+                creation = StreamingPipeline([create], on_error=_on_error)
+                report.items = sum(1 for _ in creation.run(items))
+                report.pipeline.update(creation.summary())
+
+        report.finished_at = datetime.now().isoformat(timespec='seconds')
+        self._save_report(report)
+        return report
+
+    def _save_report(self, report):
+        os.makedirs(os.path.dirname(self.reports_path) or '.', exist_ok=True)
+        with open(self.reports_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report.as_dict(), ensure_ascii=False) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Execução automática Gmail/DJNE → MeisterTask')
+    parser.add_argument('--source', choices=['gmail', 'djne', 'both'], default='both')
+    parser.add_argument('--every', type=int, default=None,
+                        help='Intervalo em minutos (padrão: CHECK_INTERVAL_MINUTES do .env)')
+    parser.add_argument('--once', action='store_true', help='Executa uma rodada e sai')
+    parser.add_argument('--dry-run', action='store_true', help='Não cria tarefas, só mostra o relatório')
+    parser.add_argument('--rules', default=DEFAULT_RULES_PATH, help='Arquivo JSON com as regras de aprovação')
+    args = parser.parse_args()
+
+    sources = {'gmail': (SOURCE_GMAIL,), 'djne': (SOURCE_DJNE,), 'both': (SOURCE_GMAIL, SOURCE_DJNE)}[args.source]
+    settings = get_settings()
+    runner = PipelineRunner(settings, AutoApproveRules.load(args.rules), sources=sources)
+
+    def _run():
+        try:
+            print(runner.run_once(dry_run=args.dry_run).format())
+        except Exception as e:  # uma rodada com erro não derruba o agendamento
+            print(f"❌ Erro na rodada: {e}")
+
+    if args.once:
+        _run()
+        return
+
+    import schedule
+
+    # Falhas transitórias da criação são repetidas em segundo plano entre as rodadas
+    worker = None
+    if settings.meistertask_api_token and not args.dry_run:
+        worker = RetryWorker(runner.retry_queue, settings.meistertask_api_token,
+                             journal=runner.journal, mirror=runner.mirror)
+        worker.start()
+
+    minutes = args.every or int(get_value('CHECK_INTERVAL_MINUTES', '15'))
+    print(f"⏱️ Executando a cada {minutes} minuto(s) — Ctrl+C para parar")
+    _run()
+    schedule.every(minutes).minutes.do(_run)
+    try:
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if worker is not None:
+            worker.stop()
+
+
+if __name__ == '__main__':
+    main()
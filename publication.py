@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Modelo único de publicação, produzido pelas duas fontes (Gmail e DJNE)
+Os campos são fixos (__slots__): nada de chaves opcionais nem .get() com padrão
+espalhado pelo código. A chave CNJ, o hash do conteúdo e a impressão digital
+são calculados uma vez, na criação; partes, título, simhash e números, na primeira leitura
+"""
+import hashlib
+
+from cross_source_dedupe import normalize_cnj, content_simhash, content_numbers
+from meistertask_api import task_title
+from task_journal import normalize_content, content_fingerprint
+
+ORIGEM_GMAIL = 'Gmail'
+ORIGEM_DJNE = 'DJNE'
+
+
+class Publication:
+    """
+    Uma publicação pronta para revisão e criação de tarefa
+
+    process_number e content definem as chaves derivadas; para alterá-los use
+    replace(), que cria outra publicação (ex.: o agrupamento por processo).
+    Os demais campos (pub_id, email_*, ...) podem ser preenchidos depois.
+    """
+
+    __slots__ = (
+        'process_number', 'content', 'source_subject', 'origem', 'pub_id',
+        'email_id', 'email_subject', 'email_sender', 'email_date',
+        'orgao', 'tribunal', 'data_disponibilizacao', 'tipo_comunicacao', 'merged_count',
+        'cnj_key', 'content_hash', 'fingerprint', '_parties', '_title', '_simhash', '_numbers', '_clients',
+    )
+
+    process_number: str
+    content: str
+    source_subject: str
+    origem: str                    # ORIGEM_GMAIL ou ORIGEM_DJNE
+    pub_id: str                    # identificador na sessão do dashboard
+    email_id: str
+    email_subject: str
+    email_sender: str
+    email_date: str                # data do e-mail ou da disponibilização no DJNE
+    orgao: str
+    tribunal: str
+    data_disponibilizacao: str
+    tipo_comunicacao: str
+    merged_count: int              # publicações reunidas neste item (agrupamento)
+    cnj_key: str                   # CNJ de process_number, sempre com máscara; '' se não houver
+    content_hash: str              # sha1 do conteúdo normalizado
+    fingerprint: str               # processo + conteúdo normalizado (chave do TaskJournal)
+
+    def __init__(self, process_number, content, source_subject='', origem='', pub_id='',
+                 email_id='', email_subject='', email_sender='', email_date='',
+                 orgao='', tribunal='', data_disponibilizacao='', tipo_comunicacao='',
+                 merged_count=1, parties=None, clients=()):
+        self.process_number = process_number
+        self.content = content or ''
+        self.source_subject = source_subject
+        self.origem = origem
+        self.pub_id = pub_id
+        self.email_id = email_id
+        self.email_subject = email_subject
+        self.email_sender = email_sender
+        self.email_date = email_date
+        self.orgao = orgao
+        self.tribunal = tribunal
+        self.data_disponibilizacao = data_disponibilizacao
+        self.tipo_comunicacao = tipo_comunicacao
+        self.merged_count = merged_count
+
+        normalized = normalize_content(self.content)
+        self.cnj_key = normalize_cnj(process_number)
+        self.content_hash = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        self.fingerprint = content_fingerprint(process_number, normalized)
+        self._parties = parties
+        self._title = None
+        self._simhash = None
+        self._numbers = None
+        self._clients = tuple(clients)
+
+    @property
+    def parties(self):
+        """Partes extraídas do conteúdo (calculadas na primeira leitura)"""
+        if self._parties is None:
+            from email_extraction import extract_parties_from_publication
+            self._parties = extract_parties_from_publication(self.content)
+        return self._parties
+
+    @property
+    def clients(self):
+        """Etiquetas dos clientes citados (ClientMatcher.tag); vão no início do título"""
+        return self._clients
+
+    @clients.setter
+    def clients(self, tags):
+        self._clients = tuple(tags)
+        self._title = None
+
+    @property
+    def title(self):
+        """Nome da tarefa no MeisterTask"""
+        if self._title is None:
+            self._title = task_title(self.process_number, self.parties, self._clients)
+        return self._title
+
+    @property
+    def simhash(self):
+        """Simhash de 64 bits do conteúdo (deduplicação entre fontes; 0 em textos curtos)"""
+        if self._simhash is None:
+            self._simhash = content_simhash(self.content)
+        return self._simhash
+
+    @property
+    def numbers(self):
+        """Números do conteúdo, sem o CNJ (datas, prazos; ver content_numbers)"""
+        if self._numbers is None:
+            self._numbers = content_numbers(self.content)
+        return self._numbers
+
+    def replace(self, **changes):
+        """Cópia com campos alterados (as chaves derivadas são recalculadas)"""
+        fields = self.as_dict()
+        if 'content' in changes or 'process_number' in changes:
+            fields.pop('parties')
+        fields.update(changes)
+        return Publication(**fields)
+
+    def as_dict(self):
+        """Campos públicos (para JSON e relatórios)"""
+        return {
+            'process_number': self.process_number, 'content': self.content,
+            'source_subject': self.source_subject, 'origem': self.origem, 'pub_id': self.pub_id,
+            'email_id': self.email_id, 'email_subject': self.email_subject,
+            'email_sender': self.email_sender, 'email_date': self.email_date,
+            'orgao': self.orgao, 'tribunal': self.tribunal,
+            'data_disponibilizacao': self.data_disponibilizacao,
+            'tipo_comunicacao': self.tipo_comunicacao, 'merged_count': self.merged_count,
+            'parties': self._parties, 'clients': self._clients,
+        }
+
+    def __repr__(self):
+        return f"Publication({self.process_number!r}, origem={self.origem!r}, pub_id={self.pub_id!r})"
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Arquivo local (SQLite) de todas as publicações já vistas, Gmail e DJNE
+Cada publicação buscada pelo dashboard ou pelo executor agendado entra aqui uma
+única vez (pela impressão digital). Um índice FTS5 sobre conteúdo, partes, órgão
+e número do processo responde buscas por parte, processo ou palavra-chave em
+milissegundos, mesmo com anos de histórico
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from meistertask_api import extract_process_number
+
+DEFAULT_STORE_PATH = os.path.join('.cache', 'publications.db')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS publications (
+    fingerprint TEXT PRIMARY KEY,
+    process_number TEXT NOT NULL,
+    cnj_key TEXT,
+    origem TEXT,
+    orgao TEXT,
+    tribunal TEXT,
+    parties TEXT,
+    content TEXT NOT NULL,
+    source_subject TEXT,
+    email_id TEXT,
+    email_subject TEXT,
+    email_sender TEXT,
+    email_date TEXT,
+    tipo_comunicacao TEXT,
+    published_on TEXT,
+    first_seen REAL,
+    last_seen REAL
+);
+CREATE INDEX IF NOT EXISTS idx_publications_cnj ON publications (cnj_key);
+CREATE INDEX IF NOT EXISTS idx_publications_date ON publications (published_on);
+
+-- Índice externo: o texto fica só na tabela; os gatilhos mantêm o FTS em dia
+CREATE VIRTUAL TABLE IF NOT EXISTS publications_fts USING fts5(
+    content, parties, orgao, process_number,
+    content='publications', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2', prefix='3'
+);
+CREATE TRIGGER IF NOT EXISTS publications_ai AFTER INSERT ON publications BEGIN
+    INSERT INTO publications_fts (rowid, content, parties, orgao, process_number)
+    VALUES (new.rowid, new.content, new.parties, new.orgao, new.process_number);
+END;
+CREATE TRIGGER IF NOT EXISTS publications_ad AFTER DELETE ON publications BEGIN
+    INSERT INTO publications_fts (publications_fts, rowid, content, parties, orgao, process_number)
+    VALUES ('delete', old.rowid, old.content, old.parties, old.orgao, old.process_number);
+END;
+CREATE TRIGGER IF NOT EXISTS publications_au
+AFTER UPDATE OF content, parties, orgao, process_number ON publications BEGIN
+    INSERT INTO publications_fts (publications_fts, rowid, content, parties, orgao, process_number)
+    VALUES ('delete', old.rowid, old.content, old.parties, old.orgao, old.process_number);
+    INSERT INTO publications_fts (rowid, content, parties, orgao, process_number)
+    VALUES (new.rowid, new.content, new.parties, new.orgao, new.process_number);
+END;
+"""
+
+_COLUMNS = ('fingerprint', 'process_number', 'cnj_key', 'origem', 'orgao', 'tribunal', 'parties',
+            'content', 'source_subject', 'email_id', 'email_subject', 'email_sender', 'email_date',
+            'tipo_comunicacao', 'published_on')
+
+# Colunas do FTS que a busca pode restringir
+SEARCH_FIELDS = ('content', 'parties', 'orgao', 'process_number')
+
+
+def published_on(pub):
+    """Data da publicação em ISO (AAAA-MM-DD) para ordenar e filtrar; '' se não reconhecida"""
+    for value in (pub.data_disponibilizacao, pub.email_date):
+        value = (value or '').strip()
+        if not value:
+            continue
+        for fmt in ('%Y-%m-%d', '%d/%m/%Y'):
+            try:
+                return datetime.strptime(value[:10], fmt).date().isoformat()
+            except ValueError:
+                pass
+        try:
+            # Cabeçalho Date do e-mail (RFC 2822)
+            return parsedate_to_datetime(value).date().isoformat()
+        except (TypeError, ValueError, IndexError):
+            pass
+    return ''
+
+
+def fts_query(text, field=None):
+    """
+    Converte o texto digitado numa consulta FTS5 segura
+    Cada termo vira uma frase entre aspas com busca por prefixo; todos precisam aparecer
+    ("banco intim" encontra "Banco X ... intimação"). Números de processo com
+    pontuação viram uma frase só ("0028066-08.2021" casa com o CNJ completo).
+    """
+    terms = [t for t in re.split(r'\s+', text.strip()) if t]
+    if not terms:
+        return ''
+    quoted = ' '.join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+    if field:
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Campo de busca desconhecido: {field}")
+        return f'{field} : ({quoted})'
+    return quoted
+
+
+class PublicationStore:
+    """
+    Uso:
+        store.add(publicacoes)                      # Publication de qualquer fonte
+        rows, total = store.search('banco intimação', date_from='2026-03-01')
+        store.by_process('0028066-08.2021.8.19.0209')
+    """
+
+    def __init__(self, db_path=DEFAULT_STORE_PATH):
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # ── Escrita ──────────────────────────────────────────────────────────────
+    def add(self, publications):
+        """Guarda as publicações; as já conhecidas só têm last_seen atualizado. Retorna as novas"""
+        now = time.time()
+        rows = [(
+            pub.fingerprint, pub.process_number, pub.cnj_key, pub.origem, pub.orgao, pub.tribunal,
+            pub.parties, pub.content, pub.source_subject, pub.email_id, pub.email_subject,
+            pub.email_sender, pub.email_date, pub.tipo_comunicacao, published_on(pub), now, now
+        ) for pub in publications]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            # rowcount (e não total_changes): não conta as linhas escritas pelos gatilhos no FTS
+            added = self._conn.executemany(
+                f"INSERT OR IGNORE INTO publications ({', '.join(_COLUMNS)}, first_seen, last_seen) "
+                f"VALUES ({', '.join('?' * (len(_COLUMNS) + 2))})", rows
+            ).rowcount
+            self._conn.executemany("UPDATE publications SET last_seen = ? WHERE fingerprint = ?",
+                                   [(now, row[0]) for row in rows])
+        return added
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+    def _filters(self, origem, date_from, date_to):
+        where, params = [], []
+        if origem:
+            where.append('p.origem = ?')
+            params.append(origem)
+        if date_from:
+            where.append('p.published_on >= ?')
+            params.append(str(date_from))
+        if date_to:
+            where.append('p.published_on <= ?')
+            params.append(str(date_to))
+        return where, params
+
+    def search(self, query='', field=None, origem=None, date_from=None, date_to=None, limit=50, offset=0):
+        """
+        Busca no histórico; retorna (linhas, total)
+
+        Sem texto, lista as mais recentes. Um CNJ completo usa o índice do
+        processo direto; o resto passa pelo FTS5, ordenado por relevância (bm25).
+        Cada linha é um dict com as colunas da tabela e 'snippet' (trecho com os termos).
+        """
+        where, params = self._filters(origem, date_from, date_to)
+        cnj = extract_process_number(query or '')
+        if cnj and cnj == query.strip() and field in (None, 'process_number'):
+            where.append('p.cnj_key = ?')
+            params.append(cnj)
+            match = None
+        else:
+            match = fts_query(query or '', field)
+
+        if match:
+            source = ("FROM publications_fts JOIN publications p ON p.rowid = publications_fts.rowid "
+                      "WHERE publications_fts MATCH ?")
+            params = [match] + params
+            order = 'bm25(publications_fts, 1.0, 4.0, 2.0, 8.0), p.published_on DESC'
+            snippet = "snippet(publications_fts, 0, '**', '**', '…', 16)"
+        else:
+            source = 'FROM publications p WHERE 1 = 1'
+            order = 'p.published_on DESC, p.first_seen DESC'
+            snippet = "substr(p.content, 1, 200)"
+        conditions = ''.join(f' AND {w}' for w in where)
+
+        columns = ', '.join(f'p.{c}' for c in _COLUMNS)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) {source}{conditions}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {columns}, {snippet} {source}{conditions} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(zip(_COLUMNS + ('snippet',), row)) for row in rows], total
+
+    def by_process(self, process_number):
+        """Todas as publicações de um processo, da mais recente para a mais antiga"""
+        cnj = extract_process_number(process_number or '')
+        if not cnj:
+            return []
+        return self.search(cnj, limit=1000)[0]
+
+    def counts(self):
+        """{'total': n, 'Gmail': n, 'DJNE': n}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT origem, COUNT(*) FROM publications GROUP BY origem").fetchall()
+        counts = {origem or '': n for origem, n in rows}
+        counts['total'] = sum(n for _, n in rows)
+        return counts
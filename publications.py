@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Publicações - utilitários sobre as publicações extraídas (Gmail ou DJNE)
+antes de virarem tarefas no MeisterTask
+"""
+from email_extraction import extract_publications_from_email, unwrap_forwarded_body, email_body_key
+from publication import ORIGEM_GMAIL
+
+
+def gmail_publications(emails, seen_bodies=None):
+    """
+    Extrai as publicações (Publication) de uma lista de e-mails, já com os dados do e-mail
+
+    O mesmo resumo encaminhado por vários colegas é extraído uma vez só: a chave
+    é o corpo sem as marcas de encaminhamento (unwrap_forwarded_body). seen_bodies
+    (set) recebe as chaves e pode ser compartilhado entre chamadas; o número de
+    cópias puladas é len(emails) - chaves novas. Corpo vazio ou ilegível nunca
+    é cópia: a chave passa a ser o id da mensagem.
+    """
+    seen = set() if seen_bodies is None else seen_bodies
+    publications = []
+    for email in emails:
+        body = unwrap_forwarded_body(email['body'])
+        key = email_body_key(body) or f"id:{email['id']}"
+        if key in seen:
+            continue
+        seen.add(key)
+        for pub in extract_publications_from_email(
+            body, email['subject'],
+            email_id=email['id'], email_sender=email['sender'], email_date=email['date'],
+            origem=ORIGEM_GMAIL
+        ):
+            pub.pub_id = f"{email['id']}_{len(publications)}"
+            publications.append(pub)
+    return publications
+
+
+def group_publications_by_process(pubs):
+    """
+    Agrupa publicações pelo número do processo (CNJ), mantendo a ordem de chegada
+    Publicações sem CNJ válido ("Sem número identificado", "Publicação 3")
+    ficam sozinhas no próprio grupo
+    """
+    groups = {}
+    for idx, pub in enumerate(pubs):
+        key = pub.cnj_key or ('sem_cnj', idx)
+        groups.setdefault(key, []).append(pub)
+    return list(groups.values())
+
+
+def consolidate_publications(pubs):
+    """
+    Junta as publicações do mesmo processo em um único item de tarefa
+
+    Retorna uma lista de Publication: a primeira de cada grupo, com o conteúdo
+    das demais reunido e 'merged_count' indicando quantas foram reunidas. As notas
+    trazem cada publicação em sequência, com um cabeçalho de separação.
+    """
+    items = []
+    for group in group_publications_by_process(pubs):
+        first = group[0]
+        if len(group) == 1:
+            items.append(first)
+            continue
+
+        sections = []
+        for i, pub in enumerate(group, 1):
+            header = f"━━━ Publicação {i}/{len(group)}"
+            date = pub.email_date or pub.data_disponibilizacao
+            if date:
+                header += f" — {date}"
+            if pub.origem:
+                header += f" ({pub.origem})"
+            sections.append(f"{header} ━━━\n\n{pub.content.strip()}")
+
+        # Conteúdo novo: a impressão digital é recalculada; as partes são as da primeira
+        # e os clientes, os de todas
+        items.append(first.replace(content='\n\n'.join(sections), merged_count=len(group),
+                                   parties=first.parties,
+                                   clients=dict.fromkeys(c for pub in group for c in pub.clients)))
+    return items
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Medição do custo de cada rerun do dashboard
+O Streamlit reexecuta o script inteiro a cada interação; este perfilador mede
+o tempo total e o de cada trecho marcado, e guarda um histórico curto
+"""
+import time
+from collections import deque
+
+
+class RerunProfiler:
+    """
+    Uso (um por sessão):
+        profiler.start()
+        ...                   # tema, estado
+        profiler.mark('setup')
+        ...                   # página
+        profiler.mark('pagina')
+        profiler.finish()
+        profiler.summary()    # {'last_ms': ..., 'avg_ms': ..., 'sections': {...}}
+    """
+
+    def __init__(self, history=50):
+        self.history = deque(maxlen=history)
+        self.sections = {}
+        self._t0 = None
+        self._last = None
+
+    def start(self):
+        self._t0 = self._last = time.perf_counter()
+        self.sections = {}
+
+    def mark(self, name):
+        """Tempo desde a marca anterior (ou do início), acumulado sob `name`"""
+        if self._t0 is None:
+            return
+        now = time.perf_counter()
+        self.sections[name] = self.sections.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def finish(self):
+        """Fecha o rerun atual; retorna a duração em ms (None se start() não foi chamado)"""
+        if self._t0 is None:
+            return None
+        total = (time.perf_counter() - self._t0) * 1000
+        self.history.append(total)
+        self._t0 = None
+        return total
+
+    def summary(self):
+        if not self.history:
+            return None
+        ordered = sorted(self.history)
+        return {
+            'runs': len(ordered),
+            'last_ms': self.history[-1],
+            'avg_ms': sum(ordered) / len(ordered),
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'sections': dict(self.sections),
+        }
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Fila persistente de novas tentativas para a criação de tarefas no MeisterTask
+Falhas transitórias (rede, 429, 5xx) são repetidas em segundo plano com backoff
+exponencial; falhas definitivas (ou que esgotaram as tentativas) vão para a
+lista de "mortas" (dead-letter), que o dashboard mostra e pode reenviar em lote
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from meistertask_api import (
+    create_meistertask_task, build_process_index, iter_meistertask_tasks, MeisterTaskError
+)
+from task_journal import STATE_PENDING
+
+DEFAULT_QUEUE_PATH = os.path.join('.cache', 'retry_queue.db')
+
+STATUS_RETRY = 'retry'
+STATUS_DEAD = 'dead'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS retry_items (
+    fingerprint TEXT PRIMARY KEY,
+    process_number TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL,
+    last_error TEXT,
+    created_at REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_retry_due ON retry_items (status, next_attempt_at);
+"""
+
+
+def _is_transient(error):
+    return error.transient if isinstance(error, MeisterTaskError) else True
+
+
+class RetryQueue:
+    """
+    Itens indexados pela impressão digital da publicação (ver task_journal),
+    então enfileirar a mesma publicação de novo só atualiza o item existente
+
+    Args:
+        db_path: arquivo SQLite da fila
+        max_attempts: tentativas em segundo plano antes de ir para a lista de mortas
+        base_delay / max_delay: backoff em segundos (base * 2^tentativas, com teto)
+    """
+
+    def __init__(self, db_path=DEFAULT_QUEUE_PATH, max_attempts=6, base_delay=30.0, max_delay=3600.0):
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.executescript(_SCHEMA)
+        # Acordado a cada item novo para o worker não esperar o intervalo inteiro
+        self.wakeup = threading.Event()
+
+    def close(self):
+        self._conn.close()
+
+    def _backoff(self, attempts):
+        delay = min(self.base_delay * (2 ** max(attempts - 1, 0)), self.max_delay)
+        return delay * random.uniform(0.8, 1.2)
+
+    # ── Escrita ──────────────────────────────────────────────────────────────
+    def enqueue(self, fingerprint, payload, error):
+        """
+        Registra uma criação que falhou
+        payload: process_number, parties, description e section_id
+
+        Retorna o status do item: 'retry' (vai ser tentado de novo) ou 'dead'
+        """
+        now = time.time()
+        status = STATUS_RETRY if _is_transient(error) else STATUS_DEAD
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO retry_items VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)
+                ON CONFLICT (fingerprint) DO UPDATE SET
+                    payload = excluded.payload,
+                    status = excluded.status,
+                    attempts = 0,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_error = excluded.last_error,
+                    updated_at = excluded.updated_at
+            """, (fingerprint, payload.get('process_number'), json.dumps(payload, ensure_ascii=False),
+                  status, now + self._backoff(1), str(error), now, now))
+        self.wakeup.set()
+        return status
+
+    def record_success(self, fingerprint):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM retry_items WHERE fingerprint = ?", (fingerprint,))
+
+    def record_failure(self, fingerprint, error):
+        """Nova falha em segundo plano: reagenda ou move para a lista de mortas"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT attempts FROM retry_items WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            if row is None:
+                return None
+            attempts = row[0] + 1
+            dead = not _is_transient(error) or attempts >= self.max_attempts
+            status = STATUS_DEAD if dead else STATUS_RETRY
+            self._conn.execute("""
+                UPDATE retry_items SET status = ?, attempts = ?, next_attempt_at = ?,
+                                       last_error = ?, updated_at = ?
+                WHERE fingerprint = ?
+            """, (status, attempts, None if dead else now + self._backoff(attempts + 1),
+                  str(error), now, fingerprint))
+        return status
+
+    def replay(self, fingerprints=None):
+        """Devolve itens da lista de mortas para a fila (todos, se fingerprints=None)"""
+        now = time.time()
+        query = "UPDATE retry_items SET status = ?, attempts = 0, next_attempt_at = ?, updated_at = ? WHERE status = ?"
+        params = [STATUS_RETRY, now, now, STATUS_DEAD]
+        with self._lock, self._conn:
+            if fingerprints is None:
+                count = self._conn.execute(query, params).rowcount
+            else:
+                count = sum(
+                    self._conn.execute(query + " AND fingerprint = ?", params + [fp]).rowcount
+                    for fp in fingerprints
+                )
+        self.wakeup.set()
+        return count
+
+    def discard(self, fingerprints):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM retry_items WHERE fingerprint = ?",
+                                   [(fp,) for fp in fingerprints])
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+    def _select(self, where, params=()):
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT fingerprint, process_number, payload, status, attempts,
+                       next_attempt_at, last_error, created_at, updated_at
+                FROM retry_items {where}
+            """, params).fetchall()
+        keys = ('fingerprint', 'process_number', 'payload', 'status', 'attempts',
+                'next_attempt_at', 'last_error', 'created_at', 'updated_at')
+        items = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            item['payload'] = json.loads(item['payload'])
+            items.append(item)
+        return items
+
+    def due(self, now=None, limit=50):
+        """Itens cuja próxima tentativa já venceu"""
+        now = time.time() if now is None else now
+        return self._select("WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                            (STATUS_RETRY, now, limit))
+
+    def waiting(self):
+        return self._select("WHERE status = ? ORDER BY next_attempt_at", (STATUS_RETRY,))
+
+    def dead_letters(self):
+        return self._select("WHERE status = ? ORDER BY updated_at DESC", (STATUS_DEAD,))
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM retry_items GROUP BY status").fetchall()
+        counts = {STATUS_RETRY: 0, STATUS_DEAD: 0}
+        counts.update(dict(rows))
+        return counts
+
+
+class RetryWorker(threading.Thread):
+    """
+    Thread em segundo plano que esvazia a fila
+
+    Antes de repetir, consulta o espelho local (se houver): uma falha de rede
+    pode ter acontecido depois de a tarefa ser criada no servidor. Itens com
+    resultado desconhecido (pendentes no diário) só são reenviados depois de
+    conferidos contra a listagem da seção (API ou, sem ela, o espelho); sem
+    nenhuma das duas continuam na lista de mortas.
+    Sucessos vão para o diário e para o espelho, como no passo 4 do dashboard.
+    """
+
+    def __init__(self, queue, api_token, journal=None, mirror=None, interval=10.0):
+        super().__init__(name='meistertask-retry', daemon=True)
+        self.queue = queue
+        self.api_token = api_token
+        self.journal = journal
+        self.mirror = mirror
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.queue.wakeup.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:  # a thread não pode morrer por um erro inesperado
+                print(f"Erro no worker de novas tentativas: {e}")
+            self.queue.wakeup.wait(self.interval)
+            self.queue.wakeup.clear()
+
+    def _section_index(self, section_id, listings):
+        """Índice {processo: tarefa} da seção (uma listagem por rodada); None se não der para listar"""
+        key = str(section_id)
+        if key not in listings:
+            try:
+                listings[key] = build_process_index(iter_meistertask_tasks(section_id, self.api_token))
+            except MeisterTaskError:
+                if self.mirror is not None and self.mirror.has_section(section_id):
+                    listings[key] = build_process_index(self.mirror.tasks(section_id))
+                else:
+                    listings[key] = None
+        return listings[key]
+
+    def run_once(self, now=None):
+        """Processa os itens vencidos; retorna quantos foram criados com sucesso"""
+        created = 0
+        listings = {}
+        for item in self.queue.due(now):
+            if self._stop_event.is_set():
+                break
+            fp, p = item['fingerprint'], item['payload']
+            entry = self.journal.get(fp) if self.journal is not None else None
+            existing_index = None
+            if entry is not None and entry['state'] == STATE_PENDING:
+                # Tentativa anterior sem resposta: a tarefa pode já existir
+                existing_index = self._section_index(p['section_id'], listings)
+                if existing_index is None:
+                    self.queue.record_failure(fp, MeisterTaskError(
+                        'Resultado anterior desconhecido; verifique a seção antes de criar de novo',
+                        unknown_outcome=True
+                    ))
+                    continue
+            elif self.mirror is not None and self.mirror.find_by_process(p['section_id'], p['process_number']):
+                self.queue.record_success(fp)
+                continue
+
+            if self.journal is not None:
+                self.journal.record_intent(fp, p['process_number'])
+            ok, result = create_meistertask_task(
+                p['process_number'], p['parties'], p['description'], p['section_id'], self.api_token,
+                existing_index=existing_index, tags=p.get('tags', ())
+            )
+            if ok and result.get('already_exists'):
+                self.queue.record_success(fp)
+                if self.journal is not None:
+                    self.journal.record_done(fp, p['process_number'], result['task'])
+            elif ok:
+                self.queue.record_success(fp)
+                if self.journal is not None:
+                    self.journal.record_done(fp, p['process_number'], result)
+                if self.mirror is not None:
+                    self.mirror.upsert_tasks(p['section_id'], [result])
+                created += 1
+            else:
+                # Sem resposta (unknown_outcome) vai direto para a lista de mortas e
+                # fica pendente no diário: reenviar só depois de conferir a seção
+                self.queue.record_failure(fp, result)
+                if self.journal is not None and not getattr(result, 'unknown_outcome', False):
+                    self.journal.record_failed(fp, p['process_number'], result)
+        return created
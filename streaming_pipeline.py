@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Pipeline em estágios com buffers limitados (backpressure)
+Cada estágio roda em N threads e lê de uma fila com tamanho máximo: quando um
+estágio posterior é mais lento, a fila enche e o anterior espera. Assim as
+primeiras tarefas são criadas enquanto os últimos e-mails ainda estão sendo
+baixados, e a memória fica limitada pela soma dos buffers
+
+Uso:
+    pipeline = StreamingPipeline([
+        Stage('fetch', baixar, workers=4, buffer=16),
+        Stage('extract', extrair, workers=2),
+    ])
+    for resultado in pipeline.run(ids):
+        ...
+
+A função de um estágio recebe um item e retorna um iterável de saídas
+(0, 1 ou várias; um gerador serve) ou None quando não produz nada.
+"""
+import queue
+import threading
+import time
+
+_DONE = object()          # marcador de fim de fluxo entre estágios
+_PUT_POLL = 0.1           # intervalo para checar o cancelamento enquanto a fila está cheia
+
+
+class Stage:
+    """Um estágio do pipeline: função, número de threads e tamanho da fila de entrada"""
+
+    def __init__(self, name, func, workers=1, buffer=16):
+        if workers < 1 or buffer < 1:
+            raise ValueError('workers e buffer precisam ser >= 1')
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.buffer = buffer
+
+
+class StageStats:
+    """Contadores de um estágio (lidos depois da execução ou durante, para acompanhamento)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.received = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_s = 0.0
+        self.max_queue = 0
+        self._lock = threading.Lock()
+
+    def _add(self, received=0, emitted=0, errors=0, busy_s=0.0):
+        with self._lock:
+            self.received += received
+            self.emitted += emitted
+            self.errors += errors
+            self.busy_s += busy_s
+
+    def as_dict(self):
+        return {'received': self.received, 'emitted': self.emitted, 'errors': self.errors,
+                'busy_s': round(self.busy_s, 3), 'max_queue': self.max_queue}
+
+
+class StreamingPipeline:
+    """
+    Liga os estágios por filas limitadas e devolve as saídas do último em streaming
+
+    on_error(nome_do_estagio, item, exceção): chamado quando a função de um estágio
+    levanta; o item é descartado e o fluxo continua. Sem on_error, o erro só é contado.
+    Um erro na fonte (o iterável de entrada) encerra a alimentação e é repassado
+    para quem consome run() depois que os itens já lidos terminam de passar.
+    """
+
+    def __init__(self, stages, on_error=None):
+        if not stages:
+            raise ValueError('O pipeline precisa de pelo menos um estágio')
+        self.stages = stages
+        self.on_error = on_error
+        self.stats = {stage.name: StageStats(stage.name) for stage in stages}
+
+    def run(self, source):
+        """Gerador com as saídas do último estágio (a ordem não é garantida)"""
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=stage.buffer) for stage in self.stages]
+        output = queue.Queue(maxsize=self.stages[-1].buffer)
+        source_error = []
+
+        def _put(q, item, stats=None):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=_PUT_POLL)
+                except queue.Full:
+                    continue
+                if stats is not None:
+                    stats.max_queue = max(stats.max_queue, q.qsize())
+                return True
+            return False
+
+        def _feed():
+            first = self.stages[0]
+            try:
+                for item in source:
+                    if not _put(queues[0], item, self.stats[first.name]):
+                        return
+            except Exception as e:
+                source_error.append(e)
+            finally:
+                for _ in range(first.workers):
+                    _put(queues[0], _DONE)
+
+        threads = [threading.Thread(target=_feed, name='pipeline-source', daemon=True)]
+        for pos, stage in enumerate(self.stages):
+            is_last = pos == len(self.stages) - 1
+            out_q = output if is_last else queues[pos + 1]
+            out_stats = None if is_last else self.stats[self.stages[pos + 1].name]
+            downstream = 1 if is_last else self.stages[pos + 1].workers
+            remaining = [stage.workers]
+            remaining_lock = threading.Lock()
+
+            def _work(stage=stage, in_q=queues[pos], out_q=out_q, out_stats=out_stats,
+                      downstream=downstream, remaining=remaining, remaining_lock=remaining_lock):
+                stats = self.stats[stage.name]
+                try:
+                    while not stop.is_set():
+                        try:
+                            item = in_q.get(timeout=_PUT_POLL)
+                        except queue.Empty:
+                            continue
+                        if item is _DONE:
+                            break
+                        started = time.perf_counter()
+                        emitted = 0
+                        try:
+                            for result in stage.func(item) or ():
+                                if not _put(out_q, result, out_stats):
+                                    break
+                                emitted += 1
+                        except Exception as e:
+                            stats._add(errors=1)
+                            if self.on_error is not None:
+                                self.on_error(stage.name, item, e)
+                        stats._add(received=1, emitted=emitted, busy_s=time.perf_counter() - started)
+                finally:
+                    # A última thread do estágio avisa o próximo que o fluxo acabou
+                    with remaining_lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last:
+                        for _ in range(downstream):
+                            _put(out_q, _DONE)
+
+            threads.extend(threading.Thread(target=_work, name=f'pipeline-{stage.name}', daemon=True)
+                           for _ in range(stage.workers))
+
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                item = output.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Consumidor parou antes do fim (break/exceção): libera as threads bloqueadas
+            stop.set()
+            for q in queues:
+                _drain(q)
+            for t in threads:
+                t.join(timeout=1)
+        if source_error:
+            raise source_error[0]
+
+    def summary(self):
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+
+def _drain(q):
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Diário (write-ahead log) da criação de tarefas no MeisterTask
+Registra a intenção antes de cada chamada à API e o resultado depois, para que
+uma execução interrompida possa ser retomada sem criar duplicatas
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_JOURNAL_PATH = os.path.join('.cache', 'task_journal.jsonl')
+
+STATE_PENDING = 'pending'
+STATE_DONE = 'done'
+STATE_FAILED = 'failed'
+
+
+def normalize_content(content):
+    """Conteúdo sem diferenças de espaçamento e maiúsculas"""
+    return ' '.join((content or '').split()).lower()
+
+
+def content_fingerprint(process_number, normalized_content):
+    """Impressão digital a partir do processo e do conteúdo já normalizado"""
+    key = f"{process_number}\n{normalized_content}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class TaskJournal:
+    """
+    Arquivo JSONL só de acréscimo; cada linha é um evento de uma publicação:
+    - pending: vai chamar a API (gravado ANTES da chamada)
+    - done: tarefa criada (guarda resposta e task_id)
+    - failed: a API recusou (pode ser tentado de novo)
+
+    O estado atual de cada publicação é o último evento gravado para ela.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            # Última linha cortada por uma queda no meio da escrita: sai do arquivo,
+            # senão o próximo evento seria gravado colado nela e se perderia
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                f.truncate(end)
+        for line in data[:end].decode('utf-8').splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._entries[entry['fingerprint']] = entry
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._entries[entry['fingerprint']] = entry
+
+    # ── Eventos ──────────────────────────────────────────────────────────────
+    def record_intent(self, fingerprint, process_number):
+        self._append({
+            'fingerprint': fingerprint,
+            'state': STATE_PENDING,
+            'process_number': process_number,
+            'ts': time.time()
+        })
+
+    def record_done(self, fingerprint, process_number, response):
+        self._append({
+            'fingerprint': fingerprint,
+            'state': STATE_DONE,
+            'process_number': process_number,
+            'task_id': response.get('id') if isinstance(response, dict) else None,
+            'response': response,
+            'ts': time.time()
+        })
+
+    def record_failed(self, fingerprint, process_number, error):
+        self._append({
+            'fingerprint': fingerprint,
+            'state': STATE_FAILED,
+            'process_number': process_number,
+            'error': str(error),
+            'ts': time.time()
+        })
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+    def get(self, fingerprint):
+        return self._entries.get(fingerprint)
+
+    def is_done(self, fingerprint):
+        entry = self._entries.get(fingerprint)
+        return bool(entry and entry['state'] == STATE_DONE)
+
+    def pending(self):
+        """Publicações com intenção gravada mas sem resultado (execução interrompida)"""
+        return [e for e in self._entries.values() if e['state'] == STATE_PENDING]
+
+    def compact(self):
+        """Reescreve o arquivo só com o último evento de cada publicação"""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Espelho local (SQLite) das tarefas de uma seção do MeisterTask
+Indexado pelo número do processo (CNJ) para consultas de duplicatas sem
+listar a seção inteira a cada visita
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from itertools import chain, islice
+
+from meistertask_api import iter_meistertask_tasks, extract_process_number
+
+DEFAULT_MIRROR_PATH = os.path.join('.cache', 'meistertask_mirror.db')
+
+# Ressincroniza tudo de tempos em tempos para pegar exclusões feitas fora do dashboard
+FULL_SYNC_INTERVAL = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id PRIMARY KEY,
+    section_id TEXT NOT NULL,
+    name TEXT,
+    process_number TEXT,
+    assigned_to_id TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_process ON tasks (section_id, process_number);
+CREATE TABLE IF NOT EXISTS sections (
+    section_id TEXT PRIMARY KEY,
+    last_full_sync REAL,
+    last_refresh REAL,
+    watermark TEXT
+);
+"""
+
+
+class TaskMirror:
+    """
+    Cópia local das tarefas do MeisterTask
+
+    refresh() decide entre sincronização completa e incremental:
+    - completa na primeira vez, quando full=True ou a cada FULL_SYNC_INTERVAL
+    - incremental nas demais: lê as tarefas ordenadas por updated_at (mais
+      recentes primeiro) e para ao passar do watermark (o maior updated_at já
+      espelhado, que é relido)
+    """
+
+    def __init__(self, db_path=DEFAULT_MIRROR_PATH):
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # timeout: o receptor de webhooks pode estar escrevendo no mesmo arquivo
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # ── Escrita ──────────────────────────────────────────────────────────────
+    def upsert_tasks(self, section_id, tasks):
+        """Insere ou atualiza tarefas; as que foram para a lixeira saem do espelho"""
+        rows, trashed = [], []
+        for task in tasks:
+            if task.get('status') == 18:
+                trashed.append(task.get('id'))
+                continue
+            rows.append(_task_row(section_id, task))
+        with self._lock, self._conn:
+            if rows:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+            if trashed:
+                self._conn.executemany("DELETE FROM tasks WHERE id = ?", [(t,) for t in trashed])
+        return len(rows)
+
+    def remove_tasks(self, task_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM tasks WHERE id = ?", [(t,) for t in task_ids])
+
+    def replace_section(self, section_id, tasks):
+        """Substitui todo o conteúdo de uma seção (sincronização completa)"""
+        rows = [_task_row(section_id, t) for t in tasks if t.get('status') != 18]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks WHERE section_id = ?", (str(section_id),))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    # ── Sincronização ────────────────────────────────────────────────────────
+    def refresh(self, section_id, api_token, full=False, max_incremental=500):
+        """
+        Atualiza o espelho a partir da API
+
+        Args:
+            full: Força a sincronização completa
+            max_incremental: Máximo de tarefas lidas na sincronização incremental;
+                             acima disso faz a completa
+
+        Retorna:
+            dict com mode ('full' ou 'incremental') e fetched (tarefas lidas)
+        """
+        section_key = str(section_id)
+        meta = self._section_meta(section_key)
+        now = time.time()
+
+        if not full and meta and meta['last_full_sync'] and now - meta['last_full_sync'] < FULL_SYNC_INTERVAL:
+            fetched = self._refresh_incremental(section_id, api_token, meta['watermark'], max_incremental)
+            if fetched is not None:
+                self._save_meta(section_key, meta['last_full_sync'], now)
+                return {'mode': 'incremental', 'fetched': fetched}
+
+        tasks = list(iter_meistertask_tasks(section_id, api_token))
+        self.replace_section(section_id, tasks)
+        self._save_meta(section_key, now, now)
+        return {'mode': 'full', 'fetched': len(tasks)}
+
+    def _refresh_incremental(self, section_id, api_token, watermark, max_incremental, page_size=50):
+        """Lê só as tarefas alteradas desde o watermark; None se não der para confiar"""
+        changed = []
+        stream = iter_meistertask_tasks(
+            section_id, api_token, page_size=page_size, prefetch=1,
+            extra_params={'sort': '-updated_at'}
+        )
+        try:
+            # A primeira página precisa provar que a API respeitou a ordenação:
+            # decrescente e começando no watermark ou depois dele (a tarefa do
+            # watermark é sempre relida). Senão parar no watermark perderia alterações
+            first_page = list(islice(stream, page_size))
+            stamps = [t.get('updated_at') or '' for t in first_page]
+            if stamps != sorted(stamps, reverse=True):
+                return None
+            if watermark and (not stamps or stamps[0] < watermark):
+                return None
+
+            previous = None
+            for task in chain(first_page, stream):
+                updated_at = task.get('updated_at') or ''
+                # Páginas seguintes fora de ordem: também não dá para confiar
+                if previous is not None and updated_at > previous:
+                    return None
+                previous = updated_at
+                # Janela sobreposta: tarefas do mesmo segundo do watermark podem ter
+                # chegado depois dele; as relidas só sobrescrevem a mesma linha (id)
+                if watermark and updated_at < watermark:
+                    break
+                changed.append(task)
+                if len(changed) > max_incremental:
+                    return None
+        finally:
+            stream.close()
+
+        self.upsert_tasks(section_id, changed)
+        return len(changed)
+
+    def _section_meta(self, section_key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_full_sync, last_refresh, watermark FROM sections WHERE section_id = ?",
+                (section_key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'last_full_sync': row[0], 'last_refresh': row[1], 'watermark': row[2]}
+
+    def _save_meta(self, section_key, last_full_sync, last_refresh):
+        with self._lock, self._conn:
+            watermark = self._conn.execute(
+                "SELECT MAX(updated_at) FROM tasks WHERE section_id = ?", (section_key,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?)",
+                (section_key, last_full_sync, last_refresh, watermark)
+            )
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+    def has_section(self, section_id):
+        """True se a seção já passou por pelo menos uma sincronização completa"""
+        meta = self._section_meta(str(section_id))
+        return bool(meta and meta['last_full_sync'])
+
+    def is_fresh(self, section_id):
+        """
+        True se a última sincronização completa tem menos de FULL_SYNC_INTERVAL
+        (webhooks perdidos só aparecem no espelho depois de uma completa)
+        """
+        meta = self._section_meta(str(section_id))
+        return bool(meta and meta['last_full_sync']) and time.time() - meta['last_full_sync'] < FULL_SYNC_INTERVAL
+
+    def tasks(self, section_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM tasks WHERE section_id = ? ORDER BY created_at, id",
+                (str(section_id),)
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def find_by_process(self, section_id, process_number):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM tasks WHERE section_id = ? AND process_number = ? ORDER BY created_at, id",
+                (str(section_id), process_number)
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def find_duplicates(self, section_id, only_unassigned=True):
+        """Mesmo resultado de find_duplicate_tasks, calculado pelo índice do SQLite"""
+        assigned_filter = "AND assigned_to_id IS NULL" if only_unassigned else ""
+        query = f"""
+            SELECT process_number, data FROM tasks
+            WHERE section_id = ? {assigned_filter} AND process_number IN (
+                SELECT process_number FROM tasks
+                WHERE section_id = ? {assigned_filter} AND process_number IS NOT NULL
+                GROUP BY process_number HAVING COUNT(*) > 1
+            )
+            ORDER BY process_number, created_at, id
+        """
+        section_key = str(section_id)
+        with self._lock:
+            rows = self._conn.execute(query, (section_key, section_key)).fetchall()
+        duplicates = {}
+        for process_number, data in rows:
+            duplicates.setdefault(process_number, []).append(json.loads(data))
+        return duplicates
+
+
+def _task_row(section_id, task):
+    assigned = task.get('assigned_to_id')
+    return (
+        task.get('id'),
+        str(section_id),
+        task.get('name', ''),
+        extract_process_number(task.get('name', '')),
+        str(assigned) if assigned else None,
+        task.get('created_at', ''),
+        task.get('updated_at', ''),
+        json.dumps(task),
+    )
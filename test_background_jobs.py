@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Teste dos lotes em segundo plano: criação e exclusão rodando ao mesmo tempo
+"""
+import os
+import tempfile
+
+from background_jobs import (
+    build_job_manager, create_task_item, JobManager, JobBusyError, JOB_DONE, JOB_FAILED, JOB_INTERRUPTED,
+    ITEM_EXISTING, ITEM_FAILED
+)
+from cross_source_dedupe import CrossSourceIndex
+from fake_meistertask import FakeMeisterTask
+from publication import Publication
+from task_journal import TaskJournal
+from task_mirror import TaskMirror
+
+SECTION_ID = 51
+
+
+def test_concurrent_create_and_trash_jobs():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    old = [fake.add_task(SECTION_ID, f"0000{i:03d}-00.2020.8.19.0001 - antiga") for i in range(30)]
+    items = [Publication(f"0001{i:03d}-00.2024.8.19.0001", f'Intimação {i}', parties='A x B')
+             for i in range(20)]
+    # Já existe na seção: não pode ser recriada
+    fake.add_task(SECTION_ID, f"{items[0].process_number} - A x B")
+    # Já chegou pelo Gmail (CNJ sem máscara): é pulada
+    index = CrossSourceIndex(None)
+    index.add(Publication(items[5].process_number.replace('-', '').replace('.', ''), 'Intimação 5', origem='Gmail'))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = build_job_manager(os.path.join(tmp, 'jobs.db'))
+        journal = TaskJournal(os.path.join(tmp, 'journal.jsonl'))
+        mirror = TaskMirror(os.path.join(tmp, 'mirror.db'))
+        with fake.patched_api():
+            create_id = manager.submit('create_tasks', 'Criar', total=len(items), items=items,
+                                       section_id=SECTION_ID, api_token='t', journal=journal,
+                                       mirror=mirror, delay=0, dedupe_index=index)
+            trash_id = manager.submit('trash_tasks', 'Excluir', total=len(old),
+                                      task_ids=[t['id'] for t in old], api_token='t')
+            created = manager.wait(create_id, timeout=30)
+            trashed = manager.wait(trash_id, timeout=30)
+        manager.shutdown()
+
+        assert created['status'] == JOB_DONE, created['error']
+        assert created['done'] == created['total'] == 20
+        assert created['result']['success_count'] == 18
+        assert len(created['result']['existing_tasks']) == 1
+        assert created['result']['duplicate_tasks'] == [[items[5].process_number, 'Gmail']]
+        assert len(index) == 1 + 19
+        assert trashed['status'] == JOB_DONE
+        assert trashed['result']['success_count'] == 30
+        assert len(fake.section_tasks(SECTION_ID)) == 19
+
+        # Reabrindo a tabela (outro processo do servidor) o histórico continua lá
+        reopened = JobManager(os.path.join(tmp, 'jobs.db'))
+        assert {j['id'] for j in reopened.recent()} == {create_id, trash_id}
+        reopened.shutdown()
+
+
+def test_pending_items_are_checked_before_posting_again():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    items = [Publication(f"0002{i:03d}-00.2024.8.19.0001", f'Intimação {i}', parties='A x B') for i in range(3)]
+    # Queda durante o POST de items[1]: a tarefa foi criada, mas o diário só tem a intenção
+    fake.add_task(SECTION_ID, f"{items[1].process_number} - A x B")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = build_job_manager(os.path.join(tmp, 'jobs.db'))
+        journal = TaskJournal(os.path.join(tmp, 'journal.jsonl'))
+        journal.record_done(items[0].fingerprint, items[0].process_number, {'id': 1})
+        # Todas já passaram pelo diário, mas só items[0] tem resultado: a seção precisa ser listada
+        for item in items[1:]:
+            journal.record_intent(item.fingerprint, item.process_number)
+        with fake.patched_api():
+            job = manager.wait(manager.submit('create_tasks', 'Retomar', items=items, section_id=SECTION_ID,
+                                              api_token='t', journal=journal, delay=0), timeout=30)
+        manager.shutdown()
+
+        assert job['result']['resumed_tasks'] == [items[0].process_number]
+        assert [number for number, _ in job['result']['existing_tasks']] == [items[1].process_number]
+        assert job['result']['success_count'] == 1
+        assert len(fake.section_tasks(SECTION_ID)) == 2
+
+        # Sem a listagem da seção: o espelho decide; sem espelho, nada é reenviado
+        pending = items[2].replace(content='Intimação reenviada')
+        journal.record_intent(pending.fingerprint, pending.process_number)
+        assert create_task_item(pending, SECTION_ID, 't', journal)[0] == ITEM_FAILED
+        mirror = TaskMirror(':memory:')
+        with fake.patched_api():
+            mirror.refresh(SECTION_ID, 't')
+        assert create_task_item(pending, SECTION_ID, 't', journal, mirror=mirror)[0] == ITEM_EXISTING
+        assert journal.is_done(pending.fingerprint)
+
+
+def test_second_create_job_for_same_section_is_refused():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    items = [Publication(f"0003{i:03d}-00.2024.8.19.0001", f'Intimação {i}', parties='A x B') for i in range(10)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = build_job_manager(os.path.join(tmp, 'jobs.db'))
+        journal = TaskJournal(os.path.join(tmp, 'journal.jsonl'))
+        kwargs = dict(total=len(items), exclusive_key=f'create_tasks:{SECTION_ID}', items=items,
+                      section_id=SECTION_ID, api_token='t', journal=journal, delay=0.05)
+        with fake.patched_api():
+            first = manager.submit('create_tasks', 'Criar', **kwargs)
+            # Clique repetido no botão enquanto o primeiro lote roda
+            try:
+                manager.submit('create_tasks', 'Criar de novo', **kwargs)
+            except JobBusyError as e:
+                assert e.job_id == first
+            else:
+                raise AssertionError('segundo lote aceito na mesma seção')
+            assert manager.wait(first, timeout=30)['result']['success_count'] == 10
+            # Terminado o lote, a chave é liberada (e o diário pula o que já foi criado)
+            again = manager.wait(manager.submit('create_tasks', 'Criar de novo', **kwargs), timeout=30)
+        manager.shutdown()
+
+        assert len(again['result']['resumed_tasks']) == 10
+        assert len(fake.section_tasks(SECTION_ID)) == 10
+
+
+def test_failed_and_interrupted_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.db')
+        manager = JobManager(path)
+        manager.register('boom', lambda ctx: 1 / 0)
+        job = manager.wait(manager.submit('boom', 'Quebra'), timeout=5)
+        assert job['status'] == JOB_FAILED and 'division' in job['error']
+
+        # Um lote "rodando" quando o servidor caiu vira interrompido ao reabrir
+        manager._update(job['id'], status='running')
+        manager.shutdown()
+        assert JobManager(path).get(job['id'])['status'] == JOB_INTERRUPTED
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DOS LOTES EM SEGUNDO PLANO")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Teste da identificação de clientes (Aho–Corasick sobre a lista de clientes)
+"""
+import os
+import random
+import re
+import tempfile
+import time
+
+from client_matcher import AhoCorasick, ClientMatcher, fold
+from publication import Publication
+from publications import consolidate_publications
+
+
+def test_automaton_finds_every_occurrence():
+    rng = random.Random(3)
+    patterns = {''.join(rng.choice('ab') for _ in range(rng.randint(1, 5))) for _ in range(40)}
+    ac = AhoCorasick()
+    for pattern in patterns:
+        ac.add(pattern, pattern)
+    ac.build()
+    for _ in range(50):
+        text = ''.join(rng.choice('abc') for _ in range(60))
+        expected = sorted(p for p in patterns for i in range(len(text)) if text.startswith(p, i))
+        assert sorted(ac.iter_matches(text)) == expected
+
+
+def test_names_and_documents():
+    matcher = ClientMatcher([
+        ('MARIA DA SILVA', ['MARIA DA SILVA'], ['123.456.789-09']),
+        ('Alfa', ['Construtora Alfa Ltda', 'ALFA CONSTRUÇÕES'], ['12.345.678/0001-90']),
+        ('JOSÉ', ['José Santos'], ['']),
+    ])
+    assert fold('Réu: Alfa Construções S/A,  CPF 123.456.789-09') == ' reu alfa construcoes s a cpf 12345678909 '
+    assert matcher.match('Réu: ALFA CONSTRUCOES S/A. Autora: Maria da Silva') == ('Alfa', 'MARIA DA SILVA')
+    assert matcher.match('CNPJ 12345678000190 e CPF 123.456.789-09') == ('Alfa', 'MARIA DA SILVA')
+    # Só palavras inteiras: parte de outro nome ou de outro número não conta
+    assert matcher.match('Maria da Silveira, José Santoro, CPF 1123.456.789-09') == ()
+
+
+def test_roster_file_and_tagging():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'clientes.csv')
+        with open(path, 'w', encoding='utf-8-sig') as f:
+            f.write("Cliente;Documento;Apelidos\nMARIA DA SILVA;123.456.789-09;\n"
+                    "Construtora Alfa Ltda;12.345.678/0001-90;ALFA CONSTRUCOES|CONSTRUTORA ALFA\n;;\n")
+        matcher = ClientMatcher.load(path)
+        assert matcher.count == 2
+        assert ClientMatcher.load(os.path.join(tmp, 'nao_existe.csv')).match('MARIA DA SILVA') == ()
+
+    pubs = [
+        Publication('0028066-08.2021.8.19.0209', 'Autor: MARIA DA SILVA\nRéu: BANCO', pub_id='a'),
+        Publication('0028066-08.2021.8.19.0209', 'Réu: Construtora Alfa', pub_id='b'),
+        Publication('0000702-21.2017.8.19.0203', 'Autor: JOSE\nRéu: EMPRESA', pub_id='c'),
+    ]
+    before = pubs[0].title
+    matcher.tag(pubs)
+    assert [p.clients for p in pubs] == [('MARIA DA SILVA',), ('Construtora Alfa Ltda',), ()]
+    assert before == '0028066-08.2021.8.19.0209 - MARIA DA SILVA x BANCO'
+    assert pubs[0].title == '[MARIA DA SILVA] ' + before
+    merged = consolidate_publications(pubs)[0]
+    assert merged.clients == ('MARIA DA SILVA', 'Construtora Alfa Ltda')
+    assert merged.title.startswith('[MARIA DA SILVA, Construtora Alfa Ltda] 0028066-08.2021.8.19.0209')
+
+
+def test_one_pass_is_faster_than_a_search_per_client():
+    rng = random.Random(5)
+    first = ['MARIA', 'JOSÉ', 'ANA', 'JOÃO', 'PEDRO', 'LUCIA', 'CARLOS', 'PAULA', 'RAFAEL', 'BEATRIZ']
+    last = ['SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'LIMA', 'PEREIRA', 'COSTA', 'RODRIGUES', 'ALMEIDA', 'GOMES']
+    names = sorted({f'{rng.choice(first)} {rng.choice(last)} {rng.choice(last)} {i}' for i in range(2000)})
+    clients = [(name, [name], [f'{rng.randrange(10**10, 10**11)}']) for name in names]
+    started = time.perf_counter()
+    matcher = ClientMatcher(clients)
+    build_s = time.perf_counter() - started
+
+    filler = ' '.join(rng.choice(first + last + ['intimação', 'prazo', 'autos']) for _ in range(600))
+    texts = [f"{filler} Autor: {names[i * 7].title()} Réu: BANCO" for i in range(100)]
+
+    started = time.perf_counter()
+    tagged = [matcher.match(t) for t in texts]
+    one_pass_s = time.perf_counter() - started
+
+    # Referência: um re.search por cliente (só nos 10 primeiros textos)
+    regexes = [re.compile(r'\b' + re.escape(fold(name).strip()) + r'\b') for name in names]
+    started = time.perf_counter()
+    naive = [tuple(names[j] for j, rx in enumerate(regexes) if rx.search(folded))
+             for folded in map(fold, texts[:10])]
+    naive_s = (time.perf_counter() - started) * 10
+
+    assert [set(t) for t in tagged[:10]] == [set(n) for n in naive]
+    assert all(tagged[i] == (names[i * 7],) for i in range(100))
+    assert one_pass_s * 5 < naive_s, f"{one_pass_s:.3f}s x {naive_s:.3f}s"
+    assert build_s < 2
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DA IDENTIFICAÇÃO DE CLIENTES")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Teste da configuração centralizada: cache por mtime e precedência das fontes
+"""
+import os
+import tempfile
+from unittest import mock
+
+import config
+
+
+def test_env_file_is_parsed_once_until_it_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, '.env')
+        with open(path, 'w') as f:
+            f.write("# comentário\nMEISTERTASK_API_TOKEN=abc\nMEISTERTASK_WEBHOOK_ENABLED=true\n"
+                    "DJNE_NOME_ADVOGADO=\"FULANO DE TAL\"\n")
+        config.reload()
+        with mock.patch.dict(os.environ, {}, clear=True), \
+             mock.patch('config.parse_env_file', wraps=config.parse_env_file) as parse:
+            settings = config.get_settings(path)
+            for _ in range(100):
+                assert config.get_settings(path) is settings
+            assert parse.call_count == 1
+            assert settings.meistertask_api_token == 'abc'
+            assert settings.meistertask_webhook_enabled is True
+            assert settings.djne_nome_advogado == 'FULANO DE TAL'
+            assert settings.meistertask_section_id == ''
+
+            # Arquivo alterado: relido na próxima chamada
+            with open(path, 'w') as f:
+                f.write("MEISTERTASK_API_TOKEN=xyz\n")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+            assert config.get_settings(path).meistertask_api_token == 'xyz'
+            assert config.get_settings(path).meistertask_webhook_enabled is False
+            assert parse.call_count == 2
+
+
+def test_environment_overrides_env_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, '.env')
+        with open(path, 'w') as f:
+            f.write("MEISTERTASK_SECTION_ID=1\nOUTRA=valor\n")
+        config.reload()
+        with mock.patch.dict(os.environ, {'MEISTERTASK_SECTION_ID': '2'}):
+            assert config.get_settings(path).meistertask_section_id == '2'
+            assert config.get_value('OUTRA', env_path=path) == 'valor'
+            assert config.get_value('INEXISTENTE', 'padrão', env_path=path) == 'padrão'
+        config.reload()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DA CONFIGURAÇÃO")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
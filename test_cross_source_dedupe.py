@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Teste da deduplicação entre fontes: CNJ normalizado, simhash e índice por faixas
+"""
+import os
+import random
+import tempfile
+import time
+
+from cross_source_dedupe import CrossSourceIndex, normalize_cnj, content_simhash, content_numbers, hamming
+from publication import Publication
+
+TEXTO = ("Fica a parte autora intimada para, no prazo de 15 (quinze) dias, manifestar-se sobre "
+         "a contestação e os documentos juntados pela parte ré, bem como especificar as provas "
+         "que pretende produzir, justificando a sua pertinência, sob pena de preclusão. "
+         "Autor: MARIA DA SILVA Réu: BANCO XPTO S.A. Advogado: EDSON PRATTI OAB/RJ 123456")
+
+# Como chega no resumo do Gmail: cabeçalho, quebras de linha e CNJ com máscara
+GMAIL = Publication('0028066-08.2021.8.19.0209',
+                    "Processo nº 0028066-08.2021.8.19.0209\n" + TEXTO.replace('. ', '.\n'), origem='Gmail')
+# Como chega pelo DJNE: texto corrido, CNJ sem máscara
+DJNE = Publication('00280660820218190209', TEXTO + ' Disponibilizado em 19/10/2026.', origem='DJNE')
+
+
+def test_normalize_cnj():
+    expected = '0028066-08.2021.8.19.0209'
+    assert normalize_cnj('Processo 0028066-08.2021.8.19.0209') == expected
+    assert normalize_cnj('00280660820218190209') == expected
+    assert normalize_cnj('Proc. 0028066 08 2021 8 19 0209') == expected
+    assert normalize_cnj('Não identificado') == ''
+    assert normalize_cnj('002806608202181902091') == ''
+
+
+def test_simhash_separates_near_from_different():
+    assert hamming(GMAIL.simhash, DJNE.simhash) <= 10
+    other = Publication('0028066-08.2021.8.19.0209', "Julgo procedente o pedido para condenar o réu ao "
+                        "pagamento de indenização por danos morais no valor de dez mil reais, com correção.")
+    assert hamming(GMAIL.simhash, other.simhash) > 10
+    # Texto curto: sem simhash (só conteúdo idêntico vale)
+    assert content_simhash('Intimação 1') == 0
+
+
+def test_index_matches_across_sources_and_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dedupe.jsonl')
+        index = CrossSourceIndex(path)
+        assert index.find(DJNE) is None
+        index.add(GMAIL)
+        assert index.find(GMAIL) is None            # a mesma publicação é assunto do diário
+        assert index.find(DJNE)['origem'] == 'Gmail'
+
+        # Rodada seguinte: o índice volta do arquivo
+        index = CrossSourceIndex(path)
+        assert len(index) == 1 and index.find(DJNE)['fingerprint'] == GMAIL.fingerprint
+
+    # CNJ diferente nunca é duplicata, mesmo com texto igual
+    index = CrossSourceIndex(None)
+    index.add(GMAIL)
+    assert index.find(Publication('0000702-21.2017.8.19.0203', GMAIL.content)) is None
+    # Sem CNJ de um lado: vale só o conteúdo (faixas do simhash), com tolerância menor
+    index.add(DJNE)
+    assert index.find(Publication('Não identificado', TEXTO, origem='Gmail'))['origem'] == 'DJNE'
+    # Mesmo texto curto com o processo escrito de outro jeito
+    index.add(Publication('0012345-67.2024.8.19.0001', 'Intimação 1'))
+    assert index.find(Publication('00123456720248190001', 'Intimação 1')) is not None
+    assert index.find(Publication('00123456720248190001', 'Intimação 2')) is None
+
+
+def test_same_template_with_other_dates_is_not_a_duplicate():
+    # Números sem o CNJ (com ou sem máscara) e sem zeros à esquerda
+    assert GMAIL.numbers == ['123456', '15']
+    assert DJNE.numbers == ['10', '123456', '15', '19', '2026']
+    assert content_numbers('Audiência em 05/03/2027 às 09h') == ['2027', '3', '5']
+
+    index = CrossSourceIndex(None)
+    index.add(DJNE)
+    # Meses depois, nova intimação do mesmo modelo no mesmo processo: outro prazo, outra data
+    later = Publication('0028066-08.2021.8.19.0209',
+                        TEXTO.replace('15 (quinze)', '5 (cinco)') + ' Disponibilizado em 02/03/2027.', origem='DJNE')
+    assert hamming(later.simhash, DJNE.simhash) <= 10
+    assert index.find(later) is None
+    assert index.find(later.replace(process_number='Não identificado')) is None
+    # A outra fonte sem a data acrescentada continua sendo a mesma publicação
+    assert index.find(GMAIL)['fingerprint'] == DJNE.fingerprint
+
+    # Entradas gravadas antes dos números: só o conteúdo idêntico vale
+    legacy = CrossSourceIndex(None)
+    legacy._index({'fingerprint': 'antiga', 'cnj_key': DJNE.cnj_key, 'content_hash': DJNE.content_hash,
+                   'simhash': DJNE.simhash, 'origem': 'DJNE', 'process_number': DJNE.process_number})
+    assert legacy.find(later) is None and legacy.find(GMAIL) is None
+    assert legacy.find(DJNE.replace(process_number='00280660820218190209')) is not None
+
+
+def test_truncated_tail_is_dropped():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dedupe.jsonl')
+        CrossSourceIndex(path).add(GMAIL)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"fingerprint": "cort')
+        index = CrossSourceIndex(path)
+        index.add(DJNE)
+        assert len(CrossSourceIndex(path)) == 2
+
+
+def test_lookup_time_does_not_grow_with_history():
+    rng = random.Random(7)
+    vocabulary = [f'termo{i}' for i in range(3000)]
+    index = CrossSourceIndex(None)
+    pubs = []
+    for i in range(20000):
+        pub = Publication(f'{i:07d}-00.2024.8.19.0001', ' '.join(rng.choice(vocabulary) for _ in range(60)))
+        index.add(pub)
+        pubs.append(pub)
+
+    probes = [p.replace(process_number=f'Processo {p.cnj_key}', content=p.content + ' fim') for p in pubs[:200]]
+    misses = [Publication('Não identificado', ' '.join(rng.choice(vocabulary) for _ in range(60)))
+              for _ in range(200)]
+    for pub in probes + misses:
+        pub.simhash
+    started = time.perf_counter()
+    found = sum(index.find(p) is not None for p in probes)
+    false_hits = sum(index.find(p) is not None for p in misses)
+    elapsed = time.perf_counter() - started
+    assert found == 200 and false_hits == 0
+    assert elapsed / 400 < 0.001, f"busca lenta: {elapsed / 400 * 1000:.2f} ms"
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DA DEDUPLICAÇÃO ENTRE FONTES")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -47,13 +47,13 @@ try:
     if publicacoes:
         print("\n4. Detalhes da primeira publicação:")
         pub = publicacoes[0]
-        print(f"   - Processo: {pub.get('process_number', 'N/A')}")
-        print(f"   - Órgão: {pub.get('orgao', 'N/A')}")
-        print(f"   - Data: {pub.get('data_disponibilizacao', 'N/A')}")
-        print(f"   - Tipo: {pub.get('tipo_comunicacao', 'N/A')}")
-        print(f"   - Origem: {pub.get('origem', 'N/A')}")
+        print(f"   - Processo: {pub.process_number or 'N/A'}")
+        print(f"   - Órgão: {pub.orgao or 'N/A'}")
+        print(f"   - Data: {pub.data_disponibilizacao or 'N/A'}")
+        print(f"   - Tipo: {pub.tipo_comunicacao or 'N/A'}")
+        print(f"   - Origem: {pub.origem or 'N/A'}")
         
-        conteudo = pub.get('content', '')
+        conteudo = pub.content
         print(f"   - Tamanho do conteúdo: {len(conteudo)} caracteres")
         print(f"   - Preview: {conteudo[:200]}...")
     else:
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Teste do cliente do Gmail: serviço reaproveitado e renovação única do token
+"""
+import os
+import pickle
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from google.oauth2.credentials import Credentials
+
+from gmail_client import GmailClient
+
+
+class FakeCredentials:
+    """Credenciais expiradas que demoram para renovar (para forçar disputa entre threads)"""
+
+    def __init__(self):
+        self.valid = False
+        self.expired = True
+        self.refresh_token = 'refresh'
+        self.refresh_calls = 0
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        time.sleep(0.05)
+        self.valid, self.expired = True, False
+
+
+def test_concurrent_refresh_happens_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        token_path = os.path.join(tmp, 'token.pickle')
+        with open(token_path, 'wb') as f:
+            pickle.dump(FakeCredentials(), f)
+        client = GmailClient(token_path=token_path, credentials_path=os.path.join(tmp, 'nao_existe.json'))
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.credentials())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len({id(c) for c in results}) == 1
+        assert results[0].refresh_calls == 1
+        # Token renovado foi gravado de volta
+        with open(token_path, 'rb') as f:
+            assert pickle.load(f).valid
+
+
+def test_service_built_from_static_document():
+    with tempfile.TemporaryDirectory() as tmp:
+        token_path = os.path.join(tmp, 'token.pickle')
+        creds = Credentials(token='token-teste')
+        with open(token_path, 'wb') as f:
+            pickle.dump(creds, f)
+        client = GmailClient(token_path=token_path)
+
+        # Nenhum download de documento de descoberta
+        with mock.patch('googleapiclient.http.HttpRequest.execute', side_effect=AssertionError('rede')):
+            service = client.service()
+            assert client.service() is service            # reaproveitado na mesma thread
+            other = []
+            t = threading.Thread(target=lambda: other.append(client.service()))
+            t.start()
+            t.join()
+        assert other[0] is not service                     # um serviço por thread
+        assert hasattr(service.users().messages(), 'list')
+
+
+def test_missing_token_and_secrets_returns_none():
+    with tempfile.TemporaryDirectory() as tmp:
+        client = GmailClient(token_path=os.path.join(tmp, 'token.pickle'),
+                             credentials_path=os.path.join(tmp, 'credentials.json'))
+        assert client.service() is None
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO CLIENTE GMAIL")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
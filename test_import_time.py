@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark de importação do dashboard (python -X importtime)
+Executa só os imports de nível de módulo do dashboard.py num processo novo e
+garante que as bibliotecas pesadas ficaram para quando são usadas de fato
+"""
+import ast
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Importadas sob demanda (Gmail, conversão de HTML, DJNE/bs4, OpenAI removido, numpy)
+DEFERRED_MODULES = ['googleapiclient', 'google_auth_oauthlib', 'openai', 'html2text', 'bs4', 'djne_scraper',
+                    'numpy']
+
+# O próprio streamlit já carrega numpy e pandas: fica de fora para a medição
+# mostrar o que os módulos do projeto importam (os mesmos do pipeline_runner)
+SKIPPED_MODULES = ('streamlit',)
+
+
+def module_level_imports(path, skip=SKIPPED_MODULES):
+    """Código com os imports de nível de módulo de um arquivo (sem executar o resto)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source)
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+
+    def _module(node):
+        name = node.module if isinstance(node, ast.ImportFrom) else node.names[0].name
+        return (name or '').split('.')[0]
+
+    return '\n'.join(ast.get_source_segment(source, n) for n in nodes if _module(n) not in skip)
+
+
+def import_times(code):
+    """Roda `code` com -X importtime; retorna {módulo: tempo cumulativo em µs}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=REPO_DIR, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len('import time:'):].split('|')]
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_dashboard_defers_heavy_imports():
+    times = import_times(module_level_imports(os.path.join(REPO_DIR, 'dashboard.py')))
+    loaded = {name.split('.')[0] for name in times}
+    eager = [m for m in DEFERRED_MODULES if m in loaded]
+    assert not eager, f"Importados no início do dashboard: {eager}"
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("BENCHMARK DE IMPORTAÇÃO DO DASHBOARD")
+    print("=" * 60)
+    code = module_level_imports(os.path.join(REPO_DIR, 'dashboard.py'))
+    startup = import_times(code)
+    top = sorted(((t, n) for n, t in startup.items() if '.' not in n), reverse=True)[:10]
+    for cumulative, name in top:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    available = []
+    for module in DEFERRED_MODULES:
+        try:
+            __import__(module)
+            available.append(module)
+        except ImportError:
+            pass
+    if available:
+        deferred = import_times('\n'.join(f'import {m}' for m in available))
+        saved = sum(deferred.get(m, 0) for m in available)
+        print(f"\n  Adiado para o primeiro uso: ~{saved / 1000:.0f} ms ({', '.join(available)})")
+
+    test_dashboard_defers_heavy_imports()
+    print("✅ test_dashboard_defers_heavy_imports")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Teste do MeisterTaskClient: repetição em 429, lixeira em lote e estatísticas
+"""
+import requests
+
+from fake_meistertask import FakeMeisterTask
+from meistertask_api import AIMDController, MeisterTaskClient
+
+SECTION_ID = 31
+
+
+def test_bulk_trash_with_throttling():
+    fake = FakeMeisterTask(throttle_every=7)
+    tasks = [fake.add_task(SECTION_ID, f"Tarefa {i}") for i in range(120)]
+    # Duas já estavam na lixeira: contam como "já excluídas"
+    for task in tasks[:2]:
+        task['status'] = 18
+
+    with fake.patched_api():
+        client = MeisterTaskClient('token-teste', base_delay=0.01)
+        summary = client.trash_tasks([t['id'] for t in tasks])
+        ok, created = client.create_task('0000001-00.2024.8.19.0001', 'A x B', 'notas', SECTION_ID)
+
+    assert summary['error_count'] == 0, summary['errors']
+    assert summary['success_count'] == 118
+    assert summary['already_count'] == 2
+    assert sorted(summary['removed_ids']) == sorted(t['id'] for t in tasks)
+    assert summary['throughput'] > 0
+    assert ok and created['name'].startswith('0000001-00.2024.8.19.0001')
+
+    stats = client.latency_stats()
+    assert stats['trash_task']['count'] > 120        # houve repetições por 429
+    assert stats['create_task']['count'] >= 1
+
+
+def test_create_is_not_resent_after_a_timeout():
+    client = MeisterTaskClient('token-teste', base_delay=0.01)
+    calls = []
+
+    def _request(method, url, **kwargs):
+        calls.append((method, url))
+        if method == 'POST':
+            raise requests.exceptions.ReadTimeout('sem resposta')
+        raise requests.exceptions.ConnectionError('fora do ar')
+
+    client.session.request = _request
+    ok, error = client.create_task('0000001-00.2024.8.19.0001', 'A x B', 'notas', SECTION_ID)
+    # A tarefa pode ter sido criada: um único POST, e o erro não é repetível
+    assert not ok and error.unknown_outcome and not error.transient
+    assert [method for method, _ in calls] == ['POST']
+
+    # GET pode ser repetido
+    calls.clear()
+    ok, _ = client.get_task(1)
+    assert not ok and len(calls) == 3
+
+
+def test_aimd_controller_adjusts_limit():
+    controller = AIMDController(initial=4, maximum=8, latency_target=1.0)
+    for _ in range(4):
+        controller.acquire()
+        controller.release(0.1)
+    assert controller.limit == 5
+    controller.acquire()
+    controller.release(0.1, overloaded=True)
+    assert controller.limit == 2
+    controller.acquire()
+    controller.release(2.5)   # resposta lenta também reduz
+    assert controller.limit == 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO CLIENTE MEISTERTASK")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
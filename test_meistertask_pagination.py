@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Teste da paginação de tarefas do MeisterTask contra um servidor falso local
+"""
+from fake_meistertask import FakeMeisterTask
+from meistertask_api import iter_meistertask_tasks, list_meistertask_tasks
+
+TOTAL_TASKS = 10000
+SECTION_ID = 4242
+
+
+def _run_against(max_page_size):
+    fake = FakeMeisterTask(max_page_size=max_page_size)
+    for i in range(TOTAL_TASKS):
+        fake.add_task(SECTION_ID, f"{i:07d}-00.2024.8.19.0001 - Parte {i} x Outra")
+
+    with fake.patched_api():
+        ok, tasks = list_meistertask_tasks(SECTION_ID, 'token-teste')
+
+    assert ok, tasks
+    ids = [t['id'] for t in tasks]
+    assert len(ids) == TOTAL_TASKS, f"esperado {TOTAL_TASKS}, recebido {len(ids)}"
+    assert len(set(ids)) == TOTAL_TASKS, "páginas sobrepostas"
+    assert ids == sorted(ids), "tarefas fora de ordem"
+    return len(fake.requests)
+
+
+def test_pagination_full_pages():
+    requests_made = _run_against(max_page_size=100)
+    # 100 páginas cheias + no máximo a janela de prefetch além do fim
+    assert requests_made <= 100 + 4 + 1
+
+
+def test_pagination_server_caps_page_size():
+    requests_made = _run_against(max_page_size=50)
+    assert requests_made <= 200 + 4 + 1
+
+
+def test_small_section_stops_early():
+    fake = FakeMeisterTask()
+    for i in range(7):
+        fake.add_task(SECTION_ID, f"Tarefa {i}")
+
+    with fake.patched_api():
+        tasks = list(iter_meistertask_tasks(SECTION_ID, 'token-teste'))
+
+    assert len(tasks) == 7
+    assert len(fake.requests) == 2
+
+
+def test_missing_section_reports_404():
+    with FakeMeisterTask().patched_api():
+        ok, message = list_meistertask_tasks(999, 'token-teste')
+
+    assert not ok
+    assert 'Erro 404' in message
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DE PAGINAÇÃO DO MEISTERTASK")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Teste da detecção de tarefas quase duplicadas (MinHash/LSH)
+"""
+import random
+
+from near_duplicates import find_near_duplicate_tasks
+
+NOTES = """Publicação: 1
+Data de Disponibilização: 22/01/2026
+Jornal: Diário da Justiça Eletrônico do Estado do Rio de Janeiro
+PROCESSO: 0028066-08.2021.8.19.0209 - PROCEDIMENTO COMUM CÍVEL
+POLO ATIVO: ALESSANDRA RODRIGUES DE SOUSA
+POLO PASSIVO: ELETRONICA JM 3939
+Fica a parte autora intimada para se manifestar sobre a contestação no prazo de 15 dias."""
+
+
+def test_groups_typo_and_missing_number():
+    random.seed(3)
+    vocab = [f"palavra{i}" for i in range(3000)]
+    tasks = [
+        {'id': i, 'name': f'Publicação {i}', 'notes': ' '.join(random.choice(vocab) for _ in range(120))}
+        for i in range(2000)
+    ]
+    tasks.append({'id': 'a', 'name': '0028066-08.2021.8.19.0209 - ALESSANDRA x ELETRONICA', 'notes': NOTES})
+    tasks.append({'id': 'b', 'name': 'Sem número identificado', 'notes': NOTES.replace('Cível', 'Civel')})
+    tasks.append({'id': 'c', 'name': '0028066-08.2021.8.19.0290 - ALESSANDRA x ELETRONICA',
+                  'notes': NOTES + '\nPublicado em 23/01/2026.'})
+
+    groups = find_near_duplicate_tasks(tasks)
+    assert [sorted(str(t['id']) for t in g) for g in groups] == [['a', 'b', 'c']]
+
+
+def test_exact_groups_are_left_to_the_exact_search():
+    tasks = [
+        {'id': 1, 'name': '0028066-08.2021.8.19.0209 - A', 'notes': NOTES},
+        {'id': 2, 'name': '0028066-08.2021.8.19.0209 - A', 'notes': NOTES},
+        {'id': 3, 'name': 'Publicação 3', 'notes': NOTES},
+    ]
+    assert find_near_duplicate_tasks(tasks[:2]) == []
+    groups = find_near_duplicate_tasks(tasks, exclude_ids={1})
+    assert [sorted(t['id'] for t in g) for g in groups] == [[2, 3]]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DE QUASE DUPLICATAS (MINHASH)")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Teste da execução automática: regras de aprovação, duplicatas e relatório
+"""
+import base64
+import json
+import os
+import tempfile
+import time
+
+from client_matcher import ClientMatcher
+from config import Settings
+from cross_source_dedupe import CrossSourceIndex
+from fake_meistertask import FakeMeisterTask
+from pipeline_runner import PipelineRunner, AutoApproveRules, SOURCE_GMAIL, SOURCE_DJNE
+from publication import Publication
+from publication_store import PublicationStore
+from retry_queue import RetryQueue
+from task_journal import TaskJournal
+from task_mirror import TaskMirror
+
+SECTION_ID = 51
+
+EMAILS = [
+    ("Processo nº 0028066-08.2021.8.19.0209\nAutor: MARIA DA SILVA\nRéu: BANCO XPTO S.A.\n"
+     "Intimação para manifestação no prazo de 15 dias."),
+    ("Processo nº 0000702-21.2017.8.19.0203\nAutor: JOSE SANTOS\nRéu: EMPRESA Y LTDA\n"
+     "Edital de citação publicado."),
+]
+
+
+class FakeGmail:
+    """GmailClient + serviço mínimos: list/get de users().messages(), com atraso opcional no get"""
+
+    def __init__(self, bodies, get_delay=0.0):
+        self._messages = {
+            f'm{i}': {'id': f'm{i}', 'labelIds': ['UNREAD'], 'payload': {
+                'headers': [{'name': 'Subject', 'value': 'Publicações do dia'},
+                            {'name': 'From', 'value': 'tj@tjrj.jus.br'},
+                            {'name': 'Date', 'value': '19/10/2026'}],
+                'body': {'data': base64.urlsafe_b64encode(body.encode('utf-8')).decode('ascii')}}}
+            for i, body in enumerate(bodies)
+        }
+        self.get_delay = get_delay
+        self.fetched_at = []
+
+    def service(self):
+        return self
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, userId, q, maxResults):
+        return _Call(lambda: {'messages': [{'id': mid} for mid in list(self._messages)[:maxResults]]})
+
+    def get(self, userId, id, format):
+        def _get():
+            time.sleep(self.get_delay)
+            self.fetched_at.append(time.perf_counter())
+            return self._messages[id]
+        return _Call(_get)
+
+
+class _Call:
+    def __init__(self, func):
+        self.execute = func
+
+
+def _djne(date_from, date_to):
+    return [
+        Publication('0012345-67.2024.8.19.0001', 'Intimação da sentença. Autor: ANA x Réu: LOJA',
+                    orgao='2ª Vara Cível', origem='DJNE', pub_id='djne_0'),
+        Publication('0099999-11.2024.8.19.0001', 'Já tem tarefa no quadro',
+                    orgao='3ª Vara Cível', origem='DJNE', pub_id='djne_1'),
+        Publication('Sem número identificado', 'Aviso geral', origem='DJNE', pub_id='djne_2'),
+    ]
+
+
+def _runner(tmp, rules, gmail=None, djne_fetch=_djne, settings=None, **kwargs):
+    settings = settings or Settings(meistertask_api_token='t', meistertask_section_id=str(SECTION_ID))
+    return PipelineRunner(
+        settings, rules,
+        journal=TaskJournal(os.path.join(tmp, 'journal.jsonl')),
+        mirror=TaskMirror(os.path.join(tmp, 'mirror.db')),
+        retry_queue=RetryQueue(os.path.join(tmp, 'retry.db')),
+        store=PublicationStore(os.path.join(tmp, 'publications.db')),
+        dedupe_index=CrossSourceIndex(os.path.join(tmp, 'dedupe.jsonl')),
+        gmail_client=gmail or FakeGmail(EMAILS), djne_fetch=djne_fetch,
+        reports_path=os.path.join(tmp, 'reports.jsonl'),
+        delay=0, **kwargs
+    )
+
+
+def test_run_creates_approved_and_skips_existing():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    fake.add_task(SECTION_ID, '0099999-11.2024.8.19.0001 - Antiga')
+    rules = AutoApproveRules(exclude_keywords=('edital',))
+
+    clients = ClientMatcher([('MARIA DA SILVA', ['Maria da Silva'], [])])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _runner(tmp, rules, client_matcher=clients)
+        with fake.patched_api():
+            first = runner.run_once()
+            second = runner.run_once()
+
+        assert first.fetched == {SOURCE_GMAIL: 2, SOURCE_DJNE: 3}
+        assert first.extracted == 5
+        assert sorted(first.created) == ['0012345-67.2024.8.19.0001', '0028066-08.2021.8.19.0209']
+        assert first.existing == ['0099999-11.2024.8.19.0001']
+        assert {h['reason'] for h in first.held} == {'sem número de processo', 'contém "edital"'}
+        assert not first.errors
+
+        # Todas as publicações lidas vão para o histórico, inclusive as retidas
+        assert runner.store.counts() == {'total': 5, 'Gmail': 2, 'DJNE': 3}
+        assert runner.store.search('edital')[1] == 1
+
+        # Segunda rodada: tudo que virou tarefa é reconhecido pelo diário
+        assert second.created == [] and second.already_processed == 3
+        assert len(fake.section_tasks(SECTION_ID)) == 3
+        # Cliente identificado na extração vai para o título
+        names = [t['name'] for t in fake.section_tasks(SECTION_ID)]
+        assert '[MARIA DA SILVA] 0028066-08.2021.8.19.0209 - MARIA DA SILVA x BANCO XPTO S.A.' in names
+
+        with open(os.path.join(tmp, 'reports.jsonl'), encoding='utf-8') as f:
+            reports = [json.loads(line) for line in f]
+        assert len(reports) == 2 and reports[0]['created'] == first.created
+
+
+def test_dry_run_and_source_errors():
+    def _broken(date_from, date_to):
+        raise RuntimeError('fora do ar')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _runner(tmp, AutoApproveRules(max_per_run=1), djne_fetch=_broken)
+        report = runner.run_once(dry_run=True)
+
+    # Sem chamadas à API: o fake nem está rodando
+    assert report.items == 1 and report.created == []
+    assert any('limite de 1' in h['reason'] for h in report.held)
+    assert report.errors == ['Erro ao buscar no DJNE: fora do ar']
+    assert 'Seriam criadas: 1' in report.format()
+
+
+def test_forwarded_copies_are_extracted_once():
+    forwarded = "Segue.\n\n---------- Mensagem encaminhada ---------\nDe: TJ <tj@tjrj.jus.br>\n\n" + EMAILS[0]
+    quoted = "Ciente.\nEm seg., TJ <tj@tjrj.jus.br> escreveu:\n" + ''.join(f"> {l}\n" for l in EMAILS[0].splitlines())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Corpos vazios têm todos o mesmo texto, mas não são cópias um do outro
+        runner = _runner(tmp, AutoApproveRules(), gmail=FakeGmail(EMAILS + [forwarded, quoted, '', '']),
+                         sources=(SOURCE_GMAIL,))
+        report = runner.run_once(dry_run=True)
+
+    assert report.fetched == {SOURCE_GMAIL: 6} and report.duplicate_emails == 2
+    # Cada e-mail vazio passa pela extração (vira uma publicação sem número)
+    assert report.extracted == 4 and report.pipeline['extract']['emitted'] == 4
+    assert 'E-mails repetidos (encaminhados) ignorados: 2' in report.format()
+
+
+def test_first_task_created_while_emails_still_download():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    bodies = [f"Processo nº {i:07d}-00.2024.8.19.0001\nAutor: A{i}\nRéu: B\nIntimação." for i in range(12)]
+    gmail = FakeGmail(bodies, get_delay=0.05)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _runner(tmp, AutoApproveRules(), gmail=gmail, sources=(SOURCE_GMAIL,),
+                         concurrency={'fetch': 1}, buffer=2)
+        with fake.patched_api():
+            started = time.perf_counter()
+            report = runner.run_once()
+
+    assert len(report.created) == 12 and not report.errors
+    # A primeira tarefa saiu antes do último e-mail ser baixado
+    assert started + report.first_task_s < gmail.fetched_at[-1]
+    assert report.pipeline['fetch']['received'] == 12
+    assert report.pipeline['decode']['max_queue'] <= 2
+
+
+def test_consolidate_creates_one_task_per_process():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+
+    def _same_process(date_from, date_to):
+        return [Publication('0012345-67.2024.8.19.0001', f'Intimação {i}', origem='DJNE') for i in range(3)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _runner(tmp, AutoApproveRules(consolidate=True), sources=(SOURCE_DJNE,),
+                         djne_fetch=_same_process)
+        with fake.patched_api():
+            report = runner.run_once()
+
+    assert report.created == ['0012345-67.2024.8.19.0001'] and report.items == 1
+    assert 'Publicação 3/3' in fake.section_tasks(SECTION_ID)[0]['notes']
+
+
+def test_second_publication_for_process_created_in_same_run_is_appended():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+
+    def _two_acts(date_from, date_to):
+        return [
+            Publication('0012345-67.2024.8.19.0001', 'Intimação da sentença. Autor: ANA x Réu: LOJA',
+                        origem='DJNE', pub_id='djne_0'),
+            Publication('0012345-67.2024.8.19.0001', 'Despacho: manifeste-se o autor sobre os cálculos do perito',
+                        origem='DJNE', pub_id='djne_1'),
+        ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,), djne_fetch=_two_acts)
+        with fake.patched_api():
+            report = runner.run_once()
+            again = runner.run_once()
+
+    assert report.created == ['0012345-67.2024.8.19.0001']
+    assert report.appended == ['0012345-67.2024.8.19.0001'] and report.existing == []
+    assert 'Acrescentadas a tarefas criadas nesta rodada: 1' in report.format()
+    tasks = fake.section_tasks(SECTION_ID)
+    assert len(tasks) == 1
+    assert 'Intimação da sentença' in tasks[0]['notes'] and 'cálculos do perito' in tasks[0]['notes']
+    assert 'Publicação adicional' in tasks[0]['notes']
+    assert again.created == [] and again.appended == [] and again.already_processed == 2
+
+
+def test_same_publication_from_gmail_and_djne_creates_one_task():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    texto = ("Fica a parte autora intimada para, no prazo de 15 (quinze) dias, manifestar-se sobre a "
+             "contestação e os documentos juntados pela parte ré, bem como especificar as provas que "
+             "pretende produzir, sob pena de preclusão.")
+    gmail = FakeGmail([f"Processo nº 0028066-08.2021.8.19.0209\nAutor: MARIA DA SILVA\nRéu: BANCO XPTO\n{texto}"])
+
+    def _djne_same(date_from, date_to):
+        # DJNE: CNJ sem máscara e texto corrido
+        return [Publication('00280660820218190209', f"{texto} Autor: MARIA DA SILVA Réu: BANCO XPTO",
+                            origem='DJNE', pub_id='djne_0')]
+
+    def _djne_next_day(date_from, date_to):
+        return [Publication('0028066-08.2021.8.19.0209', f"{texto} Disponibilizado em 20/10/2026.",
+                            origem='DJNE', pub_id='djne_0')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with fake.patched_api():
+            first = _runner(tmp, AutoApproveRules(), gmail=gmail, djne_fetch=_djne_same).run_once()
+            # Outra rodada (novo processo, índice lido do arquivo)
+            second = _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,),
+                             djne_fetch=_djne_next_day).run_once()
+
+    assert first.extracted == 2 and len(first.created) == 1 and len(first.duplicates) == 1
+    assert second.created == [] and second.duplicates[0]['duplicate_of'].startswith('0028066-08.2021')
+    assert len(fake.section_tasks(SECTION_ID)) == 1
+    assert 'Duplicadas (outra fonte ou rodada): 1' in second.format()
+
+
+def test_new_publication_of_same_template_is_not_skipped():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    fake.add_section(1, SECTION_ID + 1, 'Em andamento')
+    texto = ("Fica a parte autora intimada para, no prazo de {prazo} dias, manifestar-se sobre a "
+             "contestação e os documentos juntados pela parte ré, sob pena de preclusão. "
+             "Autor: MARIA DA SILVA Réu: BANCO XPTO Disponibilizado em {data}.")
+
+    def _djne(prazo, data):
+        pub = Publication('0028066-08.2021.8.19.0209', texto.format(prazo=prazo, data=data),
+                          origem='DJNE', pub_id='djne_0')
+        return lambda date_from, date_to: [pub]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with fake.patched_api():
+            first = _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,), djne_fetch=_djne(15, '19/10/2026')).run_once()
+            # A tarefa foi tratada e saiu da seção Publicações
+            task = fake.section_tasks(SECTION_ID)[0]
+            fake.sections[SECTION_ID].remove(task['id'])
+            fake.sections[SECTION_ID + 1].append(task['id'])
+            task['section_id'] = SECTION_ID + 1
+            # (meses depois o espelho já passou por uma sincronização completa)
+            os.remove(os.path.join(tmp, 'mirror.db'))
+            # Meses depois: mesmo modelo, mesmo processo, outro prazo e outra data
+            later = _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,), djne_fetch=_djne(5, '02/03/2027')).run_once()
+
+    assert first.created == later.created == ['0028066-08.2021.8.19.0209']
+    assert later.duplicates == []
+    assert 'prazo de 5 dias' in fake.section_tasks(SECTION_ID)[0]['notes']
+
+
+def test_rules_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rules.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'include_keywords': ['intimação'], 'orgaos': ['Vara Cível']}, f)
+        rules = AutoApproveRules.load(path)
+        assert rules.include_keywords == ('intimação',)
+        assert rules.rejection(Publication('0012345-67.2024.8.19.0001', 'Intimação', orgao='2ª Vara Cível')) is None
+        assert rules.rejection(Publication('0012345-67.2024.8.19.0001', 'Intimação',
+                                           orgao='Juizado')) == 'órgão fora da lista'
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'max_por_rodada': 3}, f)
+        try:
+            AutoApproveRules.load(path)
+            assert False, 'regra desconhecida deveria falhar'
+        except ValueError:
+            pass
+
+
+def test_publication_is_indexed_only_after_its_task_exists():
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, 'dedupe.jsonl')
+        # MeisterTask não configurado, simulação e criação recusada (seção inexistente):
+        # nenhuma tarefa, então nada entra no índice entre fontes
+        unconfigured = _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,), settings=Settings()).run_once()
+        assert 'não configurados' in unconfigured.errors[0]
+        _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,)).run_once(dry_run=True)
+        with FakeMeisterTask().patched_api():
+            refused = _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,)).run_once()
+        assert refused.created == [] and refused.errors
+        assert len(CrossSourceIndex(index_path)) == 0
+
+        fake = FakeMeisterTask()
+        fake.add_section(1, SECTION_ID, 'Publicações')
+        with fake.patched_api():
+            report = _runner(tmp, AutoApproveRules(), sources=(SOURCE_DJNE,)).run_once()
+        assert len(report.created) == 2 and report.duplicates == []
+        assert len(CrossSourceIndex(index_path)) == 2
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DA EXECUÇÃO AUTOMÁTICA")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
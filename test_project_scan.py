@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Teste da busca de duplicatas no projeto inteiro (todas as seções)
+"""
+from fake_meistertask import FakeMeisterTask
+from meistertask_api import scan_project_tasks, find_cross_section_duplicates, locked_duplicate_ids
+from near_duplicates import find_near_duplicate_tasks
+
+PROJECT_ID = 5
+
+
+def test_duplicates_spanning_sections():
+    fake = FakeMeisterTask()
+    fake.add_section(PROJECT_ID, 1, 'Publicações')
+    fake.add_section(PROJECT_ID, 2, 'Em andamento')
+    fake.add_section(PROJECT_ID, 3, 'Concluído')
+    for i in range(3000):
+        fake.add_task(1 + i % 3, f"{i:07d}-00.2024.8.19.0001 - Parte {i}")
+    # Processo movido para "Em andamento" (com responsável) e recriado em "Publicações"
+    fake.add_task(2, "0000000-00.2024.8.19.0001 - Movida", assigned_to_id=9, created_at='2026-03-01T00:00:00Z')
+    # Duplicata dentro da mesma seção (não é entre seções)
+    fake.add_task(2, "0000001-00.2024.8.19.0001 - Repetida")
+
+    with fake.patched_api():
+        sections, tasks_by_section = scan_project_tasks(PROJECT_ID, 'token-teste')
+
+    assert len(sections) == 3
+    assert list(tasks_by_section) == [1, 2, 3]
+    all_tasks = [t for tasks in tasks_by_section.values() for t in tasks]
+    assert len(all_tasks) == 3002
+
+    duplicates = find_cross_section_duplicates(all_tasks, inbox_section_id=1)
+    assert list(duplicates) == ["0000000-00.2024.8.19.0001"]
+    # A que está em andamento vem primeiro (é a mantida), mesmo sendo a mais nova
+    names = [t['section_name'] for t in duplicates["0000000-00.2024.8.19.0001"]]
+    assert names == ['Em andamento', 'Publicações']
+    # A ordem não depende da ordem em que as seções foram lidas
+    assert find_cross_section_duplicates(all_tasks[::-1], inbox_section_id=1) == duplicates
+
+
+def test_only_unassigned_inbox_tasks_can_be_trashed():
+    notes = 'Intimação da sentença proferida nos autos. Prazo de 15 dias para manifestação das partes interessadas.'
+    tasks = [
+        {'id': 1, 'name': 'Sem número A', 'notes': notes, 'section_id': 1},
+        {'id': 2, 'name': 'Sem número B', 'notes': notes, 'section_id': 2},
+        {'id': 3, 'name': 'Sem número C', 'notes': notes, 'section_id': 1},
+        {'id': 4, 'name': '0000000-00.2024.8.19.0001 - X', 'section_id': 1, 'assigned_to_id': 9},
+        {'id': 5, 'name': '0000000-00.2024.8.19.0001 - X', 'section_id': 1},
+    ]
+    near_groups = find_near_duplicate_tasks(tasks[:3])
+    assert [sorted(t['id'] for t in g) for g in near_groups] == [[1, 2, 3]]
+    exact = {'0000000-00.2024.8.19.0001': tasks[3:]}
+
+    # Texto similar também respeita a trava: a cópia em outra seção não pode ser desmarcada
+    assert locked_duplicate_ids(list(exact.values()) + near_groups, inbox_section_id=1) == {2, 4}
+    assert locked_duplicate_ids(near_groups, inbox_section_id='1') == {2}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DA BUSCA DE DUPLICATAS NO PROJETO")
+    print("=" * 60)
+    test_duplicates_spanning_sections()
+    print("✅ test_duplicates_spanning_sections")
+    test_only_unassigned_inbox_tasks_can_be_trashed()
+    print("✅ test_only_unassigned_inbox_tasks_can_be_trashed")
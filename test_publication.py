@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Teste do modelo Publication: chaves derivadas e produção direta pelas duas fontes
+"""
+from publication import Publication, ORIGEM_GMAIL
+from publications import gmail_publications
+from task_journal import content_fingerprint, normalize_content
+
+
+def test_derived_keys_and_slots():
+    pub = Publication('Processo 0028066-08.2021.8.19.0209', 'Intimação  da\nparte. Autor: ANA\nRéu: BANCO')
+    assert pub.cnj_key == '0028066-08.2021.8.19.0209'
+    # Mesmo valor que o diário já gravou antes do modelo existir
+    assert pub.fingerprint == content_fingerprint(pub.process_number, normalize_content(pub.content))
+    assert pub.content_hash == Publication('outro', 'intimação da parte. autor: ana réu: banco').content_hash
+    assert Publication('Sem número identificado', 'x').cnj_key == ''
+    # DJNE às vezes traz o CNJ sem máscara
+    assert Publication('00280660820218190209', 'x').cnj_key == pub.cnj_key
+    assert not hasattr(pub, '__dict__')
+    try:
+        pub.campo_inexistente = 1
+        assert False, 'campos fora de __slots__ não podem ser criados'
+    except AttributeError:
+        pass
+
+
+def test_replace_recomputes_keys():
+    pub = Publication('0028066-08.2021.8.19.0209', 'A', parties='ANA x BANCO', pub_id='m_0')
+    same = pub.replace(pub_id='m_1')
+    assert same.fingerprint == pub.fingerprint and same.parties == 'ANA x BANCO'
+    other = pub.replace(content='B')
+    assert other.fingerprint != pub.fingerprint and other.content_hash != pub.content_hash
+    assert other.pub_id == 'm_0' and other.cnj_key == pub.cnj_key
+
+
+def test_gmail_source_produces_publications():
+    emails = [{'id': 'm1', 'subject': 'Intimações', 'sender': 'tj@tjrj.jus.br', 'date': '19/10/2026',
+               'body': 'Processo nº 0028066-08.2021.8.19.0209\nAutor: MARIA\nRéu: BANCO\nIntimação.'}]
+    pub, = gmail_publications(emails)
+    assert isinstance(pub, Publication)
+    assert (pub.pub_id, pub.origem, pub.email_sender, pub.email_subject) == ('m1_0', ORIGEM_GMAIL, 'tj@tjrj.jus.br', 'Intimações')
+    assert pub.title == '0028066-08.2021.8.19.0209 - MARIA x BANCO'
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO MODELO DE PUBLICAÇÃO")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
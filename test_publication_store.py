@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Teste do arquivo de publicações: busca FTS5 por parte, processo e palavra-chave
+"""
+import os
+import tempfile
+import time
+
+from publication import Publication
+from publication_store import PublicationStore, fts_query, published_on
+
+
+def _pubs():
+    return [
+        Publication('0028066-08.2021.8.19.0209', 'Intimação para manifestação. Autor: MARIA DA SILVA\nRéu: BANCO XPTO',
+                    orgao='2ª Vara Cível', origem='Gmail', email_date='Mon, 16 Mar 2026 10:00:00 -0300'),
+        Publication('0000702-21.2017.8.19.0203', 'Edital de citação. Autor: JOSÉ SANTOS\nRéu: EMPRESA Y',
+                    orgao='Juizado Especial', origem='DJNE', data_disponibilizacao='2025-03-02'),
+        Publication('0028066-08.2021.8.19.0209', 'Sentença publicada. Autor: MARIA DA SILVA\nRéu: BANCO XPTO',
+                    orgao='2ª Vara Cível', origem='DJNE', data_disponibilizacao='19/10/2026'),
+    ]
+
+
+def test_add_is_idempotent_and_persistent():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'publications.db')
+        store = PublicationStore(path)
+        assert store.add(_pubs()) == 3
+        assert store.add(_pubs()) == 0
+        store.close()
+        assert PublicationStore(path).counts() == {'total': 3, 'Gmail': 1, 'DJNE': 2}
+
+
+def test_search_by_party_process_and_keyword():
+    store = PublicationStore(':memory:')
+    store.add(_pubs())
+
+    # Sem acento e por prefixo
+    rows, total = store.search('intimacao banco')
+    assert total == 1 and rows[0]['origem'] == 'Gmail' and '**Intimação**' in rows[0]['snippet']
+    assert store.search('jose', field='parties')[1] == 1
+    assert store.search('vara', field='orgao')[1] == 2
+    assert store.search('maria', field='orgao')[1] == 0
+
+    # CNJ completo (índice) e parcial (FTS)
+    history = store.by_process('Processo 0028066-08.2021.8.19.0209')
+    assert [r['published_on'] for r in history] == ['2026-10-19', '2026-03-16']
+    assert store.search('0028066-08.2021')[1] == 2
+
+    # Filtros de data e origem
+    assert store.search('maria', date_from='2026-01-01', date_to='2026-03-31')[1] == 1
+    assert store.search('', origem='DJNE')[1] == 2
+
+    # Aspas e operadores digitados não quebram a consulta
+    assert store.search('"banco OR ( x')[1] == 0
+
+
+def test_search_is_fast_on_large_history():
+    store = PublicationStore(':memory:')
+    words = ['intimação', 'sentença', 'prazo', 'audiência', 'recurso', 'apelação', 'despacho', 'embargos']
+    store.add(Publication(f'{i:07d}-00.{2015 + i % 10}.8.19.0001',
+                          ' '.join(words[(i + j) % len(words)] for j in range(60)) + f' Autor: PESSOA{i}',
+                          parties=f'PESSOA{i} x EMPRESA{i % 50}', origem='DJNE',
+                          data_disponibilizacao=f'{2015 + i % 10}-03-1{i % 9}')
+              for i in range(20000))
+
+    started = time.perf_counter()
+    rows, total = store.search('empresa7 apelação', limit=20)
+    elapsed = time.perf_counter() - started
+    assert total == 400 and len(rows) == 20
+    assert elapsed < 0.5, f"busca lenta: {elapsed:.3f}s"
+
+
+def test_helpers():
+    assert fts_query('banco intim') == '"banco"* "intim"*'
+    assert fts_query('maria', field='parties') == 'parties : ("maria"*)'
+    assert published_on(Publication('x', 'y', email_date='Tue, 3 Feb 2026 08:00:00 +0000')) == '2026-02-03'
+    assert published_on(Publication('x', 'y', email_date='sem data')) == ''
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO ARQUIVO DE PUBLICAÇÕES")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
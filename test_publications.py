@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Teste do agrupamento de publicações do mesmo processo e das cópias encaminhadas
+"""
+from email_extraction import unwrap_forwarded_body, email_body_key, BODY_UNAVAILABLE
+from publication import Publication
+from publications import consolidate_publications, gmail_publications
+
+DIGEST = ("Publicação: 1 PROCESSO: 0028066-08.2021.8.19.0209\nAutor: MARIA\nRéu: BANCO\nIntimação.\n\n"
+          "Publicação: 2 PROCESSO: 0000702-21.2017.8.19.0203\nAutor: JOSE\nRéu: EMPRESA\nEdital.\n")
+
+
+def test_consolidate_same_process():
+    pubs = [
+        Publication('0028066-08.2021.8.19.0209', 'Intimação A', email_date='22/01/2026'),
+        Publication('0000702-21.2017.8.19.0203', 'Intimação B'),
+        Publication('0028066-08.2021.8.19.0209', 'Intimação C', email_date='23/01/2026'),
+        Publication('Sem número identificado', 'X'),
+        Publication('Sem número identificado', 'Y'),
+    ]
+    items = consolidate_publications(pubs)
+
+    assert [i.process_number for i in items] == [
+        '0028066-08.2021.8.19.0209', '0000702-21.2017.8.19.0203',
+        'Sem número identificado', 'Sem número identificado',
+    ]
+    assert [i.merged_count for i in items] == [2, 1, 1, 1]
+    merged = items[0].content
+    assert 'Publicação 1/2 — 22/01/2026' in merged and 'Publicação 2/2 — 23/01/2026' in merged
+    assert merged.index('Intimação A') < merged.index('Intimação C')
+    assert items[1] is pubs[1]
+    assert items[0].fingerprint != pubs[0].fingerprint and items[0].cnj_key == pubs[0].cnj_key
+
+
+def test_forwarded_copies_are_extracted_once():
+    quoted = ''.join(f"> {line}\n" for line in DIGEST.splitlines())
+    emails = [
+        {'id': 'orig', 'body': DIGEST},
+        # Encaminhado pelo Gmail, com um recado antes
+        {'id': 'fwd', 'body': "Vejam o item 2.\n\n---------- Forwarded message ---------\n"
+                              "De: AASP <intimacoes@aasp.org.br>\nDate: seg., 19 de out. de 2026\n"
+                              "Subject: Intimações\nTo: <edson@x.com>\n\n\n" + DIGEST},
+        # Resposta com o resumo citado
+        {'id': 'reply', 'body': "Ok, ciente.\n\nEm seg., 19 de out. de 2026 07:00, AASP "
+                                "<intimacoes@aasp.org.br> escreveu:\n" + quoted},
+        # Outlook, com espaçamento diferente
+        {'id': 'outlook', 'body': "-----Mensagem original-----\n**De:** AASP\n**Enviada em:** segunda\n"
+                                  "**Assunto:** Intimações\n\n" + DIGEST.replace('\n', '\r\n  ')},
+        {'id': 'outro', 'body': "PROCESSO: 0012345-67.2024.8.19.0001 Sentença."},
+    ]
+    for email in emails:
+        email.update(subject='Intimações', sender='AASP', date='19/10/2026')
+
+    seen = set()
+    pubs = gmail_publications(emails, seen_bodies=seen)
+    assert len(seen) == 2 and len(emails) - len(seen) == 3
+    assert [p.email_id for p in pubs] == ['orig', 'orig', 'outro']
+    # Um e-mail original não é alterado; as cópias voltam ao mesmo texto
+    assert unwrap_forwarded_body(DIGEST) == DIGEST
+    assert unwrap_forwarded_body(emails[1]['body']) == DIGEST.strip()
+    # Chamadas seguintes com o mesmo conjunto também pulam as cópias
+    assert gmail_publications(emails[1:4], seen_bodies=seen) == []
+
+
+def test_unreadable_bodies_are_not_copies_of_each_other():
+    assert email_body_key('') is None and email_body_key('  \n ') is None
+    assert email_body_key(BODY_UNAVAILABLE) is None and email_body_key(f"\n{BODY_UNAVAILABLE} ") is None
+    emails = [
+        {'id': 'falhou-1', 'body': BODY_UNAVAILABLE},
+        {'id': 'falhou-2', 'body': BODY_UNAVAILABLE},
+        {'id': 'vazio-1', 'body': ''},
+        {'id': 'vazio-2', 'body': ''},
+    ]
+    for email in emails:
+        email.update(subject='Intimações', sender='AASP', date='19/10/2026')
+
+    seen = set()
+    gmail_publications(emails, seen_bodies=seen)
+    # Nenhum é contado como cópia encaminhada de outro
+    assert len(emails) - len(seen) == 0
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO AGRUPAMENTO DE PUBLICAÇÕES")
+    print("=" * 60)
+    test_consolidate_same_process()
+    print("✅ test_consolidate_same_process")
+    test_forwarded_copies_are_extracted_once()
+    print("✅ test_forwarded_copies_are_extracted_once")
+    test_unreadable_bodies_are_not_copies_of_each_other()
+    print("✅ test_unreadable_bodies_are_not_copies_of_each_other")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Teste do perfilador de reruns
+"""
+import time
+
+from rerun_profiler import RerunProfiler
+
+
+def test_profiler_records_runs_and_sections():
+    profiler = RerunProfiler(history=3)
+    assert profiler.summary() is None
+    for _ in range(5):
+        profiler.start()
+        time.sleep(0.002)
+        profiler.mark('setup')
+        profiler.mark('flow')
+        assert profiler.finish() >= 2
+    stats = profiler.summary()
+    assert stats['runs'] == 3
+    assert stats['last_ms'] >= stats['sections']['setup'] >= 2
+    assert set(stats['sections']) == {'setup', 'flow'}
+    # Sem start(), finish() não registra nada
+    assert profiler.finish() is None
+    assert profiler.summary()['runs'] == 3
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO PERFILADOR DE RERUNS")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
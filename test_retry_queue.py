@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Teste da fila de novas tentativas: queda do MeisterTask, backoff e lista de mortas
+"""
+import os
+import tempfile
+import time
+
+import requests
+
+from background_jobs import create_task_item, ITEM_FAILED
+from fake_meistertask import FakeMeisterTask
+from meistertask_api import MeisterTaskError, get_meistertask_client
+from publication import Publication
+from retry_queue import RetryQueue, RetryWorker, STATUS_RETRY, STATUS_DEAD
+from task_journal import TaskJournal, STATE_PENDING
+from task_mirror import TaskMirror
+
+SECTION_ID = 41
+
+
+def _payload(process_number, section_id=SECTION_ID):
+    return {'process_number': process_number, 'parties': 'A x B',
+            'description': f'Intimação {process_number}', 'section_id': section_id}
+
+
+def test_outage_is_retried_in_background():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = RetryQueue(os.path.join(tmp, 'retry.db'), max_attempts=3, base_delay=0.01)
+        journal = TaskJournal(os.path.join(tmp, 'journal.jsonl'))
+        mirror = TaskMirror(os.path.join(tmp, 'mirror.db'))
+
+        # Durante a queda: erro de conexão (transitório) e 404 (definitivo)
+        assert queue.enqueue('fp-a', _payload('0000001-00.2024.8.19.0001'),
+                             MeisterTaskError('Erro de conexão')) == STATUS_RETRY
+        assert queue.enqueue('fp-b', _payload('0000002-00.2024.8.19.0001', section_id=999),
+                             MeisterTaskError('Status 404', 404)) == STATUS_DEAD
+        assert queue.counts() == {STATUS_RETRY: 1, STATUS_DEAD: 1}
+        # Backoff: ainda não venceu
+        assert queue.due(now=time.time() - 60) == []
+
+        fake = FakeMeisterTask()
+        fake.add_section(1, SECTION_ID, 'Publicações')
+        with fake.patched_api():
+            worker = RetryWorker(queue, 'token-teste', journal=journal, mirror=mirror)
+            created = worker.run_once(now=time.time() + 60)
+            # Reenvio em lote da lista de mortas: a seção continua inexistente
+            assert queue.replay() == 1
+            worker.run_once(now=time.time() + 60)
+
+        assert created == 1
+        assert [t['name'] for t in fake.section_tasks(SECTION_ID)] == ['0000001-00.2024.8.19.0001 - A x B']
+        assert journal.is_done('fp-a')
+        assert mirror.find_by_process(SECTION_ID, '0000001-00.2024.8.19.0001')
+        dead = queue.dead_letters()
+        assert [d['fingerprint'] for d in dead] == ['fp-b']
+        assert dead[0]['attempts'] == 1 and '404' in dead[0]['last_error']
+
+
+def test_transient_failures_exhaust_attempts():
+    queue = RetryQueue(':memory:', max_attempts=2, base_delay=0.01)
+    queue.enqueue('fp', _payload('1'), MeisterTaskError('Status 503', 503))
+    assert queue.record_failure('fp', MeisterTaskError('Status 503', 503)) == STATUS_RETRY
+    assert queue.record_failure('fp', MeisterTaskError('Status 503', 503)) == STATUS_DEAD
+    assert queue.due(now=time.time() + 3600) == []
+    queue.discard(['fp'])
+    assert queue.counts() == {STATUS_RETRY: 0, STATUS_DEAD: 0}
+
+
+def test_timeout_on_create_is_not_queued():
+    def _timeout(method, url, **kwargs):
+        raise requests.exceptions.ReadTimeout('sem resposta')
+
+    get_meistertask_client('token-timeout').session.request = _timeout
+    queue = RetryQueue(':memory:')
+    item = Publication('0000003-00.2024.8.19.0001', 'Intimação', parties='A x B')
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TaskJournal(os.path.join(tmp, 'journal.jsonl'))
+        outcome, error = create_task_item(item, SECTION_ID, 'token-timeout', journal, retry_queue=queue)
+        # A tarefa pode existir: fica pendente no diário, sem reenvio pela fila
+        assert outcome == ITEM_FAILED and error.unknown_outcome
+        assert queue.counts() == {STATUS_RETRY: 0, STATUS_DEAD: 0}
+        assert journal.get(item.fingerprint)['state'] == STATE_PENDING
+
+
+def test_unknown_outcome_is_reconciled_before_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = RetryQueue(os.path.join(tmp, 'retry.db'), base_delay=0.01)
+        journal = TaskJournal(os.path.join(tmp, 'journal.jsonl'))
+        mirror = TaskMirror(os.path.join(tmp, 'mirror.db'))
+        lost = MeisterTaskError('Timeout', unknown_outcome=True)
+        for fp, process_number in (('fp-a', '0000004-00.2024.8.19.0001'), ('fp-b', '0000005-00.2024.8.19.0001')):
+            journal.record_intent(fp, process_number)
+            assert queue.enqueue(fp, _payload(process_number), lost) == STATUS_DEAD
+
+        # A seção não pode ser listada e não está no espelho: nada é reenviado às cegas
+        with FakeMeisterTask().patched_api() as unreachable:
+            assert queue.replay() == 2
+            RetryWorker(queue, 'token-teste', journal=journal).run_once(now=time.time() + 60)
+        assert not [r for r in unreachable.requests if r[0] == 'POST']
+        assert queue.counts() == {STATUS_RETRY: 0, STATUS_DEAD: 2}
+        assert journal.get('fp-a')['state'] == STATE_PENDING
+
+        # Com a listagem: a que chegou a ser criada é reconhecida, a outra é criada uma vez
+        fake = FakeMeisterTask()
+        fake.add_section(1, SECTION_ID, 'Publicações')
+        fake.add_task(SECTION_ID, '0000004-00.2024.8.19.0001 - A x B')
+        with fake.patched_api():
+            assert queue.replay() == 2
+            created = RetryWorker(queue, 'token-teste', journal=journal, mirror=mirror).run_once(now=time.time() + 60)
+        assert created == 1
+        assert sorted(t['name'] for t in fake.section_tasks(SECTION_ID)) == [
+            '0000004-00.2024.8.19.0001 - A x B', '0000005-00.2024.8.19.0001 - A x B']
+        assert journal.is_done('fp-a') and journal.is_done('fp-b')
+        assert queue.counts() == {STATUS_RETRY: 0, STATUS_DEAD: 0}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DA FILA DE NOVAS TENTATIVAS")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
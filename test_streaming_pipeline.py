@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Teste do pipeline em streaming: buffers limitados, concorrência por estágio e erros
+"""
+import threading
+import time
+
+from streaming_pipeline import StreamingPipeline, Stage
+
+
+def test_backpressure_bounds_items_in_flight():
+    pulled = []
+
+    def source():
+        for i in range(200):
+            pulled.append(i)
+            yield i
+
+    pipeline = StreamingPipeline([Stage('double', lambda x: [x * 2], workers=3, buffer=4),
+                                  Stage('slow', lambda x: [x], workers=1, buffer=4)])
+    results = []
+    for result in pipeline.run(source()):
+        results.append(result)
+        time.sleep(0.002)          # consumidor lento: as filas enchem
+
+        # A fonte nunca se adianta mais que a soma dos buffers + threads
+        assert len(pulled) - len(results) <= 4 + 3 + 4 + 1 + 4 + 2
+
+    assert sorted(results) == [i * 2 for i in range(200)]
+    summary = pipeline.summary()
+    assert summary['double']['received'] == 200 and summary['slow']['emitted'] == 200
+    assert summary['slow']['max_queue'] <= 4
+
+
+def test_stage_errors_do_not_stop_the_stream():
+    errors = []
+
+    def explode_on_odd(x):
+        if x % 2:
+            raise ValueError(x)
+        yield x
+        yield x + 100
+
+    pipeline = StreamingPipeline([Stage('split', explode_on_odd, workers=2)],
+                                 on_error=lambda stage, item, e: errors.append((stage, item)))
+    results = sorted(pipeline.run(range(10)))
+    assert results == [0, 2, 4, 6, 8, 100, 102, 104, 106, 108]
+    assert sorted(item for _, item in errors) == [1, 3, 5, 7, 9]
+    assert pipeline.summary()['split']['errors'] == 5
+
+
+def test_early_stop_and_source_error():
+    before = threading.active_count()
+    stream = StreamingPipeline([Stage('id', lambda x: [x], workers=4)]).run(iter(range(10 ** 9)))
+    next(stream)
+    stream.close()
+    assert threading.active_count() == before
+
+    def broken():
+        yield 1
+        raise RuntimeError('fonte')
+
+    try:
+        list(StreamingPipeline([Stage('id', lambda x: [x])]).run(broken()))
+        assert False, 'o erro da fonte deveria chegar ao consumidor'
+    except RuntimeError as e:
+        assert str(e) == 'fonte'
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO PIPELINE EM STREAMING")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Teste da checagem de duplicatas antes de criar tarefas no MeisterTask
+"""
+from fake_meistertask import FakeMeisterTask
+from meistertask_api import build_process_index, create_meistertask_task, iter_meistertask_tasks
+
+SECTION_ID = 12
+
+
+def test_existing_process_is_not_recreated():
+    fake = FakeMeisterTask()
+    existing = fake.add_task(SECTION_ID, "0028066-08.2021.8.19.0209 - ALESSANDRA x ELETRONICA")
+
+    with fake.patched_api():
+        index = build_process_index(iter_meistertask_tasks(SECTION_ID, 'token-teste'))
+        batch = [
+            "0028066-08.2021.8.19.0209",   # já existe na seção
+            "0000702-21.2017.8.19.0203",   # nova
+            "0000702-21.2017.8.19.0203",   # repetida dentro do mesmo lote
+        ]
+        results = [
+            create_meistertask_task(number, 'A x B', 'texto', SECTION_ID, 'token-teste',
+                                    existing_index=index)
+            for number in batch
+        ]
+
+    assert all(ok for ok, _ in results)
+    assert results[0][1]['already_exists']
+    assert results[0][1]['url'].endswith(existing['token'])
+    assert not results[1][1].get('already_exists')
+    assert results[2][1]['already_exists']
+    assert len(fake.section_tasks(SECTION_ID)) == 2
+    assert sum(1 for method, _ in fake.requests if method == 'POST') == 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DA CHECAGEM DE DUPLICATAS NA CRIAÇÃO")
+    print("=" * 60)
+    test_existing_process_is_not_recreated()
+    print("✅ test_existing_process_is_not_recreated")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Teste do diário de criação de tarefas (retomada após queda)
+"""
+import os
+import tempfile
+
+from publication import Publication
+from task_journal import TaskJournal, STATE_PENDING
+
+
+def test_resume_after_crash():
+    pubs = [
+        Publication('0028066-08.2021.8.19.0209', 'Intimação  A'),
+        Publication('0000702-21.2017.8.19.0203', 'Intimação B'),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.jsonl')
+        journal = TaskJournal(path)
+        fp_a, fp_b = [p.fingerprint for p in pubs]
+
+        journal.record_intent(fp_a, pubs[0].process_number)
+        journal.record_done(fp_a, pubs[0].process_number, {'id': 101})
+        journal.record_intent(fp_b, pubs[1].process_number)
+        # "Queda" aqui: B ficou só com a intenção e a última linha foi cortada
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"fingerprint": "cort')
+
+        resumed = TaskJournal(path)
+        assert resumed.is_done(fp_a)
+        assert resumed.get(fp_a)['task_id'] == 101
+        assert not resumed.is_done(fp_b)
+        assert [e['fingerprint'] for e in resumed.pending()] == [fp_b]
+        assert resumed.get(fp_b)['state'] == STATE_PENDING
+
+        # O evento gravado depois da queda não pode colar na linha cortada
+        resumed.record_done(fp_b, pubs[1].process_number, {'id': 102})
+        assert TaskJournal(path).is_done(fp_b)
+
+        resumed.compact()
+        assert TaskJournal(path).get(fp_a)['task_id'] == 101
+
+
+def test_fingerprint_ignores_whitespace_and_case():
+    a = Publication('1', 'Texto   da\npublicação')
+    b = Publication('1', 'texto da publicação')
+    c = Publication('2', 'texto da publicação')
+    assert a.fingerprint == b.fingerprint
+    assert b.fingerprint != c.fingerprint
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO DIÁRIO DE CRIAÇÃO DE TAREFAS")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Teste do espelho local de tarefas do MeisterTask (SQLite)
+"""
+from fake_meistertask import FakeMeisterTask
+from meistertask_api import find_duplicate_tasks
+from task_mirror import TaskMirror
+
+SECTION_ID = 77
+
+
+def _seed(fake, total):
+    for i in range(total):
+        # A cada 10 tarefas, uma repete o processo da anterior
+        number = i - 1 if i % 10 == 9 else i
+        fake.add_task(SECTION_ID, f"{number:07d}-00.2024.8.19.0001 - Parte {i}",
+                      updated_at=f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z")
+
+
+def test_full_sync_matches_find_duplicate_tasks():
+    fake = FakeMeisterTask()
+    _seed(fake, 1000)
+    mirror = TaskMirror(':memory:')
+
+    with fake.patched_api():
+        sync = mirror.refresh(SECTION_ID, 'token-teste')
+
+    assert sync == {'mode': 'full', 'fetched': 1000}
+    expected = find_duplicate_tasks(fake.section_tasks(SECTION_ID))
+    found = mirror.find_duplicates(SECTION_ID)
+    assert found.keys() == expected.keys()
+    for number, tasks in expected.items():
+        assert [t['id'] for t in found[number]] == [t['id'] for t in tasks]
+
+
+def test_incremental_refresh_reads_only_changes():
+    fake = FakeMeisterTask()
+    _seed(fake, 1000)
+    mirror = TaskMirror(':memory:')
+
+    with fake.patched_api():
+        mirror.refresh(SECTION_ID, 'token-teste')
+        fake.add_task(SECTION_ID, "0000001-00.2024.8.19.0001 - Nova", updated_at="2026-02-01T00:00:00Z")
+        before = len(fake.requests)
+        sync = mirror.refresh(SECTION_ID, 'token-teste')
+        requests_made = len(fake.requests) - before
+        # Alterada no mesmo segundo do watermark, mas lida depois dele
+        fake.add_task(SECTION_ID, "0000002-00.2024.8.19.0001 - Mesmo segundo", updated_at="2026-02-01T00:00:00Z")
+        same_second = mirror.refresh(SECTION_ID, 'token-teste')
+
+    # A tarefa do watermark anterior é relida (janela sobreposta)
+    assert sync == {'mode': 'incremental', 'fetched': 2}
+    assert requests_made == 1
+    assert same_second == {'mode': 'incremental', 'fetched': 2}
+    assert len(mirror.tasks(SECTION_ID)) == 1002
+    assert len(mirror.find_by_process(SECTION_ID, "0000001-00.2024.8.19.0001")) == 2
+    assert len(mirror.find_by_process(SECTION_ID, "0000002-00.2024.8.19.0001")) == 2
+
+
+def test_ignored_sort_falls_back_to_full_sync():
+    fake = FakeMeisterTask()
+    _seed(fake, 200)
+    mirror = TaskMirror(':memory:')
+
+    with fake.patched_api():
+        mirror.refresh(SECTION_ID, 'token-teste')
+        # A API passa a ignorar sort=-updated_at: a primeira tarefa é a mais antiga
+        fake.honor_sort = False
+        fake.add_task(SECTION_ID, "0000500-00.2024.8.19.0001 - Nova", updated_at="2026-02-01T00:00:00Z")
+        sync = mirror.refresh(SECTION_ID, 'token-teste')
+
+    assert sync == {'mode': 'full', 'fetched': 201}
+    assert mirror.find_by_process(SECTION_ID, "0000500-00.2024.8.19.0001")
+
+
+def test_trashed_tasks_leave_the_mirror():
+    mirror = TaskMirror(':memory:')
+    mirror.upsert_tasks(SECTION_ID, [
+        {'id': 1, 'name': '0000001-00.2024.8.19.0001 - A', 'status': 1},
+        {'id': 2, 'name': '0000001-00.2024.8.19.0001 - B', 'status': 1},
+    ])
+    assert len(mirror.find_duplicates(SECTION_ID)) == 1
+
+    mirror.upsert_tasks(SECTION_ID, [{'id': 2, 'name': '0000001-00.2024.8.19.0001 - B', 'status': 18}])
+    assert mirror.find_duplicates(SECTION_ID) == {}
+    mirror.remove_tasks([1])
+    assert mirror.tasks(SECTION_ID) == []
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO ESPELHO LOCAL DE TAREFAS")
+    print("=" * 60)
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Teste do receptor de webhooks do MeisterTask (eventos aplicados no espelho local)
+"""
+import os
+import tempfile
+import time
+
+import requests
+
+from background_jobs import existing_process_index
+from fake_meistertask import FakeMeisterTask
+from task_journal import TaskJournal
+from task_mirror import TaskMirror, FULL_SYNC_INTERVAL
+from webhook_receiver import WebhookReceiver, replay_events
+
+SECTION_ID = 9
+
+EVENTS = [
+    {'event': 'task_created', 'data': {'id': 1, 'section_id': SECTION_ID, 'name': '0028066-08.2021.8.19.0209 - A'}},
+    {'event': 'task_created', 'data': {'id': 2, 'section_id': SECTION_ID, 'name': '0028066-08.2021.8.19.0209 - B'}},
+    {'event': 'task_created', 'data': {'id': 3, 'section_id': SECTION_ID, 'name': '0000702-21.2017.8.19.0203 - C'}},
+    {'event': 'task_updated', 'data': {'id': 3, 'section_id': 10, 'name': '0000702-21.2017.8.19.0203 - C'}},
+    {'event': 'task_deleted', 'data': {'id': 2}},
+]
+
+
+def test_events_update_mirror_and_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'events.jsonl')
+        mirror = TaskMirror(':memory:')
+        receiver = WebhookReceiver(mirror, port=0, secret='s3gredo', event_log=log_path).start()
+        try:
+            denied = requests.post(receiver.url, json=EVENTS[0], timeout=5)
+            assert denied.status_code == 401
+            forged = requests.post(receiver.url, json=EVENTS[0], headers={'X-Webhook-Secret': 's3gredX'}, timeout=5)
+            assert forged.status_code == 401
+            for event in EVENTS:
+                response = requests.post(receiver.url, json=event,
+                                         headers={'X-Webhook-Secret': 's3gredo'}, timeout=5)
+                assert response.status_code == 200
+        finally:
+            receiver.stop()
+
+        assert [t['id'] for t in mirror.tasks(SECTION_ID)] == [1]
+        assert [t['id'] for t in mirror.tasks(10)] == [3]
+        assert mirror.find_duplicates(SECTION_ID) == {}
+
+        # O log gravado reproduz o mesmo estado em um espelho novo
+        replayed = TaskMirror(':memory:')
+        assert replay_events(log_path, replayed) == len(EVENTS)
+        assert [t['id'] for t in replayed.tasks(SECTION_ID)] == [1]
+        assert [t['id'] for t in replayed.tasks(10)] == [3]
+
+
+def test_no_secret_only_on_loopback():
+    mirror = TaskMirror(':memory:')
+    for host in ('0.0.0.0', '192.168.0.10', 'example.com'):
+        try:
+            WebhookReceiver(mirror, host=host, port=0, event_log=None)
+        except ValueError as e:
+            assert 'MEISTERTASK_WEBHOOK_SECRET' in str(e)
+        else:
+            raise AssertionError(f'{host} aceito sem segredo')
+    WebhookReceiver(mirror, host='127.0.0.1', port=0, event_log=None).start().stop()
+
+
+def test_webhook_mirror_is_resynced_periodically():
+    fake = FakeMeisterTask()
+    fake.add_section(1, SECTION_ID, 'Publicações')
+    fake.add_task(SECTION_ID, '0028066-08.2021.8.19.0209 - A')
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TaskJournal(os.path.join(tmp, 'journal.jsonl'))
+        mirror = TaskMirror(':memory:')
+        with fake.patched_api():
+            mirror.refresh(SECTION_ID, 'token-teste')
+            # Criada sem que o webhook chegasse: o espelho ainda não sabe dela
+            fake.add_task(SECTION_ID, '0000702-21.2017.8.19.0203 - B')
+            index, _ = existing_process_index(None, SECTION_ID, 'token-teste', journal, mirror, use_mirror_index=True)
+            assert list(index) == ['0028066-08.2021.8.19.0209']
+
+            # Vencido o intervalo, a checagem ressincroniza em vez de confiar no espelho
+            stale = time.time() - FULL_SYNC_INTERVAL - 1
+            mirror._save_meta(str(SECTION_ID), stale, stale)
+            assert not mirror.is_fresh(SECTION_ID)
+            index, _ = existing_process_index(None, SECTION_ID, 'token-teste', journal, mirror, use_mirror_index=True)
+        assert sorted(index) == ['0000702-21.2017.8.19.0203', '0028066-08.2021.8.19.0209']
+        assert mirror.is_fresh(SECTION_ID) and len(mirror.tasks(SECTION_ID)) == 2
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTE DO RECEPTOR DE WEBHOOKS")
+    print("=" * 60)
+    test_events_update_mirror_and_replay()
+    print("✅ test_events_update_mirror_and_replay")
+    test_no_secret_only_on_loopback()
+    print("✅ test_no_secret_only_on_loopback")
+    test_webhook_mirror_is_resynced_periodically()
+    print("✅ test_webhook_mirror_is_resynced_periodically")
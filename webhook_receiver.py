@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Receptor de webhooks do MeisterTask
+Aplica eventos de tarefa criada/atualizada/excluída no espelho local (task_mirror)
+para que o dashboard leia dados atualizados sem listar a seção
+
+Uso:
+    python webhook_receiver.py --port 8502
+    python webhook_receiver.py --replay .cache/webhook_events.jsonl
+"""
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from config import get_settings
+from task_mirror import TaskMirror
+
+DEFAULT_EVENT_LOG = os.path.join('.cache', 'webhook_events.jsonl')
+WEBHOOK_PATH = '/webhooks/meistertask'
+
+EVENT_CREATED = 'task_created'
+EVENT_UPDATED = 'task_updated'
+EVENT_DELETED = 'task_deleted'
+
+
+def apply_event(mirror, event):
+    """
+    Aplica um evento no espelho
+
+    Aceita {'event': 'task_created' | 'task_updated' | 'task_deleted', 'data': tarefa}
+    (também 'type'/'task' como nomes alternativos). Retorna o nome do evento
+    aplicado ou None se o evento não for reconhecido.
+    """
+    name = (event.get('event') or event.get('type') or '').replace('.', '_')
+    task = event.get('data') or event.get('task') or {}
+    if not task.get('id'):
+        return None
+
+    if name == EVENT_DELETED or task.get('status') == 18:
+        mirror.remove_tasks([task['id']])
+        return EVENT_DELETED
+    if name in (EVENT_CREATED, EVENT_UPDATED):
+        if task.get('section_id') is None:
+            return None
+        mirror.upsert_tasks(task['section_id'], [task])
+        return name
+    return None
+
+
+def is_loopback(host):
+    """True se o endereço só aceita conexões da própria máquina"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def replay_events(path, mirror):
+    """Reaplica um log de eventos gravado pelo receptor; retorna quantos foram aplicados"""
+    applied = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if apply_event(mirror, json.loads(line)):
+                applied += 1
+    return applied
+
+
+class WebhookReceiver:
+    """
+    Servidor HTTP que recebe POSTs em /webhooks/meistertask
+
+    Cada evento aceito é gravado em event_log (JSONL) antes de ser aplicado,
+    então o log pode ser reaplicado em outro espelho com replay_events.
+    Se `secret` for definido, exige o header X-Webhook-Secret (ou ?secret=);
+    sem ele só escuta em endereço local, já que os eventos decidem o que o
+    dashboard considera já criado.
+    """
+
+    def __init__(self, mirror, host='127.0.0.1', port=8502, secret=None, event_log=DEFAULT_EVENT_LOG):
+        if not secret and not is_loopback(host):
+            raise ValueError(f"Defina MEISTERTASK_WEBHOOK_SECRET para receber webhooks em {host}")
+        self.mirror = mirror
+        self.secret = secret
+        self.event_log = event_log
+        self._log_lock = threading.Lock()
+        if event_log:
+            os.makedirs(os.path.dirname(event_log) or '.', exist_ok=True)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{WEBHOOK_PATH}"
+
+    def _record(self, event):
+        if not self.event_log:
+            return
+        with self._log_lock, open(self.event_log, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    def _handler_class(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=None):
+                data = json.dumps(body).encode('utf-8') if body is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                if parsed.path != WEBHOOK_PATH:
+                    return self._reply(404, {'error': 'not found'})
+                if receiver.secret:
+                    given = self.headers.get('X-Webhook-Secret') or parse_qs(parsed.query).get('secret', [''])[0]
+                    if not hmac.compare_digest(given.encode('utf-8'), receiver.secret.encode('utf-8')):
+                        return self._reply(401, {'error': 'unauthorized'})
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    event = json.loads(self.rfile.read(length) or b'{}')
+                except (ValueError, json.JSONDecodeError):
+                    return self._reply(400, {'error': 'invalid json'})
+
+                receiver._record(event)
+                applied = apply_event(receiver.mirror, event)
+                self._reply(200, {'applied': applied})
+
+        return Handler
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Receptor de webhooks do MeisterTask')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Endereço de escuta (fora de localhost exige MEISTERTASK_WEBHOOK_SECRET)')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--replay', help='Reaplica um log de eventos no espelho e sai')
+    args = parser.parse_args()
+
+    mirror = TaskMirror()
+    if args.replay:
+        print(f"✅ {replay_events(args.replay, mirror)} evento(s) reaplicado(s)")
+        return
+
+    try:
+        receiver = WebhookReceiver(mirror, args.host, args.port,
+                                   secret=get_settings().meistertask_webhook_secret or None)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"📡 Recebendo webhooks em {receiver.url}")
+    receiver.serve_forever()
+
+
+if __name__ == '__main__':
+    main()